@@ -53,13 +53,14 @@ from shared_services.database import (
     Negotiations,
 )
 
-from shared_services.db_service import (
+from shared_services.async_db_service import (
     is_boolean_field_true_in_db,
     update_record_in_db,
     is_value_in_db,
     get_column_value_in_db,
     get_column_value_by_field,
-    update_column_value_by_field
+    update_column_value_by_field,
+    get_applicant_status_snapshot,
 )
 
 from shared_services.constants import *
@@ -147,7 +148,7 @@ async def setup_new_applicant_user_command(update: Update, context: ContextTypes
 
         # ----- CHECK IF NEGOTIATION exists in records and CREATE record and user directory if needed -----
 
-        if not is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
+        if not await is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
             logger.debug(f"{log_prefix}: Negotiation {negotiation_id} not found in database")
             await send_message_to_user(update, context, text=FAIL_TO_IDENTIFY_PAYLOAD_TEXT)
             return
@@ -161,13 +162,19 @@ async def setup_new_applicant_user_command(update: Update, context: ContextTypes
 
         # ----- UPDATE APPLICANT BOT RECORDS with PAYLOAD DATA -----
 
-        update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"applicant_visited_bot": True})
         current_time = datetime.now(timezone.utc).isoformat()
-        update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"first_time_seen": current_time})
-        update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"tg_user_id": bot_user_id})
-        update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"tg_username": username})
-        update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"tg_first_name": first_name})
-        update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"tg_last_name": last_name})
+        await update_record_in_db(
+            db_model=Negotiations,
+            record_id=negotiation_id,
+            updates={
+                "applicant_visited_bot": True,
+                "first_time_seen": current_time,
+                "tg_user_id": bot_user_id,
+                "tg_username": username,
+                "tg_first_name": first_name,
+                "tg_last_name": last_name,
+            },
+        )
 
         logger.debug(f"{log_prefix}: Negotiation {negotiation_id} updated with applicant user data.")
 
@@ -238,11 +245,11 @@ async def ask_privacy_policy_confirmation_command(update: Update, context: Conte
         bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
         logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
 
-        negotiation_id = get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
+        negotiation_id = await get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
 
         # ----- CHECK IF PRIVACY POLICY is already confirmed and STOP if it is -----
 
-        if is_boolean_field_true_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="privacy_policy_confirmed"):
+        if await is_boolean_field_true_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="privacy_policy_confirmed"):
             await send_message_to_user(update, context, text=SUCCESS_TO_GET_PRIVACY_POLICY_CONFIRMATION_TEXT)
             logger.info(f"{log_prefix}: privacy policy already confirmed for user_id {bot_user_id}")
             return
@@ -288,7 +295,7 @@ async def handle_answer_policy_confirmation(update: Update, context: ContextType
     bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
     logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
 
-    negotiation_id = get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
+    negotiation_id = await get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
 
     # ------- UNDERSTAND WHAT BUTTON was clicked and get answer_key -------
 
@@ -335,17 +342,14 @@ async def handle_answer_policy_confirmation(update: Update, context: ContextType
         privacy_policy_confirmation_user_decision = answer_key  # "yes" or "no"
 
         privacy_policy_confirmation_user_value = True if privacy_policy_confirmation_user_decision == "yes" else False
-        update_record_in_db(
-            db_model=Negotiations,
-            record_id=negotiation_id,
-            updates={"privacy_policy_confirmed": privacy_policy_confirmation_user_value},
-        )
-
         current_time = datetime.now(timezone.utc).isoformat()
-        update_record_in_db(
+        await update_record_in_db(
             db_model=Negotiations,
             record_id=negotiation_id,
-            updates={"privacy_policy_confirmation_time": current_time},
+            updates={
+                "privacy_policy_confirmed": privacy_policy_confirmation_user_value,
+                "privacy_policy_confirmation_time": current_time,
+            },
         )
 
         logger.debug(f"{log_prefix}: Privacy policy confirmation user {bot_user_id} decision: {privacy_policy_confirmation_user_decision} at {current_time}")
@@ -381,19 +385,19 @@ async def show_welcome_video_command(update: Update, context: ContextTypes.DEFAU
 
     bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
     logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
-    negotiation_id = get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
-    vacancy_id = get_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="vacancy_id")
+    negotiation_id = await get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
+    vacancy_id = await get_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="vacancy_id")
 
     # ----- CHECK IF SUCH VACANCY exists and STOP if not -----
 
-    if not is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
+    if not await is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
         logger.debug(f"{log_prefix}: Vacancy {vacancy_id} not found in database")
         await send_message_to_user(update, context, text=FAIL_TO_IDENTIFY_PAYLOAD_TEXT)
         return
 
     # ----- CHECK IF WELCOME VIDEO is already shown and STOP if it is -----
 
-    if is_boolean_field_true_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="welcome_video_shown"):
+    if await is_boolean_field_true_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="welcome_video_shown"):
         await send_message_to_user(update, context, text=SUCCESS_TO_GET_WELCOME_VIDEO_TEXT)
         return
 
@@ -401,7 +405,7 @@ async def show_welcome_video_command(update: Update, context: ContextTypes.DEFAU
 
     # ----- GET WELCOME VIDEO from managers -----
 
-    video_path = get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="video_path")
+    video_path = await get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="video_path")
     if video_path is None:
         await send_message_to_user(update, context, text=FAIL_TECHNICAL_SUPPORT_TEXT)
         return
@@ -409,7 +413,7 @@ async def show_welcome_video_command(update: Update, context: ContextTypes.DEFAU
     # ----- SEND WELCOME VIDEO to applicant -----
     
     await context.application.bot.send_video(chat_id=int(bot_user_id), video=str(video_path))
-    update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"welcome_video_shown": True})
+    await update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"welcome_video_shown": True})
     await asyncio.sleep(1)
     
     await ask_to_record_video_command(update=update, context=context)
@@ -426,16 +430,16 @@ async def ask_to_record_video_command(update: Update, context: ContextTypes.DEFA
 
     bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
     logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
-    negotiation_id = get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
+    negotiation_id = await get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
 
-    if is_boolean_field_true_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="video_received"):
+    if await is_boolean_field_true_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="video_received"):
         logger.debug(f"{log_prefix}: user {bot_user_id} already has welcome video recorded.")
         await send_message_to_user(update, context, text=SUCCESS_TO_RECORD_VIDEO_TEXT)
         return
 
     # ----- CHECK MUST CONDITIONS are met and STOP if not -----
 
-    if not is_boolean_field_true_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="privacy_policy_confirmed"):
+    if not await is_boolean_field_true_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="privacy_policy_confirmed"):
         logger.debug(f"{log_prefix}: user {bot_user_id} doesn't have privacy policy confirmed.")
         await send_message_to_user(update, context, text=MISSING_PRIVACY_POLICY_CONFIRMATION_TEXT)
         return
@@ -489,7 +493,7 @@ async def handle_answer_confrim_sending_video(update: Update, context: ContextTy
 
     bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
     logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
-    negotiation_id = get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
+    negotiation_id = await get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
 
     # ------- UNDERSTAND WHAT BUTTON was clicked using generic questionnaire helper -------
 
@@ -510,7 +514,7 @@ async def handle_answer_confrim_sending_video(update: Update, context: ContextTy
 
     if sending_video_confirmation_user_decision == "yes":
 
-        update_column_value_by_field(
+        await update_column_value_by_field(
             db_model=Negotiations,
             search_field_name="id",
             search_value=negotiation_id,
@@ -577,48 +581,20 @@ async def say_goodbye_command(update: Update, context: ContextTypes.DEFAULT_TYPE
 # ------------ MAIN MENU related commands ------------
 ########################################################################################
 
-async def user_status(applicant_user_id: str) -> dict:
-    """Return high-level status flags for the applicant user."""
+async def user_status(applicant_user_id: str, status_snapshot: Optional[dict] = None) -> dict:
+    """Return high-level status flags for the applicant user (one DB query)."""
     status_dict: dict[str, bool] = {}
 
-    # Has this Telegram user ever created a negotiation record?
-    has_negotiation = is_value_in_db(
-        db_model=Negotiations,
-        field_name="tg_user_id",
-        value=applicant_user_id,
-    )
-    status_dict["bot_authorization"] = has_negotiation
+    if status_snapshot is None:
+        status_snapshot = await get_applicant_status_snapshot(tg_user_id=applicant_user_id)
 
+    # Has this Telegram user ever created a negotiation record?
     # If there is no negotiation yet, the rest of the steps are definitely not completed
-    if not has_negotiation:
-        status_dict["privacy_policy_confirmation"] = False
-        status_dict["welcome_video_shown"] = False
-        status_dict["resume_video_recorded"] = False
-        return status_dict
-
-    # Fetch negotiation id for this applicant
-    negotiation_id = get_column_value_by_field(
-        db_model=Negotiations,
-        search_field_name="tg_user_id",
-        search_value=applicant_user_id,
-        target_field_name="id",
-    )
-
-    status_dict["privacy_policy_confirmation"] = is_boolean_field_true_in_db(
-        db_model=Negotiations,
-        record_id=negotiation_id,
-        field_name="privacy_policy_confirmed",
-    )
-    status_dict["welcome_video_shown"] = is_boolean_field_true_in_db(
-        db_model=Negotiations,
-        record_id=negotiation_id,
-        field_name="welcome_video_shown",
-    )
-    status_dict["resume_video_recorded"] = is_boolean_field_true_in_db(
-        db_model=Negotiations,
-        record_id=negotiation_id,
-        field_name="video_received",
-    )
+    snapshot = status_snapshot or {}
+    status_dict["bot_authorization"] = status_snapshot is not None
+    status_dict["privacy_policy_confirmation"] = bool(snapshot.get("privacy_policy_confirmed"))
+    status_dict["welcome_video_shown"] = bool(snapshot.get("welcome_video_shown"))
+    status_dict["resume_video_recorded"] = bool(snapshot.get("video_received"))
 
     return status_dict
 
@@ -805,13 +781,13 @@ async def handle_feedback_message(update: Update, context: ContextTypes.DEFAULT_
             # Get user info for admin message
             user_info = ""
             try:
-                if is_value_in_db(db_model=Negotiations, field_name="tg_user_id", value=applicant_user_id):
-                    negotiation_id = get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=applicant_user_id, target_field_name="id")
-                    vacancy_id = get_column_value_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="vacancy_id")
-                    vacancy_name = get_column_value_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="name")
-                    username = get_column_value_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="tg_username")
-                    first_name = get_column_value_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="hh_first_name")
-                    last_name = get_column_value_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="hh_last_name")
+                if await is_value_in_db(db_model=Negotiations, field_name="tg_user_id", value=applicant_user_id):
+                    negotiation_id = await get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=applicant_user_id, target_field_name="id")
+                    vacancy_id = await get_column_value_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="vacancy_id")
+                    vacancy_name = await get_column_value_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="name")
+                    username = await get_column_value_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="tg_username")
+                    first_name = await get_column_value_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="hh_first_name")
+                    last_name = await get_column_value_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="hh_last_name")
                     user_info = (
                         f"Вакансия:{vacancy_name} / ID:{vacancy_id}",
                         f"Соискатель: Negotiation ID {negotiation_id} / User ID {applicant_user_id}, @{username}, {first_name} {last_name})"
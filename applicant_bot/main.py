@@ -21,6 +21,7 @@ from shared_services.constants import (
 )
 from shared_services.admin import admin_send_message_command
 from shared_services.logging_service import setup_logging
+from shared_services.database import dispose_async_engine
 
 # required for manager menu
 from telegram.ext import CommandHandler, MessageHandler, filters, ContextTypes
@@ -113,6 +114,11 @@ async def run_applicant_bot() -> None:
                 await application.shutdown()
             except Exception:
                 pass  # Ignore errors during shutdown
+            try:
+                # Close pooled async DB connections
+                await dispose_async_engine()
+            except Exception:
+                pass  # Ignore errors during DB pool disposal
             
             logger.info("Application graceful shut down is completed.")
 
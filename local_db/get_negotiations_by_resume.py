@@ -34,28 +34,29 @@ else:
         print("   Required variables: DATABASE_URL (and others for full functionality)")
         sys.exit(1)
 
-from shared_services.database import SessionLocal, Negotiations  # noqa: E402
-from sqlalchemy.inspection import inspect  # noqa: E402
+from shared_services.database import SessionLocal, Negotiations, get_non_deferred_columns  # noqa: E402
+from sqlalchemy import select  # noqa: E402
 
 
-def get_negotiations_by_resume_id(resume_id: str) -> List[Negotiations]:
-    """Get all negotiation records by resume_id."""
+def get_negotiations_by_resume_id(resume_id: str) -> List[dict]:
+    """Get all negotiation records (without heavy JSONB columns) by resume_id."""
     db = SessionLocal()
     try:
-        negotiations = db.query(Negotiations).filter(Negotiations.resume_id == resume_id).all()
+        # column-only select: heavy JSONB columns (deferred in the model) are not pulled for lists
+        negotiations = db.execute(
+            select(*get_non_deferred_columns(Negotiations)).where(Negotiations.resume_id == resume_id)
+        ).mappings().all()
 
         if negotiations:
             print("=" * 60)
             print(f"✅ Found {len(negotiations)} negotiation(s) with resume_id: {resume_id}")
             print("=" * 60)
-            mapper = inspect(Negotiations)
 
             for idx, negotiation in enumerate(negotiations, 1):
                 print(f"\n--- Negotiation #{idx} ---")
                 print("-" * 60)
-                for column in mapper.columns:
-                    value = getattr(negotiation, column.key)
-                    print(f"{column.key:28} {value}")
+                for column_name, value in negotiation.items():
+                    print(f"{column_name:28} {value}")
             return negotiations
         else:
             print(f"❌ No negotiations found with resume_id {resume_id}")
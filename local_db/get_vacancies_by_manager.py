@@ -22,27 +22,28 @@ load_dotenv()
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from shared_services.database import SessionLocal, Vacancies  # noqa: E402
-from sqlalchemy.inspection import inspect  # noqa: E402
+from shared_services.database import SessionLocal, Vacancies, get_non_deferred_columns  # noqa: E402
+from sqlalchemy import select  # noqa: E402
 
 
-def get_vacancies_by_manager_id(manager_id: str) -> Optional[list[Vacancies]]:
+def get_vacancies_by_manager_id(manager_id: str) -> Optional[list[dict]]:
     """Get all vacancies for a given manager_id."""
     db = SessionLocal()
     try:
-        vacancies = db.query(Vacancies).filter(Vacancies.manager_id == manager_id).all()
+        # column-only select: heavy JSONB columns (deferred in the model) are not pulled for lists
+        vacancies = db.execute(
+            select(*get_non_deferred_columns(Vacancies)).where(Vacancies.manager_id == manager_id)
+        ).mappings().all()
 
         if vacancies:
             print("=" * 60)
             print(f"✅ Found {len(vacancies)} vacancy(ies) for manager_id: {manager_id}")
             print("=" * 60)
-            mapper = inspect(Vacancies)
 
             for vac in vacancies:
                 print("-" * 60)
-                for column in mapper.columns:
-                    value = getattr(vac, column.key)
-                    print(f"{column.key:28} {value}")
+                for column_name, value in vac.items():
+                    print(f"{column_name:28} {value}")
             return vacancies
         else:
             print(f"❌ No vacancies found for manager_id {manager_id}")
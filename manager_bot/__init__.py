@@ -12,6 +12,7 @@ can import them as `from manager_bot import ...`.
 from .manager_bot import (
     create_manager_application,
     ai_task_queue,
+    followup_task_queue,
     start_command,
     ask_confirm_sending_video_command,
     read_vacancy_description_command,
@@ -20,6 +21,7 @@ from .manager_bot import (
 __all__ = [
     "create_manager_application",
     "ai_task_queue",
+    "followup_task_queue",
     "start_command",
     "ask_confirm_sending_video_command",
     "read_vacancy_description_command",
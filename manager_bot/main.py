@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import os
+import signal
 import sys
 from dotenv import load_dotenv
 from pathlib import Path
@@ -12,6 +13,7 @@ sys.path.insert(0, str(project_root))
 from manager_bot import (
     create_manager_application, 
     ai_task_queue, 
+    followup_task_queue,
     start_command,
 )
 from shared_services.admin import (
@@ -26,10 +28,14 @@ from shared_services.admin import (
     admin_update_db_command,
     admin_send_tg_link_and_change_employer_state_to_applicants_command,
     admin_get_new_applicant_videos_command,
+    admin_analyze_vacancy_resumes_command,
     admin_source_negotiations,
     admin_get_recommendation_visualization_command,
     admin_source_and_analyze_resume_command,
-    admin_get_sourcing_criterais_visualization_command
+    admin_get_sourcing_criterais_visualization_command,
+    admin_dead_letters_command,
+    admin_requeue_dead_letters_command,
+    admin_task_queue_stats_command,
 )
 
 
@@ -37,14 +43,19 @@ from shared_services.constants import (
     BTN_MENU,
     BTN_FEEDBACK,
     WELCOME_TEXT_WHEN_STARTING_BOT,
+    TASK_QUEUE_DRAIN_DEADLINE_SECS,
+    AI_TASK_QUEUE_CHECKPOINT_FILENAME,
 )
 
 from shared_services.data_service import (
     create_data_directories,
+    get_data_directory,
 )
 
 """from services.logging_service import setup_logging"""
 from shared_services.logging_service import setup_logging
+from shared_services.database import dispose_async_engine
+from shared_services.ai_service import close_ai_client
 
 
 # required for manager menu
@@ -104,20 +115,34 @@ async def run_manager_bot() -> None:
     application.add_handler(CommandHandler("admin_touch_new_applicants", admin_send_tg_link_and_change_employer_state_to_applicants_command))
     application.add_handler(CommandHandler("admin_get_new_appl_videos", admin_get_new_applicant_videos_command))
     application.add_handler(CommandHandler("admin_source_and_analyze_res", admin_source_and_analyze_resume_command))
+    application.add_handler(CommandHandler("admin_analyze_vacancy_res", admin_analyze_vacancy_resumes_command))
     application.add_handler(CommandHandler("admin_get_recom_visual", admin_get_recommendation_visualization_command))
     application.add_handler(CommandHandler("admin_send_recom_to_user", admin_send_recommendation_to_user_command))
     application.add_handler(CommandHandler("admin_send_message", admin_send_message_command))
     application.add_handler(CommandHandler("admin_pull_file", admin_pull_file_command))
     application.add_handler(CommandHandler("admin_push_file", admin_push_file_command))
     application.add_handler(CommandHandler("admin_update_db", admin_update_db_command))
+    application.add_handler(CommandHandler("admin_dead_letters", admin_dead_letters_command))
+    application.add_handler(CommandHandler("admin_requeue_dead_letters", admin_requeue_dead_letters_command))
+    application.add_handler(CommandHandler("admin_task_queue_stats", admin_task_queue_stats_command))
     # Add document handler with higher priority (group=-1 processes before group=0)
     # This ensures it's checked before other message handlers that might catch documents
     application.add_handler(MessageHandler(filters.Document.ALL, admin_push_file_document_handler), group=-1)
     
     # ------------- STARTING OF THE TASK QUEUE WORKER for AI related tasks-------------
 
+    # Postgres backend: fail on start if migrations were not applied (instead of failing every task later)
+    await ai_task_queue.check_backend()
     ai_task_queue.start_worker()
     logger.info("Task queue worker to process AI related tasks is started.")
+    followup_task_queue.start_worker()
+    logger.info("Task queue worker to process delayed follow-up tasks is started.")
+    # Tasks saved by drain on the previous shutdown (only when AI tasks are kept in memory, not in Postgres)
+    ai_task_queue_checkpoint_path = get_data_directory() / AI_TASK_QUEUE_CHECKPOINT_FILENAME
+    try:
+        await ai_task_queue.restore_checkpoint(ai_task_queue_checkpoint_path)
+    except Exception as e:
+        logger.error(f"Error restoring AI tasks from checkpoint: {e}", exc_info=True)
     
     # ------------- INITIALIZATION AND STARTING OF THE APPLICATION -------------
 
@@ -130,8 +155,14 @@ async def run_manager_bot() -> None:
 
         await application.updater.start_polling()
         logger.info("Bot is now polling for updates. Press Ctrl+C to stop.")
-        # Polling until shutdown signal is received
-        await asyncio.Event().wait()
+        # Polling until shutdown signal is received: Ctrl+C or SIGTERM from the orchestrator (main.py) on deploy
+        shutdown_event = asyncio.Event()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, shutdown_event.set)
+        except NotImplementedError:
+            pass  # signal handlers are not supported on Windows event loops
+        await shutdown_event.wait()
+        _shutting_down = True
 
     # ------------- SHUTDOWN OF THE APPLICATION -------------
 
@@ -144,32 +175,58 @@ async def run_manager_bot() -> None:
         if _shutting_down:
             logger.info("\nApplication is shutting down gracefully...")
 
-            # ------------- SHUTDOWN OF THE TASK QUEUE WORKER for AI related tasks -------------
+            # ------------- STOP RECEIVING UPDATES -------------
+            # Before draining the task queues: a handler running after drain could still put a task,
+            # and it would be lost (the queue is already collected and the checkpoint written)
 
-            try:
-                # Stop task queue worker that processes AI related tasks
-                await ai_task_queue.stop_worker(wait=True)
-                logger.info("Task queue worker that processes AI related tasks is stopped.")
-            except Exception as e:
-                logger.error(f"Error stopping task queue worker that processes AI related tasks: {e}")
-            
-            # ------------- SHUTDOWN OF THE APPLICATION in proper sequence -------------  
-            
             try:
                 # Stop getting updates from Telegram API
                 await application.updater.stop()  # Stop the updater first!
             except Exception:
                 pass  # Ignore errors during updater stop
             try:
-                # Stop the application
+                # Stop the application (waits for handlers that are processing updates)
                 await application.stop()
             except Exception:
                 pass  # Ignore errors during stop
+
+            # ------------- SHUTDOWN OF THE TASK QUEUE WORKER for AI related tasks -------------
+
+            try:
+                # Stop task queue worker that processes AI related tasks: running tasks get a deadline
+                # (instead of draining the whole queue), unfinished ones stay in Postgres or go to the checkpoint file
+                await ai_task_queue.drain(
+                    deadline=TASK_QUEUE_DRAIN_DEADLINE_SECS,
+                    checkpoint_path=get_data_directory() / AI_TASK_QUEUE_CHECKPOINT_FILENAME,
+                )
+                logger.info("Task queue worker that processes AI related tasks is stopped.")
+            except Exception as e:
+                logger.error(f"Error stopping task queue worker that processes AI related tasks: {e}")
+            try:
+                # Follow-ups not due yet are dropped (users waiting for OAuth can start authorization again from the menu)
+                await followup_task_queue.stop_worker(wait=False)
+                logger.info("Task queue worker that processes follow-up tasks is stopped.")
+            except Exception as e:
+                logger.error(f"Error stopping task queue worker that processes follow-up tasks: {e}")
+            
+            # ------------- SHUTDOWN OF THE APPLICATION in proper sequence -------------  
+            # (after the queues: tasks finishing within the drain deadline still send messages through application.bot)
+            
             try:
                 # Shutdown the application and clear all resources
                 await application.shutdown()
             except Exception:
                 pass  # Ignore errors during shutdown
+            try:
+                # Close pooled async DB connections
+                await dispose_async_engine()
+            except Exception:
+                pass  # Ignore errors during DB pool disposal
+            try:
+                # Close pooled OpenAI connections
+                await close_ai_client()
+            except Exception:
+                pass  # Ignore errors during OpenAI client closing
             
             logger.info("Application graceful shut down is completed.")
 
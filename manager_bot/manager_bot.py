@@ -35,6 +35,7 @@ from telegram.ext import (
 )
 
 from telegram.error import TelegramError
+from sqlalchemy.exc import OperationalError
 
 from shared_services.video_service import (
     process_incoming_video,
@@ -68,7 +69,16 @@ from shared_services.hh_service import (
 from shared_services.ai_service import (
     analyze_vacancy_with_ai, 
     format_sourcing_criterias_analysis_result_for_markdown,
-    analyze_resume_with_ai
+    analyze_resume_with_ai,
+    analyze_resumes_batch_with_ai,
+    RETRYABLE_AI_ERRORS,
+    AI_RESUME_BATCH_SIZE,
+)
+
+from shared_services.ai_batch_service import (
+    get_pending_negotiation_ids,
+    get_negotiation_resumes,
+    get_resume_sorting_updates,
 )
 
 from shared_services.questionnaire_service import (
@@ -82,18 +92,32 @@ from shared_services.questionnaire_service import (
 )
 
 
-from shared_services.task_queue_service import TaskQueue
+from shared_services.task_queue_service import (
+    TaskQueue,
+    RetryPolicy,
+    register_task,
+    DEDUP_REPLACE,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BULK,
+)
+from shared_services.task_store_service import PostgresTaskBackend
 
 from shared_services.constants import *
 
-from shared_services.db_service import (
+from shared_services.async_db_service import (
     is_boolean_field_true_in_db,
     update_record_in_db,
     create_new_record_in_db,
     is_value_in_db,
     get_column_value_in_db,
     get_column_value_by_field,
-    update_column_value_by_field
+    update_column_value_by_field,
+    get_columns,
+    get_negotiation_context,
+    update_columns_by_field,
+    update_records_in_db,
+    bulk_upsert_records_in_db,
+    get_manager_status_snapshot,
 )
 
 from shared_services.data_service import (
@@ -119,9 +143,27 @@ HH_CLIENT_ID = os.getenv("HH_CLIENT_ID")
 HH_CLIENT_SECRET = os.getenv("HH_CLIENT_SECRET")
 OAUTH_REDIRECT_URL = os.getenv("OAUTH_REDIRECT_URL")
 USER_AGENT = os.getenv("USER_AGENT")
+# "memory" - AI tasks are in-process only (drain checkpoint on shutdown), "postgres" - stored in queued_tasks table
+# and survive restarts; opt-in, needs scripts/migrate.py applied (checked on start, see main.py)
+TASK_QUEUE_BACKEND = os.getenv("TASK_QUEUE_BACKEND", "memory")
+
+# Global task queue for AI analysis tasks (separate lanes so vacancy analysis is not stuck behind resumes)
+ai_task_queue = TaskQueue(
+    maxsize=AI_TASK_QUEUE_MAXSIZE,
+    lanes=AI_TASK_QUEUE_LANES,
+    backend=PostgresTaskBackend() if TASK_QUEUE_BACKEND == "postgres" else None,
+    # transient failures are retried with backoff, the rest go to dead-letter (/admin_dead_letters)
+    retry_policy=RetryPolicy(
+        max_attempts=AI_TASK_MAX_ATTEMPTS,
+        base_delay=AI_TASK_RETRY_BASE_DELAY_SECS,
+        max_delay=AI_TASK_RETRY_MAX_DELAY_SECS,
+        retry_on=RETRYABLE_AI_ERRORS + (OperationalError,),
+    ),
+)
 
-# Global task queue for AI analysis tasks
-ai_task_queue = TaskQueue(maxsize=500)
+# Delayed follow-ups of user flows (OAuth polling, messages sent with a pause): handlers enqueue them with delay
+# and return right away. In-memory on purpose: tasks hold update / application objects and are short-lived
+followup_task_queue = TaskQueue(lanes={TASK_LANE_FOLLOWUPS: FOLLOWUP_TASK_QUEUE_WORKERS})
 
 
 ########################################################################################
@@ -208,19 +250,20 @@ async def setup_new_user_command(update: Update, context: ContextTypes.DEFAULT_T
 
         # ----- CHECK IF USER is in records and CREATE record and user directory if needed -----
         
-        if not is_value_in_db(db_model=Managers, field_name="id", value=bot_user_id):
-            create_new_record_in_db(db_model=Managers, record_id=bot_user_id)
+        if not await is_value_in_db(db_model=Managers, field_name="id", value=bot_user_id):
+            await create_new_record_in_db(db_model=Managers, record_id=bot_user_id)
             logger.info(f"{log_prefix}: user record created for user_id {bot_user_id}")
 
         # ------ ENRICH RECORDS with NEW USER DATA ------
 
         user_details = f"tg_user_id: {bot_user_id}\n"
         tg_user_attributes = ["username", "first_name", "last_name"]
+        tg_user_updates = {}
         for item in tg_user_attributes:
             tg_user_attribute_value = get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute=item)
             user_details += f"{item}: {tg_user_attribute_value}\n"
-            update_record_in_db(db_model=Managers, record_id=bot_user_id, updates={item: tg_user_attribute_value})
-            # If cannot update user records, ValueError is raised from method: update_user_records_with_top_level_key()
+            tg_user_updates[item] = tg_user_attribute_value
+        await update_record_in_db(db_model=Managers, record_id=bot_user_id, updates=tg_user_updates)
         logger.debug(f"{log_prefix}: user {bot_user_id} in user records is updated with telegram user attributes.")
         
         # ----- SEND NEW USER SETUP NOTIFICATION to admin  -----
@@ -255,13 +298,13 @@ async def ask_privacy_policy_confirmation_command(update: Update, context: Conte
         bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
         logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
 
-        if not is_value_in_db(db_model=Managers, field_name="id", value=bot_user_id):
+        if not await is_value_in_db(db_model=Managers, field_name="id", value=bot_user_id):
             await send_message_to_user(update, context, text=FAIL_TO_FIND_USER_IN_RECORDS_TEXT)
             raise ValueError(f"{log_prefix}: user {bot_user_id} not found in database")
 
         # ----- CHECK IF PRIVACY POLICY is already confirmed and STOP if it is -----
 
-        if is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="privacy_policy_confirmed"):
+        if await is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="privacy_policy_confirmed"):
             await send_message_to_user(update, context, text=SUCCESS_TO_GET_PRIVACY_POLICY_CONFIRMATION_TEXT)
             logger.info(f"{log_prefix}: privacy policy already confirmed for user_id {bot_user_id}")
             return
@@ -352,17 +395,14 @@ async def handle_answer_policy_confirmation(update: Update, context: ContextType
         privacy_policy_confirmation_user_decision = answer_key  # "yes" or "no"
 
         privacy_policy_confirmation_user_value = True if privacy_policy_confirmation_user_decision == "yes" else False
-        update_record_in_db(
-            db_model=Managers,
-            record_id=bot_user_id,
-            updates={"privacy_policy_confirmed": privacy_policy_confirmation_user_value},
-        )
-
         current_time = datetime.now(timezone.utc).isoformat()
-        update_record_in_db(
+        await update_record_in_db(
             db_model=Managers,
             record_id=bot_user_id,
-            updates={"privacy_policy_confirmation_time": current_time},
+            updates={
+                "privacy_policy_confirmed": privacy_policy_confirmation_user_value,
+                "privacy_policy_confirmation_time": current_time,
+            },
         )
 
         logger.debug(f"{log_prefix}: Privacy policy confirmation user {bot_user_id} decision: {privacy_policy_confirmation_user_decision} at {current_time}")
@@ -399,11 +439,11 @@ async def hh_authorization_command(update: Update, context: ContextTypes.DEFAULT
         logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
         
         # ----- CHECK IF NO Privacy policy consent or AUTHORIZAED already and STOP if it is -----
-        if not is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="privacy_policy_confirmed"):
+        if not await is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="privacy_policy_confirmed"):
             await send_message_to_user(update, context, text=MISSING_PRIVACY_POLICY_CONFIRMATION_TEXT)
             return
 
-        if is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="access_token_recieved"):
+        if await is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="access_token_recieved"):
             await send_message_to_user(update, context, text=SUCCESS_TO_HH_AUTHORIZATION_TEXT)
             return
 
@@ -428,48 +468,88 @@ async def hh_authorization_command(update: Update, context: ContextTypes.DEFAULT
         # ------ WAIT FOR USER AUTHORIZATION ------
 
         await send_message_to_user(update, context, text="⏳ Ожидаю авторизацию...")
-        # Wait for user to authorize - retry 5 times over ~60 seconds
-        max_attempts = 30
-        retry_delay = 6  # seconds between retries
-        endpoint_response = None
-        # Retry to get access token by state 5 times over ~60 seconds
-        for attempt in range(1, max_attempts + 1):
-            await asyncio.sleep(retry_delay)
-            endpoint_response = get_token_by_state(state=bot_user_id, bot_shared_secret=BOT_SHARED_SECRET)
-            
-            if endpoint_response is not None:
-                if endpoint_response is not CALLBACK_ENDPOINT_RESPONSE_WHEN_RECORDS_NOT_READY:
-                    logger.debug(f"Endpoint response: {endpoint_response}")
-                    access_token = get_access_token_from_callback_endpoint_resp(endpoint_response=endpoint_response)
-                    expires_at = get_expires_at_from_callback_endpoint_resp(endpoint_response=endpoint_response)
-                    if access_token is not None and expires_at is not None:
-                        update_record_in_db(db_model=Managers, record_id=bot_user_id, updates={"access_token_recieved": True})
-                        update_record_in_db(db_model=Managers, record_id=bot_user_id, updates={"access_token": access_token})
-                        update_record_in_db(db_model=Managers, record_id=bot_user_id, updates={"access_token_expires_at": expires_at})
-                        # If cannot update user records, ValueError is raised from method: update_user_records_with_top_level_key()
-
-                    logger.info(f"{log_prefix}: Authorization successful on attempt {attempt}. Access token '{access_token}' and expires_at '{expires_at}' updated in records.")
-                    await send_message_to_user(update, context, text=AUTH_SUCCESS_TEXT)
-
-                    if context.application:
-                        await send_message_to_admin(
-                            application=context.application,
-                            text=f"😎 New user {bot_user_id} has authorized on attempt {attempt}."
-                        )
+        # Token is checked by follow-up tasks every HH_AUTH_CHECK_INTERVAL_SECS, the handler returns right away
+        await followup_task_queue.put(
+            check_hh_authorization_followup,
+            update,
+            context,
+            attempt=1,
+            task_id=f"hh_auth_check_{bot_user_id}",
+            lane=TASK_LANE_FOLLOWUPS,
+            delay=HH_AUTH_CHECK_INTERVAL_SECS,
+        )
+    
+    except Exception as e:
+        logger.error(f"{log_prefix}: Failed: {e}", exc_info=True)
+        await send_message_to_user(update, context, text=FAIL_TECHNICAL_SUPPORT_TEXT)
+        # Send notification to admin about the error
+        if context.application:
+            await send_message_to_admin(
+                application=context.application,
+                text=f"⚠️ Error {log_prefix}: {e}\nUser ID: {bot_user_id if 'bot_user_id' in locals() else 'unknown'}"
+            )
 
-        # ----- PULL USER DATA from HH and enrich records with it -----
 
-                    await pull_user_data_from_hh_command(update=update, context=context)
-                    
-                    #Stop the loop after successful authorization
-                    break
-            else:
-                logger.debug(f"Attempt {attempt}/{max_attempts}: User hasn't authorized yet. Retrying...")
-        # If still None after all attempts, user didn't authorize
-        if endpoint_response is None:
-            await send_message_to_user(update, context, text=AUTH_FAILED_TEXT)
+async def check_hh_authorization_followup(update: Update, context: ContextTypes.DEFAULT_TYPE, attempt: int) -> None:
+    # TAGS: [user_related]
+    """
+    Follow-up of hh_authorization_command (runs in followup_task_queue): one check if the user has authorized.
+    If not yet - schedules the next check, after HH_AUTH_CHECK_MAX_ATTEMPTS checks tells the user that authorization failed.
+    """
+
+    log_prefix = "check_hh_authorization_followup"
+
+    try:
+        bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
+
+        endpoint_response = await asyncio.to_thread(get_token_by_state, state=bot_user_id, bot_shared_secret=BOT_SHARED_SECRET)
+
+        if endpoint_response is None or endpoint_response is CALLBACK_ENDPOINT_RESPONSE_WHEN_RECORDS_NOT_READY:
+            if attempt >= HH_AUTH_CHECK_MAX_ATTEMPTS:
+                logger.info(f"{log_prefix}: user {bot_user_id} hasn't authorized after {attempt} attempts")
+                await send_message_to_user(update, context, text=AUTH_FAILED_TEXT)
+                return
+            logger.debug(f"{log_prefix}: Attempt {attempt}/{HH_AUTH_CHECK_MAX_ATTEMPTS}: User hasn't authorized yet. Retrying...")
+            # replace: this task is still running under the same task_id, the next check is queued after it
+            await followup_task_queue.put(
+                check_hh_authorization_followup,
+                update,
+                context,
+                attempt=attempt + 1,
+                task_id=f"hh_auth_check_{bot_user_id}",
+                lane=TASK_LANE_FOLLOWUPS,
+                dedup=DEDUP_REPLACE,
+                delay=HH_AUTH_CHECK_INTERVAL_SECS,
+            )
             return
-    
+
+        logger.debug(f"Endpoint response: {endpoint_response}")
+        access_token = get_access_token_from_callback_endpoint_resp(endpoint_response=endpoint_response)
+        expires_at = get_expires_at_from_callback_endpoint_resp(endpoint_response=endpoint_response)
+        if access_token is not None and expires_at is not None:
+            await update_record_in_db(
+                db_model=Managers,
+                record_id=bot_user_id,
+                updates={
+                    "access_token_recieved": True,
+                    "access_token": access_token,
+                    "access_token_expires_at": expires_at,
+                },
+            )
+
+        logger.info(f"{log_prefix}: Authorization successful on attempt {attempt}. Access token '{access_token}' and expires_at '{expires_at}' updated in records.")
+        await send_message_to_user(update, context, text=AUTH_SUCCESS_TEXT)
+
+        if context.application:
+            await send_message_to_admin(
+                application=context.application,
+                text=f"😎 New user {bot_user_id} has authorized on attempt {attempt}."
+            )
+
+        # ----- PULL USER DATA from HH and enrich records with it -----
+
+        await pull_user_data_from_hh_command(update=update, context=context)
+
     except Exception as e:
         logger.error(f"{log_prefix}: Failed: {e}", exc_info=True)
         await send_message_to_user(update, context, text=FAIL_TECHNICAL_SUPPORT_TEXT)
@@ -493,24 +573,24 @@ async def pull_user_data_from_hh_command(update: Update, context: ContextTypes.D
 
         bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
         logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
-        access_token = get_column_value_in_db(db_model=Managers, record_id=bot_user_id, field_name="access_token")
+        access_token = await get_column_value_in_db(db_model=Managers, record_id=bot_user_id, field_name="access_token")
 
         # ----- CHECK IF USER DATA is already in records and STOP if it is -----
 
         # Check if user is already authorized, if not, pull user data from HH
-        if get_column_value_in_db(db_model=Managers, record_id=bot_user_id, field_name="hh_data") is not None:
+        if await get_column_value_in_db(db_model=Managers, record_id=bot_user_id, field_name="hh_data") is not None:
             logger.debug(f"{log_prefix}: user {bot_user_id} already has HH data in user record.")
             return 
             
         # ----- PULL USER DATA from HH and enrich records with it -----
 
         # Get user info from HH.ru API
-        hh_user_info = get_user_info_from_hh(access_token=access_token)
+        hh_user_info = await asyncio.to_thread(get_user_info_from_hh, access_token=access_token)
         # Clean user info received from HH.ru API
         cleaned_hh_user_info = clean_user_info_received_from_hh(user_info=hh_user_info)
         # Update user info from HH.ru API in records
         # Exception raised if fails
-        update_record_in_db(db_model=Managers, record_id=bot_user_id, updates={"hh_data": cleaned_hh_user_info})
+        await update_record_in_db(db_model=Managers, record_id=bot_user_id, updates={"hh_data": cleaned_hh_user_info})
 
         # ----- SELECT VACANCY -----
 
@@ -539,7 +619,7 @@ async def ask_to_record_video_command(update: Update, context: ContextTypes.DEFA
     logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
 
     # Get status of video received from Vacancies table by manager_id
-    is_vacancy_video_received = get_column_value_by_field(
+    is_vacancy_video_received = await get_column_value_by_field(
         db_model=Vacancies,
         search_field_name="manager_id",
         search_value=bot_user_id,
@@ -553,12 +633,12 @@ async def ask_to_record_video_command(update: Update, context: ContextTypes.DEFA
 
     # ----- CHECK MUST CONDITIONS are met and STOP if not -----
 
-    if not is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="privacy_policy_confirmed"):
+    if not await is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="privacy_policy_confirmed"):
         logger.debug(f"{log_prefix}: user {bot_user_id} doesn't have privacy policy confirmed.")
         await send_message_to_user(update, context, text=MISSING_PRIVACY_POLICY_CONFIRMATION_TEXT)
         return
 
-    if not is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="vacancy_selected"):
+    if not await is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="vacancy_selected"):
         logger.debug(f"{log_prefix}: user {bot_user_id} doesn't have target vacancy selected.")
         await send_message_to_user(update, context, text=MISSING_VACANCY_SELECTION_TEXT)
         return
@@ -634,7 +714,7 @@ async def handle_answer_confrim_sending_video(update: Update, context: ContextTy
 
         await send_message_to_user(update, context, text="⏳ Сохраняем видео...")
 
-        update_column_value_by_field(
+        await update_column_value_by_field(
             db_model=Vacancies,
             search_field_name="manager_id",
             search_value=bot_user_id,
@@ -698,28 +778,28 @@ async def select_vacancy_command(update: Update, context: ContextTypes.DEFAULT_T
 
         bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
         logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
-        access_token = get_column_value_in_db(db_model=Managers, record_id=bot_user_id, field_name="access_token")
+        access_token = await get_column_value_in_db(db_model=Managers, record_id=bot_user_id, field_name="access_token")
 
         # ----- CHECK IF Privacy confirmed and VACANCY is selected and STOP if it is -----
 
-        if not is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="privacy_policy_confirmed"):
+        if not await is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="privacy_policy_confirmed"):
             await send_message_to_user(update, context, text=MISSING_PRIVACY_POLICY_CONFIRMATION_TEXT)
             return
 
-        if is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="vacancy_selected"):
+        if await is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="vacancy_selected"):
             await send_message_to_user(update, context, text=SUCCESS_TO_SELECT_VACANCY_TEXT)
             return
 
         # ----- PULL ALL OPEN VACANCIES from HH and enrich records with it -----
 
-        employer_id = get_employer_id_from_json_value_from_db(db_model=Managers, record_id=bot_user_id)
+        employer_id = await asyncio.to_thread(get_employer_id_from_json_value_from_db, db_model=Managers, record_id=bot_user_id)
         if not employer_id:
             await send_message_to_user(update, context, text=FAILED_TO_GET_OPEN_VACANCIES_TEXT)
             # Raise exception to be caught by outer try-except block (which will notify admin)
             raise ValueError(f"No employer id found for user {bot_user_id}")
 
         # Get open vacancies from HH.ru API
-        all_employer_vacancies = get_employer_vacancies_from_hh(access_token=access_token, employer_id=employer_id)
+        all_employer_vacancies = await asyncio.to_thread(get_employer_vacancies_from_hh, access_token=access_token, employer_id=employer_id)
         if all_employer_vacancies is None:
             await send_message_to_user(update, context, text=FAILED_TO_GET_OPEN_VACANCIES_TEXT)
             # Raise exception to be caught by outer try-except block (which will notify admin)
@@ -837,13 +917,13 @@ async def handle_answer_select_vacancy(update: Update, context: ContextTypes.DEF
         vacancy_name_value = selected_option[0]
 
         # Create Vacancies record with required NOT NULL fields set immediately
-        update_record_in_db(
+        await update_record_in_db(
             db_model=Managers,
             record_id=bot_user_id,
             updates={"vacancy_selected": True},
         )
         logger.debug(f"{log_prefix}: Managers record updated with vacancy_selected = True")
-        create_new_record_in_db(
+        await create_new_record_in_db(
             db_model=Vacancies,
             record_id=target_vacancy_id,
             initial_values={
@@ -902,20 +982,20 @@ async def read_vacancy_description_command(update: Update, context: ContextTypes
     bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
     logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
 
-    access_token = get_column_value_in_db(
+    access_token = await get_column_value_in_db(
         db_model=Managers,
         record_id=bot_user_id,
         field_name="access_token",
     )
     # Find vacancy id for this manager (manager_id == bot_user_id)
-    target_vacancy_id = get_column_value_by_field(
+    target_vacancy_id = await get_column_value_by_field(
         db_model=Vacancies,
         search_field_name="manager_id",
         search_value=bot_user_id,
         target_field_name="id",
     )
 
-    target_vacancy_name = get_column_value_in_db(
+    target_vacancy_name = await get_column_value_in_db(
         db_model=Vacancies,
         record_id=target_vacancy_id,
         field_name="name",
@@ -923,7 +1003,7 @@ async def read_vacancy_description_command(update: Update, context: ContextTypes
     
     # ----- VALIDATE description received -----
 
-    if is_boolean_field_true_in_db(db_model=Vacancies, record_id=target_vacancy_id, field_name="description_recieved"):
+    if await is_boolean_field_true_in_db(db_model=Vacancies, record_id=target_vacancy_id, field_name="description_recieved"):
         await send_message_to_user(update, context, text=SUCCESS_TO_SELECT_VACANCY_TEXT)
         return
 
@@ -931,7 +1011,7 @@ async def read_vacancy_description_command(update: Update, context: ContextTypes
 
         # ----- PULL VACANCY DESCRIPTION from HH and save it to file -----
         
-        vacancy_description = get_vacancy_description_from_hh(access_token=access_token, vacancy_id=target_vacancy_id)
+        vacancy_description = await asyncio.to_thread(get_vacancy_description_from_hh, access_token=access_token, vacancy_id=target_vacancy_id)
 
 
         if vacancy_description is None:
@@ -942,8 +1022,11 @@ async def read_vacancy_description_command(update: Update, context: ContextTypes
         
         # ----- SAVE VACANCY DESCRIPTION to file and update records -----
 
-        update_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=target_vacancy_id, target_field_name="description_recieved", new_value=True)
-        update_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=target_vacancy_id, target_field_name="description_json", new_value=vacancy_description)
+        await update_record_in_db(
+            db_model=Vacancies,
+            record_id=target_vacancy_id,
+            updates={"description_recieved": True, "description_json": vacancy_description},
+        )
 
         # ----- SEND NEW USER SETUP NOTIFICATION to admin  -----
 
@@ -970,10 +1053,11 @@ async def read_vacancy_description_command(update: Update, context: ContextTypes
 ########################################################################################
 
 
-async def define_sourcing_criterias_triggered_by_admin_command(vacancy_id: str) -> None:
+async def define_sourcing_criterias_triggered_by_admin_command(vacancy_id: str) -> Optional[asyncio.Future]:
     # TAGS: [vacancy_related]
     """Prepare everything for vacancy description analysis and 
     create TaksQueue job to get sourcing criteria from AI and save it to file.
+    Returns the queued task future: await it to wait for the analysis to finish.
     """
 
     log_prefix = "define_sourcing_criterias_triggered_by_admin_command"
@@ -984,22 +1068,22 @@ async def define_sourcing_criterias_triggered_by_admin_command(vacancy_id: str)
 
         # ----- VALIDATE VACANCY IS SELECTED and has description and sourcing criterias exist -----
 
-        if not is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
+        if not await is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
             raise ValueError(f"Vacancy {vacancy_id} not found in database.")
 
-        if not is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="description_recieved"):
+        if not await is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="description_recieved"):
             raise ValueError(f"Vacancy description is not received for vacancy {vacancy_id}.")
 
         # ----- CHECK IF SOURCING CRITERIA is already derived and STOP if it is -----
 
-        if is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="sourcing_criterias_recieved"):
+        if await is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="sourcing_criterias_recieved"):
             raise ValueError(f"Sourcing criterias is received already for vacancy {vacancy_id}.")
 
         # ----- DO AI ANALYSIS of the vacancy description  -----
 
         
         # Get files paths for AI analysis
-        vacancy_description=get_column_value_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="description_json")
+        vacancy_description=await get_column_value_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="description_json")
         prompt_file_path = Path(PROMPT_DIR) / "for_vacancy.txt"
 
         # Load inputs for AI analysis
@@ -1007,12 +1091,15 @@ async def define_sourcing_criterias_triggered_by_admin_command(vacancy_id: str)
             prompt_text = f.read()
 
         # Add AI analysis task to queue
-        await ai_task_queue.put(
+        return await ai_task_queue.put(
             get_sourcing_criterias_from_ai_and_save_to_db,
             vacancy_id,
             vacancy_description,
             prompt_text,
-            task_id=f"vacancy_analysis_{vacancy_id}"
+            task_id=f"vacancy_analysis_{vacancy_id}",
+            lane=TASK_LANE_VACANCY_ANALYSIS,
+            # manager onboarding waits for sourcing criterias
+            priority=PRIORITY_INTERACTIVE,
         )  
 
     except Exception as e:
@@ -1020,6 +1107,7 @@ async def define_sourcing_criterias_triggered_by_admin_command(vacancy_id: str)
         raise 
 
 
+@register_task()
 async def get_sourcing_criterias_from_ai_and_save_to_db(
     vacancy_id: str,
     vacancy_description: dict,
@@ -1041,15 +1129,18 @@ async def get_sourcing_criterias_from_ai_and_save_to_db(
     try:
         # ----- CALL AI ANALYZER -----
 
-        vacancy_analysis_result = analyze_vacancy_with_ai(
+        vacancy_analysis_result = await analyze_vacancy_with_ai(
             vacancy_data=vacancy_description,
             prompt_vacancy_analysis_text=prompt_text
         )
 
         # ----- SAVE SOURCING CRITERIAS to DB -----
 
-        update_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="sourcing_criterias_recieved", new_value=True)
-        update_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="sourcing_criterias_json", new_value=vacancy_analysis_result)
+        await update_record_in_db(
+            db_model=Vacancies,
+            record_id=vacancy_id,
+            updates={"sourcing_criterias_recieved": True, "sourcing_criterias_json": vacancy_analysis_result},
+        )
         
 
         # ----- SEND NEW USER SETUP NOTIFICATION to admin  -----
@@ -1071,12 +1162,12 @@ async def send_sourcing_criterias_and_questionnaire_to_user_triggered_by_admin_c
 
     try:
 
-        bot_user_id = get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="manager_id")
+        bot_user_id = await get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="manager_id")
         if not bot_user_id:
             raise ValueError(f"Manager ID not found for vacancy {vacancy_id}")
 
         # Format and send result to user
-        formatted_result = format_sourcing_criterias_analysis_result_for_markdown(vacancy_id=vacancy_id)
+        formatted_result = await asyncio.to_thread(format_sourcing_criterias_analysis_result_for_markdown, vacancy_id=vacancy_id)
         
         if application and application.bot:
             await application.bot.send_message(
@@ -1084,12 +1175,16 @@ async def send_sourcing_criterias_and_questionnaire_to_user_triggered_by_admin_c
                 text=f"{INFO_ABOUT_SOURCING_CRITERIAS_TEXT}\n\n{formatted_result}",
                 parse_mode=ParseMode.MARKDOWN
             )
-            await asyncio.sleep(1)
 
-            # Ask for sourcing criterias confirmation using Application-based helper
-            await ask_sourcing_criterias_confirmation_via_application(
+            # Ask for sourcing criterias confirmation using Application-based helper, after a pause
+            # (follow-up task instead of sleeping here)
+            await followup_task_queue.put(
+                ask_sourcing_criterias_confirmation_via_application,
                 bot_user_id=str(bot_user_id),
                 application=application,
+                task_id=f"ask_sourcing_criterias_confirmation_{bot_user_id}",
+                lane=TASK_LANE_FOLLOWUPS,
+                delay=1,
             )
 
         else:
@@ -1112,7 +1207,7 @@ async def ask_sourcing_criterias_confirmation_via_application(bot_user_id: str,
         logger.info(f"{log_prefix}: started. user_id: {bot_user_id}")
 
         # ----- CHECK IF USER EXISTS IN DATABASE -----
-        if not is_value_in_db(db_model=Managers, field_name="id", value=bot_user_id):
+        if not await is_value_in_db(db_model=Managers, field_name="id", value=bot_user_id):
             if application and application.bot:
                 await application.bot.send_message(
                     chat_id=int(bot_user_id),
@@ -1228,8 +1323,15 @@ async def handle_answer_sourcing_criterias_confirmation(update: Update, context:
     if sourcing_criterias_confirmation_user_decision == "yes":
 
         sourcing_criterias_confirmation_user_value = True
-        update_column_value_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, target_field_name="sourcing_criterias_confirmed", new_value=sourcing_criterias_confirmation_user_value)
-        update_column_value_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, target_field_name="sourcing_criterias_confirmation_time", new_value=current_time)
+        await update_columns_by_field(
+            db_model=Vacancies,
+            search_field_name="manager_id",
+            search_value=bot_user_id,
+            updates={
+                "sourcing_criterias_confirmed": sourcing_criterias_confirmation_user_value,
+                "sourcing_criterias_confirmation_time": current_time,
+            },
+        )
         
         user_msg = f"{SUCCESS_TO_GET_SOURCING_CRITERIAS_CONFIRMATION_TEXT}\n{SUCCESS_TO_START_SOURCING_TEXT}"
         admin_msg = f"😎 User {bot_user_id} has confirmed sourcing criterias. Start sourcing manually."
@@ -1237,7 +1339,7 @@ async def handle_answer_sourcing_criterias_confirmation(update: Update, context:
     elif sourcing_criterias_confirmation_user_decision == "no":
 
         sourcing_criterias_confirmation_user_value = False
-        update_column_value_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, target_field_name="sourcing_criterias_confirmed", new_value=sourcing_criterias_confirmation_user_value)
+        await update_column_value_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, target_field_name="sourcing_criterias_confirmed", new_value=sourcing_criterias_confirmation_user_value)
 
         user_msg = f"Хорошо, расскажите, почему вы не согласны с критериями отбора кандидатов.\n\nПришлите аудио-запись прямо в этот чат, пожалуйста.\n\nЯ подправлю критерии и пришлю на согласование снова."
         admin_msg = f"😎 User {bot_user_id} has NOT confirmed sourcing criterias. Asked for feedback. Waiting."
@@ -1266,8 +1368,8 @@ async def source_negotiations_triggered_by_admin_command(vacancy_id: str) -> Non
 
         # ----- IDENTIFY USER and pull required data from records -----
         
-        manager_id = get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="manager_id")
-        access_token = get_column_value_by_field(db_model=Managers, search_field_name="id", search_value=manager_id, target_field_name="access_token")
+        manager_id = await get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="manager_id")
+        access_token = await get_column_value_by_field(db_model=Managers, search_field_name="id", search_value=manager_id, target_field_name="access_token")
 
         # ----- IMPORTANT: do not check if NEGOTIATIONS COLLECTION file exists, we update it every time -----
 
@@ -1277,7 +1379,8 @@ async def source_negotiations_triggered_by_admin_command(vacancy_id: str) -> Non
         employer_state = EMPLOYER_STATE_RESPONSE
 
         #Get collection of negotiations data for the target collection status "response"
-        negotiations_collection_data = get_negotiations_collection_with_status_response(
+        negotiations_collection_data = await asyncio.to_thread(
+            get_negotiations_collection_with_status_response,
             access_token=access_token,
             vacancy_id=vacancy_id,
         )
@@ -1350,6 +1453,7 @@ async def parse_negotiations_collection_to_db(vacancy_id: str, negotiations_json
         
         logger.info(f"parse_negotiations_collection_to_db: Processing {len(items)} negotiations for vacancy {vacancy_id}")
         
+        negotiation_records = []
         for item in items:
             # Extract negotiation ID and resume ID
             negotiation_id = item.get("id")
@@ -1363,25 +1467,17 @@ async def parse_negotiations_collection_to_db(vacancy_id: str, negotiations_json
             if not resume_id:
                 logger.warning(f"parse_negotiations_collection_to_db: Skipping negotiation {negotiation_id} with missing resume.id")
                 continue
-            
+
             # Ensure negotiation_id and resume_id are strings
-            negotiation_id = str(negotiation_id)
-            resume_id = str(resume_id)
-            
-            # Check if negotiation record already exists
-            if not is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
-                # Create new record
-                create_new_record_in_db(
-                    db_model=Negotiations,
-                    record_id=negotiation_id,
-                    initial_values={
-                        "resume_id": resume_id,
-                        "vacancy_id": vacancy_id
-                    }
-                )
-                logger.debug(f"parse_negotiations_collection_to_db: Created negotiation {negotiation_id} with resume_id {resume_id}")
-            else:        
-                logger.debug(f"parse_negotiations_collection_to_db: Skipping^ cause negotiation {negotiation_id} exists in database")
+            negotiation_records.append({
+                "id": str(negotiation_id),
+                "resume_id": str(resume_id),
+                "vacancy_id": vacancy_id,
+            })
+
+        # Insert new negotiations in bulk, existing negotiations are left untouched
+        upsert_counts = await bulk_upsert_records_in_db(db_model=Negotiations, records=negotiation_records)
+        logger.info(f"parse_negotiations_collection_to_db: Created {upsert_counts['inserted']} negotiations, skipped {upsert_counts['existing']} existing")
         
         logger.info(f"parse_negotiations_collection_to_db: Successfully processed {len(items)} negotiations for vacancy {vacancy_id}")
     
@@ -1401,8 +1497,8 @@ async def send_tg_link_to_applicant_and_change_employer_state_triggered_by_admin
     try:
         logger.info(f"{log_prefix}: started. negotiation_id: {negotiation_id}")
 
-        send_message_to_applicant_command(negotiation_id=negotiation_id)
-        change_employer_state_command(negotiation_id=negotiation_id)
+        await send_message_to_applicant_command(negotiation_id=negotiation_id)
+        await change_employer_state_command(negotiation_id=negotiation_id)
         
 
         logger.info(f"{log_prefix}: successfully completed for negotiation_id: {negotiation_id}")
@@ -1421,18 +1517,20 @@ async def send_message_to_applicant_command(negotiation_id: str) -> None:
 
     # ----- IDENTIFY USER and pull required data from records -----
     
-    vacancy_id = get_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="vacancy_id")
-    manager_id = get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="manager_id")
-    access_token = get_column_value_by_field(db_model=Managers, search_field_name="id", search_value=manager_id, target_field_name="access_token")
+    negotiation_context = await get_negotiation_context(negotiation_id=negotiation_id)
+    access_token = negotiation_context["manager"]["access_token"] if negotiation_context else None
 
     tg_link = create_tg_bot_link_for_applicant(negotiation_id=negotiation_id)
     negotiation_message_text = APPLICANT_MESSAGE_TEXT_WITHOUT_LINK + f"{tg_link}"
     try:
-        send_negotiation_message(access_token=access_token, negotiation_id=negotiation_id, user_message=negotiation_message_text)
+        await asyncio.to_thread(send_negotiation_message, access_token=access_token, negotiation_id=negotiation_id, user_message=negotiation_message_text)
         logger.info(f"{log_prefix}: Message to applicant for negotiation ID: {negotiation_id} has been successfully sent")
-        update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="link_to_tg_bot_sent", new_value=True)
         current_time = datetime.now(timezone.utc).isoformat()
-        update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="link_to_tg_bot_sent_time", new_value=current_time)
+        await update_record_in_db(
+            db_model=Negotiations,
+            record_id=negotiation_id,
+            updates={"link_to_tg_bot_sent": True, "link_to_tg_bot_sent_time": current_time},
+        )
     except Exception as send_err:
         logger.error(f"{log_prefix}: Failed to send message for negotiation ID {negotiation_id}: {send_err}", exc_info=True)
         # stop method execution in this case, because no need to update resume_records and negotiations status
@@ -1448,16 +1546,16 @@ async def change_employer_state_command(negotiation_id: str) -> None:
     
     # ----- IDENTIFY USER and pull required data from records -----
         
-    vacancy_id = get_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="vacancy_id")
-    manager_id = get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="manager_id")
-    access_token = get_column_value_by_field(db_model=Managers, search_field_name="id", search_value=manager_id, target_field_name="access_token")
+    negotiation_context = await get_negotiation_context(negotiation_id=negotiation_id)
+    access_token = negotiation_context["manager"]["access_token"] if negotiation_context else None
 
    # ----- CHANGE EMPLOYER STATE  -----
 
     #await update.message.reply_text(f"Изменяю статус приглашения кандидата на {NEW_EMPLOYER_STATE}...")
     logger.debug(f"{log_prefix}: negotiation ID: {negotiation_id} to {EMPLOYER_STATE_CONSIDER}")
     try:
-        change_negotiation_collection_status_to_consider(
+        await asyncio.to_thread(
+            change_negotiation_collection_status_to_consider,
             access_token=access_token,
             negotiation_id=negotiation_id
         )
@@ -1477,14 +1575,18 @@ async def source_resume_triggered_by_admin_command(negotiation_id: str) -> None:
     try:
         
         # ----- IDENTIFY USER and pull required data from records -----
+        negotiation_context = await get_negotiation_context(negotiation_id=negotiation_id)
+        if negotiation_context is None:
+            raise ValueError(f"{log_prefix}: negotiation not found in database")
+
         err_msg = None
-        vacancy_id = get_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="vacancy_id")
+        vacancy_id = negotiation_context["negotiation"]["vacancy_id"]
         if vacancy_id is None: err_msg = f"vacancy_id"
-        manager_id = get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="manager_id")
+        manager_id = negotiation_context["vacancy"]["manager_id"]
         if manager_id is None: err_msg = f"manager_id"
-        access_token = get_column_value_by_field(db_model=Managers, search_field_name="id", search_value=manager_id, target_field_name="access_token")
+        access_token = negotiation_context["manager"]["access_token"]
         if access_token is None: err_msg = f"access_token"            
-        resume_id = get_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="resume_id")
+        resume_id = negotiation_context["negotiation"]["resume_id"]
         if resume_id is None: err_msg = f"resume_id"
         if err_msg:
             raise ValueError(f"{log_prefix}: {err_msg} not found in database")
@@ -1494,9 +1596,8 @@ async def source_resume_triggered_by_admin_command(negotiation_id: str) -> None:
 
         #Download resumes from HH.ru and save to file
         
-        resume_data = get_resume_info(access_token=access_token, resume_id=resume_id)
-        update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="resume_json", new_value=resume_data)
-        logger.debug(f"{log_prefix}: downloaded resume data to database")
+        resume_data = await asyncio.to_thread(get_resume_info, access_token=access_token, resume_id=resume_id)
+        logger.debug(f"{log_prefix}: downloaded resume data")
 
         # ----- ENRICH RESUME_RECORDS file with resume data -----
 
@@ -1531,24 +1632,33 @@ async def source_resume_triggered_by_admin_command(negotiation_id: str) -> None:
             logger.debug(f"{log_prefix}: No email found in resume data")
 
 
-        update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="hh_first_name", new_value=first_name)    
-        update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="hh_last_name", new_value=last_name)
-        update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="hh_phone", new_value=phone)
-        update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="hh_email", new_value=email)
+        await update_record_in_db(
+            db_model=Negotiations,
+            record_id=negotiation_id,
+            updates={
+                "resume_json": resume_data,
+                "hh_first_name": first_name,
+                "hh_last_name": last_name,
+                "hh_phone": phone,
+                "hh_email": email,
+            },
+        )
 
-        logger.debug(f"{log_prefix}: updated resume details in database")
+        logger.debug(f"{log_prefix}: saved resume data and resume details to database")
  
     except Exception as e:
         logger.error(f"{log_prefix}: Failed: {e}", exc_info=True)
         raise
 
 
-async def analyze_resume_triggered_by_admin_command(negotiation_id: str) -> None:
+async def analyze_resume_triggered_by_admin_command(negotiation_id: str, priority: int = PRIORITY_BULK) -> Optional[asyncio.Future]:
     # TAGS: [resume_related]
     """Analyzes resume with AI. 
     Sorts resumes into "passed" or "failed" directories based on the final score. 
     Triggers 'send_message_to_applicants_command' and 'change_employer_state_command' for each resume.
     Does not trigger any other commands once done.
+    Returns the queued task future: await it to get the analysis result (or its exception).
+    priority: PRIORITY_BULK for mass analysis, PRIORITY_INTERACTIVE when someone waits for this resume.
     """
     
     func_name = "analyze_resume_triggered_by_admin_command"
@@ -1559,55 +1669,68 @@ async def analyze_resume_triggered_by_admin_command(negotiation_id: str) -> None
     try:
         
         # ----- IDENTIFY USER and pull required data from records -----
+        negotiation_context = await get_negotiation_context(
+            negotiation_id=negotiation_id,
+            negotiation_fields=["id", "vacancy_id", "resume_json"],
+            vacancy_fields=["id", "description_json", "sourcing_criterias_json"],
+            manager_fields=[],
+        )
+        if negotiation_context is None:
+            raise ValueError(f"{log_prefix}: negotiation not found in database")
+
         err_msg = None
-        vacancy_id = get_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="vacancy_id")
+        vacancy_id = negotiation_context["negotiation"]["vacancy_id"]
         if vacancy_id is None: err_msg = f"vacancy_id"
-        manager_id = get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="manager_id")
-        if manager_id is None: err_msg = f"manager_id"
-        access_token = get_column_value_by_field(db_model=Managers, search_field_name="id", search_value=manager_id, target_field_name="access_token")
-        if access_token is None: err_msg = f"access_token"            
-        resume_id = get_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="resume_id")
-        if resume_id is None: err_msg = f"resume_id"
-        
-        resume_json = get_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="resume_json")
+        resume_json = negotiation_context["negotiation"]["resume_json"]
         if resume_json is None: err_msg = f"resume_json"
-        vacancy_description = get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="description_json")
+        vacancy_description = negotiation_context["vacancy"]["description_json"]
         if vacancy_description is None: err_msg = f"vacancy_description"
-        sourcing_criterias = get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="sourcing_criterias_json")
+        sourcing_criterias = negotiation_context["vacancy"]["sourcing_criterias_json"]
         if sourcing_criterias is None: err_msg = f"sourcing_criterias"
 
         if err_msg:
             raise ValueError(f"{log_prefix}: {err_msg} not found in database")
 
+        # Load prompt for AI analysis
+        prompt_file_path = Path(PROMPT_DIR) / "for_resume.txt"
+        with open(prompt_file_path, "r", encoding="utf-8") as f:
+            resume_analysis_prompt = f.read()
+
         # ----- QUEUE RESUMES for AI ANALYSIS -----
         
         # Add AI analysis task to queue
-        await ai_task_queue.put(
+        analysis_future = await ai_task_queue.put(
             resume_analysis_from_ai_to_user_sort_resume,
             negotiation_id,
             vacancy_description,
             sourcing_criterias,
-            resume_id,
             resume_json,
-            task_id=f"resume_analysis_{negotiation_id}"
+            resume_analysis_prompt,
+            vacancy_id=vacancy_id,
+            task_id=f"resume_analysis_{negotiation_id}",
+            lane=TASK_LANE_RESUME_ANALYSIS,
+            priority=priority,
         )
         logger.info(f"{log_prefix}: Added resume to analysis queue.")
+        return analysis_future
     except Exception as e:
         logger.error(f"{log_prefix}: Failed to queue resume analysis: {e}", exc_info=True)
         raise
    
 
 
+@register_task()
 async def resume_analysis_from_ai_to_user_sort_resume(
     negotiation_id: str,
     vacancy_description: dict,
     sourcing_criterias: dict,
     resume_json: dict,
     resume_analysis_prompt: str,
-    ) -> None:
+    vacancy_id: Optional[str] = None,
+    ) -> dict:
     """
     Wrapper function to process resume analysis result.
-    This function is executed through TaskQueue.
+    This function is executed through TaskQueue. Returns AI analysis result (the task future result).
     """
 
     func_name = "resume_analysis_from_ai_to_user_sort_resume"
@@ -1617,21 +1740,14 @@ async def resume_analysis_from_ai_to_user_sort_resume(
 
     try:
         # Call AI analyzer
-        ai_analysis_result = analyze_resume_with_ai(
+        ai_analysis_result = await analyze_resume_with_ai(
             vacancy_description=vacancy_description,
             sourcing_criterias=sourcing_criterias,
             resume_data=resume_json,
-            prompt_resume_analysis_text=resume_analysis_prompt
+            prompt_resume_analysis_text=resume_analysis_prompt,
+            vacancy_id=vacancy_id,
         )
         
-        # Update resume records with AI analysis results
-        update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="resume_ai_analysis", new_value=ai_analysis_result)
-        logger.debug(f"{log_prefix}: updated resume ai analysis in database")
-
-        resume_ai_score = str(ai_analysis_result.get("final_score", 0))
-        update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="resume_ai_score", new_value=resume_ai_score)
-        logger.debug(f"{log_prefix}: updated resume ai score in database")
-
         # Sort resume based on final score
         resume_ai_score = int(ai_analysis_result.get("final_score", 0))
         if resume_ai_score >= RESUME_PASSED_SCORE:
@@ -1639,11 +1755,123 @@ async def resume_analysis_from_ai_to_user_sort_resume(
         else:
             new_status = "failed"
 
-        resume_ai_score_str = str(resume_ai_score)
-        update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="resume_sorting_status", new_value=new_status)
-        logger.debug(f"{log_prefix}: updated resume sorting status in database")
-        update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="resume_ai_score", new_value=resume_ai_score_str)
-        logger.debug(f"{log_prefix}: updated resume ai score in database")
+        # Update resume records with AI analysis results in one statement
+        await update_record_in_db(
+            db_model=Negotiations,
+            record_id=negotiation_id,
+            updates={
+                "resume_ai_analysis": ai_analysis_result,
+                "resume_ai_score": str(resume_ai_score),
+                "resume_sorting_status": new_status,
+            },
+        )
+        logger.debug(f"{log_prefix}: updated resume ai analysis, score and sorting status in database")
+        return ai_analysis_result
+
+    except Exception as e:
+        logger.error(f"{log_prefix}: Failed: {e}", exc_info=True)
+        raise
+
+
+async def analyze_vacancy_resumes_triggered_by_admin_command(vacancy_id: str, priority: int = PRIORITY_BULK) -> List[asyncio.Future]:
+    # TAGS: [resume_related]
+    """Analyzes all unsorted resumes of the vacancy with AI in batches of AI_RESUME_BATCH_SIZE resumes per request.
+    Each batch is one task in the resume analysis lane. Returns the queued task futures.
+    """
+
+    func_name = "analyze_vacancy_resumes_triggered_by_admin_command"
+    log_prefix = f"{func_name}. Arguments {vacancy_id}"
+
+    logger.info(f"{log_prefix}: started")
+
+    try:
+        negotiation_ids = await get_pending_negotiation_ids(vacancy_id)
+        if not negotiation_ids:
+            logger.info(f"{log_prefix}: no resumes to analyze")
+            return []
+
+        # Load prompt for AI analysis
+        prompt_file_path = Path(PROMPT_DIR) / "for_resume.txt"
+        with open(prompt_file_path, "r", encoding="utf-8") as f:
+            resume_analysis_prompt = f.read()
+
+        # ----- QUEUE RESUME BATCHES for AI ANALYSIS -----
+
+        # only ids in task arguments: resumes are loaded by the task itself (small rows in the task store)
+        analysis_futures = []
+        for i in range(0, len(negotiation_ids), AI_RESUME_BATCH_SIZE):
+            batch_ids = negotiation_ids[i:i + AI_RESUME_BATCH_SIZE]
+            analysis_future = await ai_task_queue.put(
+                resume_batch_analysis_from_ai_to_user_sort_resumes,
+                vacancy_id,
+                batch_ids,
+                resume_analysis_prompt,
+                task_id=f"resume_batch_analysis_{vacancy_id}_{batch_ids[0]}",
+                lane=TASK_LANE_RESUME_ANALYSIS,
+                priority=priority,
+            )
+            if analysis_future is not None:
+                analysis_futures.append(analysis_future)
+        logger.info(f"{log_prefix}: {len(negotiation_ids)} resumes added to analysis queue in {len(analysis_futures)} batches.")
+        return analysis_futures
+    except Exception as e:
+        logger.error(f"{log_prefix}: Failed to queue resume batch analysis: {e}", exc_info=True)
+        raise
+
+
+@register_task()
+async def resume_batch_analysis_from_ai_to_user_sort_resumes(
+    vacancy_id: str,
+    negotiation_ids: List[str],
+    resume_analysis_prompt: str,
+    ) -> dict:
+    """
+    Analyzes a batch of resumes of one vacancy with one AI request and sorts them (same updates as
+    resume_analysis_from_ai_to_user_sort_resume). Executed through TaskQueue.
+    Returns {"sorted": count, "errors": {negotiation_id: error}}; resumes with errors stay unsorted ("new").
+    """
+
+    func_name = "resume_batch_analysis_from_ai_to_user_sort_resumes"
+    log_prefix = f"{func_name}. Arguments: {vacancy_id}, {len(negotiation_ids)} negotiations"
+
+    logger.info(f"{log_prefix}: started")
+
+    try:
+        vacancy = await get_columns(db_model=Vacancies, record_id=vacancy_id, fields=["description_json", "sourcing_criterias_json"])
+        if not vacancy or not vacancy["description_json"] or not vacancy["sourcing_criterias_json"]:
+            raise ValueError(f"{log_prefix}: vacancy description or sourcing criterias not found in database")
+        resumes = await get_negotiation_resumes(negotiation_ids)
+        errors = {negotiation_id: "resume not found in database" for negotiation_id in negotiation_ids if negotiation_id not in resumes}
+        sorted_ids = []
+
+        async def store_results(results: dict) -> None:
+            # Update resume records with AI analysis results, score and sorting status in one transaction
+            updates_by_id = {}
+            for negotiation_id, ai_analysis_result in results.items():
+                try:
+                    updates_by_id[negotiation_id] = get_resume_sorting_updates(ai_analysis_result)
+                except (TypeError, ValueError, AttributeError) as e:
+                    errors[negotiation_id] = f"invalid final_score: {e}"
+            if updates_by_id:
+                await update_records_in_db(db_model=Negotiations, updates_by_id=updates_by_id)
+            sorted_ids.extend(updates_by_id)
+
+        # Call AI analyzer (retryable OpenAI errors are raised and retried by the queue,
+        # results received before that are stored through on_results)
+        results, analysis_errors = await analyze_resumes_batch_with_ai(
+            vacancy_description=vacancy["description_json"],
+            sourcing_criterias=vacancy["sourcing_criterias_json"],
+            resumes=resumes,
+            prompt_resume_analysis_text=resume_analysis_prompt,
+            vacancy_id=vacancy_id,
+            on_results=store_results,
+        )
+        errors.update(analysis_errors)
+        await store_results(results)
+        if errors:
+            logger.warning(f"{log_prefix}: {len(errors)} resumes not analyzed: {errors}")
+        logger.debug(f"{log_prefix}: updated resume ai analysis, score and sorting status of {len(sorted_ids)} negotiations")
+        return {"sorted": len(sorted_ids), "errors": errors}
 
     except Exception as e:
         logger.error(f"{log_prefix}: Failed: {e}", exc_info=True)
@@ -1658,10 +1886,10 @@ async def send_recommendation_text_to_specified_user(whom_to_send: str, negotiat
 
     try:
 
-        if not is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
+        if not await is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
             raise ValueError(f"{log_prefix}: negotiation_id not found in database")
 
-        recommendation_text = get_resume_recommendation_text_from_resume_records(negotiation_id=negotiation_id)
+        recommendation_text = await asyncio.to_thread(get_resume_recommendation_text_from_resume_records, negotiation_id=negotiation_id)
         if recommendation_text is None:
             raise ValueError(f"{log_prefix}: recommendation_text not found in database")
 
@@ -1686,10 +1914,10 @@ async def send_recommendation_video_to_specified_user_without_questionnaire(whom
     logger.info(f"{log_prefix}: start")
 
     try:
-        if not is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
+        if not await is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
             raise ValueError(f"{log_prefix}: negotiation_id not found in database")
 
-        video_path = get_column_value_in_db(
+        video_path = await get_column_value_in_db(
             db_model=Negotiations,
             record_id=negotiation_id,
             field_name="video_path",
@@ -1726,10 +1954,10 @@ async def send_recommendation_video_to_specified_user_with_questionnaire(whom_to
     logger.info(f"{log_prefix}: start")
 
     try:
-        if not is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
+        if not await is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
             raise ValueError(f"{log_prefix}: negotiation_id not found in database")
 
-        video_path = get_column_value_in_db(
+        video_path = await get_column_value_in_db(
             db_model=Negotiations,
             record_id=negotiation_id,
             field_name="video_path",
@@ -1754,7 +1982,7 @@ async def send_recommendation_video_to_specified_user_with_questionnaire(whom_to
             logger.info(f"{log_prefix}: recommendation video has been successfully sent to user {whom_to_send}")
 
             current_time = datetime.now(timezone.utc).isoformat()
-            update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"resume_recommended": True, "resume_recommended_time": current_time})
+            await update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"resume_recommended": True, "resume_recommended_time": current_time})
             logger.debug(f"{log_prefix}: updated resume recommended status and time in database")
 
             # Ask a question with actions using generic questionnaire helper
@@ -1819,25 +2047,18 @@ async def handle_answer_invite_to_interview_button(update: Update, context: Cont
         except ValueError:
             raise ValueError(f"Invalid answer_key format for invite to interview: {answer_key}")
 
-        vacancy_id = get_column_value_in_db(
-            db_model=Negotiations,
-            record_id=negotiation_id,
-            field_name="vacancy_id",
-        )
+        negotiation_context = await get_negotiation_context(
+            negotiation_id=negotiation_id,
+            vacancy_fields=["id", "name", "manager_id"],
+            manager_fields=[],
+        ) or {"negotiation": {}, "vacancy": {}}
+        vacancy_id = negotiation_context["negotiation"].get("vacancy_id")
         if not vacancy_id:
             raise ValueError(f"{log_prefix}: vacancy_id not found in database for negotiation {negotiation_id}")
-        vacancy_name = get_column_value_in_db(
-            db_model=Vacancies,
-            record_id=vacancy_id,
-            field_name="name",
-        )
+        vacancy_name = negotiation_context["vacancy"].get("name")
         if not vacancy_name:
             raise ValueError(f"{log_prefix}: vacancy_name not found in database for vacancy {vacancy_id}")
-        manager_id = get_column_value_in_db(
-            db_model=Vacancies,
-            record_id=vacancy_id,
-            field_name="manager_id",
-        )
+        manager_id = negotiation_context["vacancy"].get("manager_id")
         if not manager_id:
             raise ValueError(f"{log_prefix}: manager_id not found in database for negotiation {negotiation_id}")
 
@@ -1846,7 +2067,7 @@ async def handle_answer_invite_to_interview_button(update: Update, context: Cont
         # Build admin message based on user action
         if action == "invite":
             
-            update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"resume_accepted": True, "resume_decision_time": current_time})
+            await update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"resume_accepted": True, "resume_decision_time": current_time})
 
             user_msg = f"✅ Свяжемся с вами, чтобы назначить время интервью."
 
@@ -1858,7 +2079,7 @@ async def handle_answer_invite_to_interview_button(update: Update, context: Cont
 
         elif action == "reject":
 
-            update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"resume_accepted": False, "resume_decision_time": current_time})
+            await update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"resume_accepted": False, "resume_decision_time": current_time})
             logger.debug(f"{log_prefix}: updated resume recommended status and time in database")
 
             user_msg = f"Хорошо, приглашать этого кандидата не будем.\nРасскажите, почему вы не согласны с критериями отбора кандидатов.\n\nПришлите аудио-запись прямо в этот чат, пожалуйста.\n\nЯ учту ваши пожелания и подправлю критерии отбора кандидатов."
@@ -1899,22 +2120,25 @@ async def handle_answer_invite_to_interview_button(update: Update, context: Cont
 # ------------ MAIN MENU related commands ------------
 ########################################################################################
 
-async def user_status(bot_user_id: str) -> dict:
+async def user_status(bot_user_id: str, status_snapshot: Optional[dict] = None) -> dict:
     
     log_prefix = "user_status"
     logger.info(f"{log_prefix}: start")
     logger.info(f"{log_prefix}: bot_user_id: {bot_user_id}")
 
-    status_dict = {}
-    status_dict["bot_authorization"] = is_value_in_db(db_model=Managers, field_name="id", value=bot_user_id)
-    status_dict["privacy_policy_confirmation"] = is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="privacy_policy_confirmed")
-    status_dict["hh_authorization"] = is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="access_token_recieved")
-    status_dict["vacancy_selection"] = is_boolean_field_true_in_db(db_model=Managers, record_id=bot_user_id, field_name="vacancy_selected")
+    # one query for all flags (manager joined with vacancy), unless caller already fetched it
+    if status_snapshot is None:
+        status_snapshot = await get_manager_status_snapshot(manager_id=bot_user_id)
+    snapshot = status_snapshot or {}
+    logger.info(f"{log_prefix}: vacancy_id: {snapshot.get('vacancy_id')}")
 
-    vacancy_id = get_column_value_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, target_field_name="id")
-    logger.info(f"{log_prefix}: vacancy_id: {vacancy_id}")
-    status_dict["vacancy_video_received"] = is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="video_received")
-    status_dict["sourcing_criterias_confirmed"] = is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="sourcing_criterias_confirmed")
+    status_dict = {}
+    status_dict["bot_authorization"] = status_snapshot is not None
+    status_dict["privacy_policy_confirmation"] = bool(snapshot.get("privacy_policy_confirmed"))
+    status_dict["hh_authorization"] = bool(snapshot.get("access_token_recieved"))
+    status_dict["vacancy_selection"] = bool(snapshot.get("vacancy_selected"))
+    status_dict["vacancy_video_received"] = bool(snapshot.get("vacancy_video_received"))
+    status_dict["sourcing_criterias_confirmed"] = bool(snapshot.get("sourcing_criterias_confirmed"))
 
 
     logger.info(f"{log_prefix}: status_dict: {status_dict}")
@@ -1922,7 +2146,7 @@ async def user_status(bot_user_id: str) -> dict:
     return status_dict
 
 
-async def build_user_status_text(bot_user_id: str, status_dict: dict) -> str:
+async def build_user_status_text(bot_user_id: str, status_dict: dict, status_snapshot: Optional[dict] = None) -> str:
 
     status_to_text_transcription = {
         "bot_authorization": " Авторизация в боте.",
@@ -1939,11 +2163,11 @@ async def build_user_status_text(bot_user_id: str, status_dict: dict) -> str:
         status_text = status_to_text_transcription[key]
         user_status_text += f"{status_image}{status_text}\n"
 
-    vacancy_id = get_column_value_in_db(db_model=Managers, record_id=bot_user_id, field_name="vacancy_id")
-    if vacancy_id: # not None
-        vacancy_name = get_column_value_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="name")
-        if vacancy_name: # not None
-            user_status_text += f"\nВакансия в работе: {vacancy_name}.\n"
+    if status_snapshot is None:
+        status_snapshot = await get_manager_status_snapshot(manager_id=bot_user_id)
+    vacancy_name = (status_snapshot or {}).get("vacancy_name")
+    if vacancy_name: # not None
+        user_status_text += f"\nВакансия в работе: {vacancy_name}.\n"
     return user_status_text
 
 
@@ -1956,8 +2180,9 @@ async def show_chat_menu_command(update: Update, context: ContextTypes.DEFAULT_T
 
     bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
     logger.info(f"{log_prefix}: user_id fetched {bot_user_id}")
-    status_dict = await user_status(bot_user_id=bot_user_id)
-    status_text = await build_user_status_text(bot_user_id=bot_user_id, status_dict=status_dict)
+    status_snapshot = await get_manager_status_snapshot(manager_id=bot_user_id)
+    status_dict = await user_status(bot_user_id=bot_user_id, status_snapshot=status_snapshot)
+    status_text = await build_user_status_text(bot_user_id=bot_user_id, status_dict=status_dict, status_snapshot=status_snapshot)
 
     status_to_button_transcription = {
         "bot_authorization": "Авторизация в боте",
@@ -2115,10 +2340,11 @@ async def handle_feedback_message(update: Update, context: ContextTypes.DEFAULT_
             # Get user info for admin message
 
             try:
-                if is_value_in_db(db_model=Managers, field_name="id", value=bot_user_id):
-                    username = get_column_value_in_db(db_model=Managers, field_name="username", value=bot_user_id)
-                    first_name = get_column_value_in_db(db_model=Managers, field_name="first_name", value=bot_user_id)
-                    last_name = get_column_value_in_db(db_model=Managers, field_name="last_name", value=bot_user_id)
+                manager_names = await get_columns(db_model=Managers, record_id=bot_user_id, fields=["username", "first_name", "last_name"])
+                if manager_names is not None:
+                    username = manager_names["username"]
+                    first_name = manager_names["first_name"]
+                    last_name = manager_names["last_name"]
                     user_info = f"Пользователь: ID: {bot_user_id}, @{username}, {first_name} {last_name})"
                 else:
                     user_info = f"Пользователь ID: {bot_user_id}, не найден в records."
@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
 """
 Idempotent schema migration entrypoint for Render.com (one-off job or bash).
-Creates schema_migrations table and applies initial schema (Base.metadata.create_all).
+Creates schema_migrations table and applies pending versions from MIGRATIONS in order
+(1: initial schema via Base.metadata.create_all, 2: lookup indexes, 3: durable task queue table,
+4: task_id dedup index,
+5: task retry backoff column,
+6: task priorities,
+7: task retry policy and lease expiration counter, ...).
 Safe to run multiple times. Exits non-zero on failure.
 Usage: python scripts/migrate.py (run from project root, or set PYTHONPATH to project root).
+       python scripts/migrate.py --check   (only verify that expected indexes exist)
 """
 import os
 import sys
@@ -31,64 +37,221 @@ logger = logging.getLogger("migrate")
 
 # Migration version for initial schema (create_all)
 SCHEMA_VERSION_INITIAL = 1
+# Indexes for hot lookup columns
+SCHEMA_VERSION_LOOKUP_INDEXES = 2
+# Table for the durable TaskQueue backend
+SCHEMA_VERSION_TASK_QUEUE = 3
+# Index for task_id deduplication in the task queue table
+SCHEMA_VERSION_TASK_QUEUE_DEDUP_INDEX = 4
+# Retry backoff (available_at) in the task queue table
+SCHEMA_VERSION_TASK_QUEUE_RETRY = 5
+# Priority and claim order in the task queue table
+SCHEMA_VERSION_TASK_QUEUE_PRIORITY = 6
+# Per-task retry policy and crash counter (separate from retry attempts) in the task queue table
+SCHEMA_VERSION_TASK_QUEUE_RETRY_POLICY = 7
+
+
+# --- Migration steps. Each step must be idempotent: it may be re-run after a partial failure. ---
+
+def _migration_initial_schema(engine) -> None:
+    """Version 1: create all tables (create_all is idempotent: existing tables are left unchanged)."""
+    from shared_services.database import Base
+    Base.metadata.create_all(bind=engine)
+
+
+# name -> DDL. Names must match Index(...) declarations in shared_services/database.py
+LOOKUP_INDEXES = {
+    # applicant_bot resolves users by tg_user_id on almost every handler
+    "ix_negotiations_tg_user_id":
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_negotiations_tg_user_id ON negotiations (tg_user_id)",
+    "ix_negotiations_resume_id":
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_negotiations_resume_id ON negotiations (resume_id)",
+    # also serves plain "WHERE vacancy_id = ..." lookups (leading column)
+    "ix_negotiations_vacancy_id_sorting_status":
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_negotiations_vacancy_id_sorting_status "
+        "ON negotiations (vacancy_id, resume_sorting_status)",
+    # admin: applicants of a vacancy who did not get TG bot link yet
+    "ix_negotiations_vacancy_id_link_not_sent":
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_negotiations_vacancy_id_link_not_sent "
+        "ON negotiations (vacancy_id) WHERE link_to_tg_bot_sent = false",
+    # manager_bot finds vacancy by manager_id
+    "ix_vacancies_manager_id":
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vacancies_manager_id ON vacancies (manager_id)",
+}
+
+
+def _migration_lookup_indexes(engine) -> None:
+    """Version 2: secondary indexes. CONCURRENTLY does not lock writes, but can't run inside a transaction."""
+    from sqlalchemy import text
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for index_name, ddl in LOOKUP_INDEXES.items():
+            # a failed CONCURRENTLY build leaves an INVALID index that IF NOT EXISTS would skip: drop it first
+            conn.execute(text(f"""
+                DO $$
+                BEGIN
+                    IF EXISTS (
+                        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                        WHERE c.relname = '{index_name}' AND NOT i.indisvalid
+                    ) THEN
+                        EXECUTE 'DROP INDEX {index_name}';
+                    END IF;
+                END $$;
+            """))
+            logger.info("Creating index %s...", index_name)
+            conn.execute(text(ddl))
+
+
+def _migration_task_queue(engine) -> None:
+    """Version 3: queued_tasks table (+ its index) for PostgresTaskBackend. New table, so plain create is fine."""
+    from shared_services.database import QueuedTasks
+    QueuedTasks.__table__.create(bind=engine, checkfirst=True)
+
+
+def _migration_task_queue_dedup_index(engine) -> None:
+    """Version 4: partial index on active task_id (already created by version 3 on fresh databases)."""
+    from sqlalchemy import text
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_queued_tasks_task_id_active "
+            "ON queued_tasks (task_id) WHERE status IN ('pending', 'running')"
+        ))
+
+
+
+def _migration_task_queue_retry(engine) -> None:
+    """Version 5: available_at column for retry backoff (already created by version 3 on fresh databases)."""
+    from sqlalchemy import text
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE queued_tasks ADD COLUMN IF NOT EXISTS available_at TIMESTAMP WITH TIME ZONE"))
+
+
+
+def _migration_task_queue_priority(engine) -> None:
+    """Version 6: priority / sort_key columns and claim-order index (already created by version 3 on fresh databases)."""
+    from sqlalchemy import text
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE queued_tasks ADD COLUMN IF NOT EXISTS priority INTEGER NOT NULL DEFAULT 10"))
+        conn.execute(text("ALTER TABLE queued_tasks ADD COLUMN IF NOT EXISTS sort_key DOUBLE PRECISION"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_queued_tasks_lane_status_sort_key ON queued_tasks (lane, status, sort_key)"
+        ))
+
+
+def _migration_task_queue_retry_policy(engine) -> None:
+    """Version 7: retry_policy / lease_expirations columns (already created by version 3 on fresh databases)."""
+    from sqlalchemy import text
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE queued_tasks ADD COLUMN IF NOT EXISTS retry_policy JSONB"))
+        conn.execute(text("ALTER TABLE queued_tasks ADD COLUMN IF NOT EXISTS lease_expirations INTEGER NOT NULL DEFAULT 0"))
+
+
+# (version, description, step) in the order they must be applied
+MIGRATIONS = [
+    (SCHEMA_VERSION_INITIAL, "initial schema", _migration_initial_schema),
+    (SCHEMA_VERSION_LOOKUP_INDEXES, "indexes for hot lookup columns", _migration_lookup_indexes),
+    (SCHEMA_VERSION_TASK_QUEUE, "durable task queue table", _migration_task_queue),
+    (SCHEMA_VERSION_TASK_QUEUE_DEDUP_INDEX, "task queue task_id dedup index", _migration_task_queue_dedup_index),
+    (SCHEMA_VERSION_TASK_QUEUE_RETRY, "task queue retry backoff column", _migration_task_queue_retry),
+    (SCHEMA_VERSION_TASK_QUEUE_PRIORITY, "task queue priorities", _migration_task_queue_priority),
+    (SCHEMA_VERSION_TASK_QUEUE_RETRY_POLICY, "task queue retry policy and lease expirations", _migration_task_queue_retry_policy),
+]
+
+
+def _get_applied_versions(engine) -> set:
+    from sqlalchemy import text
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        conn.commit()
+        rows = conn.execute(text("SELECT version FROM schema_migrations")).fetchall()
+    return {row[0] for row in rows}
 
 
 def run_migrate() -> bool:
     """
-    Apply migrations idempotently. Returns True on success, False on failure.
+    Apply pending migrations in version order. Returns True on success, False on failure.
     """
     try:
         from sqlalchemy import text
-        from shared_services.database import get_engine, Base
+        from shared_services.database import get_engine
     except Exception as e:
         logger.error("Failed to import database: %s", e)
         return False
 
     engine = get_engine()
-    # Create schema_migrations table if not exists
-    with engine.connect() as conn:
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS schema_migrations (
-                version INTEGER PRIMARY KEY,
-                applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    applied_versions = _get_applied_versions(engine)
+
+    pending = [m for m in MIGRATIONS if m[0] not in applied_versions]
+    if not pending:
+        logger.info("Schema version %s already applied; nothing to do.", MIGRATIONS[-1][0])
+        return True
+
+    for version, description, step in pending:
+        logger.info("Applying schema version %s (%s)...", version, description)
+        try:
+            step(engine)
+        except Exception as e:
+            logger.error("Schema version %s failed: %s", version, e)
+            return False
+
+        # Record version
+        with engine.connect() as conn:
+            conn.execute(
+                text("INSERT INTO schema_migrations (version) VALUES (:v) ON CONFLICT (version) DO NOTHING"),
+                {"v": version},
             )
-        """))
-        conn.commit()
+            conn.commit()
 
-    # Check if initial schema already applied
-    with engine.connect() as conn:
-        row = conn.execute(
-            text("SELECT 1 FROM schema_migrations WHERE version = :v"),
-            {"v": SCHEMA_VERSION_INITIAL},
-        ).fetchone()
-        if row:
-            logger.info("Schema version %s already applied; nothing to do.", SCHEMA_VERSION_INITIAL)
-            return True
-
-    # Apply initial schema (create_all is idempotent: existing tables are left unchanged)
-    logger.info("Applying initial schema (version %s)...", SCHEMA_VERSION_INITIAL)
+    logger.info("Migration completed successfully (version %s).", MIGRATIONS[-1][0])
+    return True
+
+
+def verify_indexes() -> bool:
+    """
+    Check that all expected indexes exist and are valid. Logs missing ones. Returns True if all present.
+    """
     try:
-        Base.metadata.create_all(bind=engine)
+        from sqlalchemy import text
+        from shared_services.database import get_engine
     except Exception as e:
-        logger.error("Schema create_all failed: %s", e)
+        logger.error("Failed to import database: %s", e)
         return False
 
-    # Record version
-    with engine.connect() as conn:
-        conn.execute(
-            text("INSERT INTO schema_migrations (version) VALUES (:v)"),
-            {"v": SCHEMA_VERSION_INITIAL},
-        )
-        conn.commit()
+    with get_engine().connect() as conn:
+        rows = conn.execute(
+            text("""
+                SELECT c.relname, i.indisvalid
+                FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = ANY(:names)
+            """),
+            {"names": list(LOOKUP_INDEXES.keys())},
+        ).fetchall()
+    existing = {row[0]: row[1] for row in rows}
 
-    logger.info("Migration completed successfully (version %s).", SCHEMA_VERSION_INITIAL)
-    return True
+    all_present = True
+    for index_name in LOOKUP_INDEXES:
+        if index_name not in existing:
+            logger.warning("Index %s is missing", index_name)
+            all_present = False
+        elif not existing[index_name]:
+            logger.warning("Index %s exists but is INVALID (re-run migrate)", index_name)
+            all_present = False
+        else:
+            logger.info("Index %s OK", index_name)
+    return all_present
 
 
 def main():
     if not os.getenv("DATABASE_URL"):
         logger.error("DATABASE_URL is not set. Set it in environment or .env.")
         sys.exit(1)
+    # --check: only verify indexes, do not migrate
+    if "--check" in sys.argv[1:]:
+        sys.exit(0 if verify_indexes() else 1)
     if run_migrate():
         sys.exit(0)
     sys.exit(1)
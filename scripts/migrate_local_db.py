@@ -3,7 +3,7 @@
 Idempotent schema migration for local development.
 Uses DATABASE_URL_LOCAL from .env if set (so you can keep DATABASE_URL for Render);
 otherwise falls back to DATABASE_URL.
-Creates schema_migrations table and applies initial schema (Base.metadata.create_all).
+Creates schema_migrations table and applies pending versions (same chain as scripts/migrate.py).
 Safe to run multiple times. Exits non-zero on failure.
 
 Usage (from project root):
@@ -41,61 +41,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger("migrate_local_db")
 
-SCHEMA_VERSION_INITIAL = 1
-
-
 def run_migrate_local() -> bool:
-    """Apply migrations idempotently to local DB. Returns True on success, False on failure."""
+    """Apply the same migration chain as scripts/migrate.py to local DB. Returns True on success, False on failure."""
     try:
-        from sqlalchemy import text
-        from shared_services.database import get_engine, Base
+        from shared_services.database import get_engine
+        from scripts.migrate import run_migrate
     except Exception as e:
         logger.error("Failed to import database: %s", e)
         return False
 
-    engine = get_engine()
-    url = engine.url
+    url = get_engine().url
     db_info = f"{url.host or 'localhost'}:{url.port or 5432}/{url.database}"
     logger.info("Local migration targeting database: %s", db_info)
 
-    # Create schema_migrations table if not exists
-    with engine.connect() as conn:
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS schema_migrations (
-                version INTEGER PRIMARY KEY,
-                applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-            )
-        """))
-        conn.commit()
-
-    # Check if initial schema already applied
-    with engine.connect() as conn:
-        row = conn.execute(
-            text("SELECT 1 FROM schema_migrations WHERE version = :v"),
-            {"v": SCHEMA_VERSION_INITIAL},
-        ).fetchone()
-        if row:
-            logger.info("Schema version %s already applied; nothing to do.", SCHEMA_VERSION_INITIAL)
-            return True
-
-    # Apply initial schema
-    logger.info("Applying initial schema (version %s)...", SCHEMA_VERSION_INITIAL)
-    try:
-        Base.metadata.create_all(bind=engine)
-    except Exception as e:
-        logger.error("Schema create_all failed: %s", e)
-        return False
-
-    # Record version
-    with engine.connect() as conn:
-        conn.execute(
-            text("INSERT INTO schema_migrations (version) VALUES (:v)"),
-            {"v": SCHEMA_VERSION_INITIAL},
-        )
-        conn.commit()
-
-    logger.info("Local migration completed successfully (version %s).", SCHEMA_VERSION_INITIAL)
-    return True
+    return run_migrate()
 
 
 def main():
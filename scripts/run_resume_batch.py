@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Overnight resume scoring of one vacancy through the OpenAI Batch API (shared_services/ai_batch_service.py).
+Writes requests for all negotiations with status "new", waits for the batch job (up to 24h)
+and stores analysis, score and sorting status of each negotiation.
+Usage: python scripts/run_resume_batch.py <vacancy_id> (run from project root, or set PYTHONPATH to project root).
+       python scripts/run_resume_batch.py <vacancy_id> --prompt path/to/for_resume.txt
+       python scripts/run_resume_batch.py <vacancy_id> --poll-interval 300
+       python scripts/run_resume_batch.py <vacancy_id> --release   (after a crashed run: negotiations marked
+                                                                    as submitted go back to "new")
+"""
+import os
+import sys
+import asyncio
+import logging
+import argparse
+
+# Project root = parent of scripts/
+_script_dir = os.path.dirname(os.path.abspath(__file__))
+_project_root = os.path.dirname(_script_dir)
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
+# Load env before importing database (needs DATABASE_URL)
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger("run_resume_batch")
+
+DEFAULT_PROMPT_PATH = os.path.join(_project_root, "manager_bot", "docs", "ai_prompts", "for_resume.txt")
+
+
+def main() -> None:
+    from shared_services.ai_batch_service import (
+        run_resume_batch_job,
+        release_submitted_negotiations,
+        BATCH_POLL_INTERVAL_SECS,
+        BATCH_STATUS_COMPLETED,
+    )
+
+    parser = argparse.ArgumentParser(description="Score pending resumes of a vacancy with the OpenAI Batch API")
+    parser.add_argument("vacancy_id")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT_PATH, help="resume analysis prompt file")
+    parser.add_argument("--poll-interval", type=float, default=BATCH_POLL_INTERVAL_SECS, help="seconds between status checks")
+    parser.add_argument("--release", action="store_true", help="only return negotiations left submitted by a crashed run to 'new'")
+    args = parser.parse_args()
+
+    if args.release:
+        released = asyncio.run(release_submitted_negotiations(args.vacancy_id))
+        logger.info(f"Released {released} negotiations")
+        return
+
+    with open(args.prompt, "r", encoding="utf-8") as f:
+        prompt_text = f.read()
+
+    stats = asyncio.run(run_resume_batch_job(args.vacancy_id, prompt_text, poll_interval=args.poll_interval))
+    logger.info(f"Batch job finished: {stats}")
+    if stats["requests"] and stats["status"] != BATCH_STATUS_COMPLETED:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,20 +17,23 @@ from telegram import Update, InputFile
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes, Application
 from telegram.error import TelegramError
+from sqlalchemy import select
 
 from shared_services.constants import (
     FAIL_TO_IDENTIFY_USER_AS_ADMIN_TEXT,
     FAIL_TECHNICAL_SUPPORT_TEXT,
-    INFO_ABOUT_SOURCING_CRITERIAS_TEXT
+    INFO_ABOUT_SOURCING_CRITERIAS_TEXT,
+    ADMIN_TASK_WAIT_TIMEOUT_SECS,
 )
 
-from shared_services.db_service import (
+from shared_services.async_db_service import (
     is_value_in_db,
     is_boolean_field_true_in_db,
     update_record_in_db,
     get_column_value_in_db,
     get_column_value_by_field,
-    update_column_value_by_field
+    update_column_value_by_field,
+    update_records_in_db,
 )
 
 from shared_services.data_service import (
@@ -39,9 +42,13 @@ from shared_services.data_service import (
 
 from shared_services.ai_service import (
     format_sourcing_criterias_analysis_result_for_markdown,
+    get_ai_cache,
+    AI_CACHE_ENABLED,
+    resume_projection_stats,
+    prompt_cache_stats,
 )
 
-from shared_services.database import Managers, Vacancies, Negotiations, Base, SessionLocal
+from shared_services.database import Managers, Vacancies, Negotiations, Base, get_async_session
 
 
 
@@ -51,8 +58,9 @@ from shared_services.data_service import (
 )
 
 from shared_services.questionnaire_service import send_message_to_user
+from shared_services.task_queue_service import PRIORITY_INTERACTIVE
 
-from manager_bot.manager_bot import send_message_to_admin
+from manager_bot.manager_bot import send_message_to_admin, ai_task_queue
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +75,18 @@ async def _is_user_admin(bot_user_id: str) -> bool:
         return True
 
 
+async def _wait_for_queued_task(task_future: Optional[asyncio.Future], timeout: float = ADMIN_TASK_WAIT_TIMEOUT_SECS) -> bool:
+    """Wait for a task returned by ai_task_queue.put. True when it finished, False on timeout.
+    Re-raises the task's exception. shield: on timeout the task keeps running in the queue."""
+    if task_future is None:
+        return False
+    try:
+        await asyncio.wait_for(asyncio.shield(task_future), timeout=timeout)
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
 async def admin_anazlyze_sourcing_criterais_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     #TAGS: [admin]
     """
@@ -96,17 +116,19 @@ async def admin_anazlyze_sourcing_criterais_command(update: Update, context: Con
             vacancy_id = context.args[0]
             if vacancy_id:
                 # Verify that the vacancy exists
-                if is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
+                if await is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
                     # Check if vacancy has description received
-                    if is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="description_recieved"):
+                    if await is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="description_recieved"):
                         # Import here to avoid circular dependency
                         logger.debug(f"{log_info_msg}: call manager_bot command")
                         await send_message_to_user(update, context, text=f"😎 Starting the task for defining sourcing criterias for vacancy {vacancy_id}...")
                         from manager_bot.manager_bot import define_sourcing_criterias_triggered_by_admin_command
-                        await define_sourcing_criterias_triggered_by_admin_command(vacancy_id=vacancy_id)
-                        if is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
-                            manager_id = get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="manager_id")
+                        analysis_future = await define_sourcing_criterias_triggered_by_admin_command(vacancy_id=vacancy_id)
+                        if await _wait_for_queued_task(analysis_future):
+                            manager_id = await get_column_value_by_field(db_model=Vacancies, search_field_name="id", search_value=vacancy_id, target_field_name="manager_id")
                             await send_message_to_user(update, context, text=f"😎 Sourcing criterias are ready for vacancy {vacancy_id} for user {manager_id}.")
+                        else:
+                            await send_message_to_user(update, context, text=f"⏱️ Sourcing criterias analysis for vacancy {vacancy_id} is taking longer than expected. Please check the task queue status later.")
                     else:
                         raise ValueError(f"{log_info_msg}: Vacancy {vacancy_id} does not have vacancy description received.")     
                 else:
@@ -155,12 +177,13 @@ async def admin_get_sourcing_criterais_visualization_command(update: Update, con
             vacancy_id = context.args[0]
             if vacancy_id:
                 # Verify that the vacancy exists
-                if is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
+                if await is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
                     # Check if vacancy has description received
-                    if is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="sourcing_criterias_recieved"):
+                    if await is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="sourcing_criterias_recieved"):
                         # Format and send result to user
                         await send_message_to_user(update, context, text="😎 This how it will look for user:\n")
-                        formatted_result = format_sourcing_criterias_analysis_result_for_markdown(vacancy_id=vacancy_id)
+                        # sync helper (reads the vacancy from DB): in a thread, not on the event loop
+                        formatted_result = await asyncio.to_thread(format_sourcing_criterias_analysis_result_for_markdown, vacancy_id=vacancy_id)
                         message_text = f"{INFO_ABOUT_SOURCING_CRITERIAS_TEXT}\n\n{formatted_result}"
                         await send_message_to_user(update, context, text=message_text, parse_mode=ParseMode.MARKDOWN)
                     else:
@@ -212,9 +235,9 @@ async def admin_send_sourcing_criterais_to_user_command(update: Update, context:
             vacancy_id = context.args[0]
             if vacancy_id:
                 # Verify that the vacancy exists
-                if is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
+                if await is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
                     # Check if vacancy has sourcing criterias received
-                    if is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="sourcing_criterias_recieved"):
+                    if await is_boolean_field_true_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="sourcing_criterias_recieved"):
                         # Import here to avoid circular dependency
                         logger.debug(f"{log_info_msg}: call manager_bot command")
                         from manager_bot.manager_bot import send_sourcing_criterias_and_questionnaire_to_user_triggered_by_admin_command
@@ -266,7 +289,7 @@ async def admin_source_negotiations(update: Update, context: ContextTypes.DEFAUL
             vacancy_id = context.args[0]
             if vacancy_id:
                 # Verify that the vacancy exists
-                if is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
+                if await is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
                     # Import here to avoid circular dependency
                     logger.debug(f"{log_info_msg}: call manager_bot command")
                     from manager_bot.manager_bot import source_negotiations_triggered_by_admin_command
@@ -318,21 +341,21 @@ async def admin_send_tg_link_and_change_employer_state_to_applicants_command(upd
             vacancy_id = context.args[0]
             if vacancy_id:
                 # Verify that the vacancy exists
-                if is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
+                if await is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
                     logger.debug(f"{log_info_msg}: fetch list of negotiations to process")
                     # Query Negotiations table for records matching criteria
-                    db = SessionLocal()
                     try:
-                        negotiations = db.query(Negotiations).filter(
-                            Negotiations.vacancy_id == vacancy_id,
-                            Negotiations.link_to_tg_bot_sent == False
-                        ).all()
-                        list_of_negotiation_ids = [negotiation.id for negotiation in negotiations]
+                        async with get_async_session() as db:
+                            # only ids are needed: column-only select (served by partial index on vacancy_id)
+                            list_of_negotiation_ids = (await db.execute(
+                                select(Negotiations.id).where(
+                                    Negotiations.vacancy_id == vacancy_id,
+                                    Negotiations.link_to_tg_bot_sent == False
+                                )
+                            )).scalars().all()
                     except Exception as e:
                         logger.error(f"{log_info_msg}: Error querying Negotiations table: {e}", exc_info=True)
                         raise
-                    finally:
-                        db.close()
 
                     # Import here to avoid circular dependency
                     logger.debug(f"{log_info_msg}: call manager_bot command")
@@ -387,7 +410,7 @@ async def admin_get_new_applicant_videos_command(update: Update, context: Contex
             vacancy_id = context.args[0]
             if vacancy_id:
                 # Verify that the vacancy exists
-                if is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
+                if await is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
                     video_dir_path = get_data_subdirectory_path(subdirectory_name="videos")
                     if video_dir_path is None:
                         raise ValueError(f"{log_info_msg}: Video directory path not found.")
@@ -405,15 +428,18 @@ async def admin_get_new_applicant_videos_command(update: Update, context: Contex
                     output_text_negotiation_id = ""
                     output_text_path = ""
 
+                    video_updates_by_negotiation_id = {}
                     for video_file in list_of_video_files:
                         negotiation_id = video_file.split("_")[2]
-                        if is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
-                            update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="video_received", new_value=True)
+                        if await is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
                             file_path = os.path.join(video_dir_path, video_file)
-                            update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="video_path", new_value=file_path)
+                            video_updates_by_negotiation_id[negotiation_id] = {"video_received": True, "video_path": file_path}
                             output_text_negotiation_id += f"{negotiation_id}\n"
                         else:
                             output_text_negotiation_id += f"Negotiation {negotiation_id} not found in database.\n"
+                    # Save all found videos in one transaction
+                    if video_updates_by_negotiation_id:
+                        await update_records_in_db(db_model=Negotiations, updates_by_id=video_updates_by_negotiation_id)
 
                     for video_file in list_of_video_files:
                         file_path = os.path.join(video_dir_path, video_file)
@@ -467,31 +493,19 @@ async def admin_source_and_analyze_resume_command(update: Update, context: Conte
         if context.args and len(context.args) == 1:
             negotiation_id = context.args[0]
             if negotiation_id:
-                if is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
+                if await is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
                     # Import here to avoid circular dependency
                     logger.debug(f"{log_info_msg}: call manager_bot command")
                     from manager_bot.manager_bot import source_resume_triggered_by_admin_command,analyze_resume_triggered_by_admin_command
                     await source_resume_triggered_by_admin_command(negotiation_id=negotiation_id)
                     await send_message_to_user(update, context, text=f"😎 Resume sourced for negotiation {negotiation_id}. Starting analysis...")
-                    await analyze_resume_triggered_by_admin_command(negotiation_id=negotiation_id)
-                    
-                    # Wait for analysis to complete (polling with timeout)
-                    max_wait_time = 300  # Maximum wait time in seconds (5 minutes)
-                    poll_interval = 2  # Check every 2 seconds
-                    elapsed_time = 0
+                    # admin waits for the result: ahead of bulk resume analysis
+                    analysis_future = await analyze_resume_triggered_by_admin_command(negotiation_id=negotiation_id, priority=PRIORITY_INTERACTIVE)
                     
                     await send_message_to_user(update, context, text=f"⏳ Resume analysis queued for negotiation {negotiation_id}. Waiting for completion...")
                     
-                    resume_ai_analysis = None
-                    while elapsed_time < max_wait_time:
-                        resume_ai_analysis = get_column_value_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="resume_ai_analysis")
-                        if resume_ai_analysis is not None:
-                            # Analysis is complete
-                            break
-                        await asyncio.sleep(poll_interval)
-                        elapsed_time += poll_interval
-                    
-                    if resume_ai_analysis is not None:
+                    # Wait for the queued task itself (its exception, if any, is raised here)
+                    if await _wait_for_queued_task(analysis_future):
                         # Analysis is complete, get recommendation
                         await send_message_to_user(update, context, text=f"😎 Resume analysis completed for negotiation {negotiation_id}.")
                     else:
@@ -514,6 +528,231 @@ async def admin_source_and_analyze_resume_command(update: Update, context: Conte
 
 
 
+async def admin_analyze_vacancy_resumes_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    #TAGS: [admin]
+    """
+    Admin command to analyze all unsorted resumes of a vacancy, several resumes per AI request.
+    Usage: /command_name <vacancy_id>
+    Only accessible to users whose ID is in the ADMIN_IDS whitelist.
+    """
+
+    log_info_msg = "admin_analyze_vacancy_resumes_command"
+
+    try:
+        # ----- IDENTIFY USER and pull required data from records -----
+
+        bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
+        logger.info(f"{log_info_msg}: start")
+
+        #  ----- CHECK IF USER IS NOT AN ADMIN and STOP if it is -----
+
+        if not await _is_user_admin(bot_user_id=bot_user_id):
+            await send_message_to_user(update, context, text=FAIL_TO_IDENTIFY_USER_AS_ADMIN_TEXT)
+            return
+
+        # ----- PARSE COMMAND ARGUMENTS -----
+
+        if not context.args or len(context.args) != 1:
+            raise ValueError(f"Invalid number of arguments. Usage: /command_name <vacancy_id>")
+        vacancy_id = context.args[0]
+        if not await is_value_in_db(db_model=Vacancies, field_name="id", value=vacancy_id):
+            raise ValueError(f"Vacancy {vacancy_id} not found in database.")
+
+        # Import here to avoid circular dependency
+        from manager_bot.manager_bot import analyze_vacancy_resumes_triggered_by_admin_command
+        analysis_futures = await analyze_vacancy_resumes_triggered_by_admin_command(vacancy_id=vacancy_id)
+        if not analysis_futures:
+            await send_message_to_user(update, context, text=f"No unsorted resumes for vacancy {vacancy_id}.")
+            return
+        await send_message_to_user(update, context, text=f"⏳ Resume analysis queued for vacancy {vacancy_id}: {len(analysis_futures)} batches. Progress: /admin_task_queue_stats")
+
+    except Exception as e:
+        logger.error(f"{log_info_msg}: Failed to execute command: {e}", exc_info=True)
+        # Send notification to admin about the error
+        if context.application:
+            await send_message_to_admin(
+                application=context.application,
+                text=f"⚠️ Error {log_info_msg}: {e}\nAdmin ID: {bot_user_id if 'bot_user_id' in locals() else 'unknown'}")
+
+
+
+async def admin_dead_letters_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    #TAGS: [admin]
+    """
+    Admin command to list AI tasks that failed after all retries (dead-letter).
+    Usage: /command_name [limit]
+    Sends notification to admin if fails
+    """
+
+    log_info_msg = "admin_dead_letters_command"
+
+    try:
+        bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
+        logger.info(f"{log_info_msg}: start")
+
+        #  ----- CHECK IF USER IS NOT AN ADMIN and STOP if it is -----
+
+        if not await _is_user_admin(bot_user_id=bot_user_id):
+            await send_message_to_user(update, context, text=FAIL_TO_IDENTIFY_USER_AS_ADMIN_TEXT)
+            return
+
+        # ----- PARSE COMMAND ARGUMENTS -----
+
+        limit = 20
+        if context.args:
+            limit = int(context.args[0])
+
+        # ----- LIST DEAD-LETTER TASKS -----
+
+        dead_letters = await ai_task_queue.get_dead_letters(limit=limit)
+        if not dead_letters:
+            await send_message_to_user(update, context, text="✅ Dead-letter is empty.")
+            return
+
+        lines = [f"☠️ Failed tasks ({len(dead_letters)}):"]
+        for entry in dead_letters:
+            failed_at = entry["failed_at"].strftime("%Y-%m-%d %H:%M") if entry.get("failed_at") else "?"
+            lines.append(
+                f"- {entry['task_id'] or entry['func_name']} [{entry['lane']}], attempts: {entry['attempts']}, {failed_at}\n"
+                f"  {(entry['error'] or '')[:200]}"
+            )
+        lines.append("\nRequeue: /admin_requeue_dead_letters [task_id]")
+        await send_message_to_user(update, context, text="\n".join(lines))
+
+    except Exception as e:
+        logger.error(f"{log_info_msg}: Failed to execute command: {e}", exc_info=True)
+        # Send notification to admin about the error
+        if context.application:
+            await send_message_to_admin(
+                application=context.application,
+                text=f"⚠️ Error {log_info_msg}: {e}\nAdmin ID: {bot_user_id if 'bot_user_id' in locals() else 'unknown'}")
+
+
+async def admin_requeue_dead_letters_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    #TAGS: [admin]
+    """
+    Admin command to put dead-letter AI tasks back to the queue.
+    Usage: /command_name [task_id]   (without task_id - all failed tasks)
+    Sends notification to admin if fails
+    """
+
+    log_info_msg = "admin_requeue_dead_letters_command"
+
+    try:
+        bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
+        logger.info(f"{log_info_msg}: start")
+
+        #  ----- CHECK IF USER IS NOT AN ADMIN and STOP if it is -----
+
+        if not await _is_user_admin(bot_user_id=bot_user_id):
+            await send_message_to_user(update, context, text=FAIL_TO_IDENTIFY_USER_AS_ADMIN_TEXT)
+            return
+
+        # ----- REQUEUE -----
+
+        task_id = context.args[0] if context.args else None
+        requeued = await ai_task_queue.requeue_dead_letters(task_id=task_id)
+        await send_message_to_user(update, context, text=f"😎 Requeued {requeued} task(s){f' with id {task_id}' if task_id else ''}.")
+
+    except Exception as e:
+        logger.error(f"{log_info_msg}: Failed to execute command: {e}", exc_info=True)
+        # Send notification to admin about the error
+        if context.application:
+            await send_message_to_admin(
+                application=context.application,
+                text=f"⚠️ Error {log_info_msg}: {e}\nAdmin ID: {bot_user_id if 'bot_user_id' in locals() else 'unknown'}")
+
+
+async def admin_task_queue_stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    #TAGS: [admin]
+    """
+    Admin command to show AI task queue metrics: backlog, counters, wait/run times per lane and task type,
+    tasks running right now with their age (the oldest first - candidates for stuck jobs), AI cache hit rate.
+    Usage: /command_name
+    Sends notification to admin if fails
+    """
+
+    log_info_msg = "admin_task_queue_stats_command"
+
+    try:
+        bot_user_id = str(get_tg_user_data_attribute_from_update_object(update=update, tg_user_attribute="id"))
+        logger.info(f"{log_info_msg}: start")
+
+        #  ----- CHECK IF USER IS NOT AN ADMIN and STOP if it is -----
+
+        if not await _is_user_admin(bot_user_id=bot_user_id):
+            await send_message_to_user(update, context, text=FAIL_TO_IDENTIFY_USER_AS_ADMIN_TEXT)
+            return
+
+        # ----- COLLECT METRICS -----
+
+        snapshot = ai_task_queue.snapshot()
+        backlog = await ai_task_queue.get_backlog()
+
+        # ----- RENDER -----
+
+        def _format_secs(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value:.1f}s"
+
+        def _format_metrics(name: str, metrics: dict) -> str:
+            wait_time, run_time = metrics["wait_time"], metrics["run_time"]
+            return (
+                f"• {name}: ✅ {metrics['succeeded']} ❌ {metrics['failed']} 🔁 {metrics['retried']} "
+                f"(enqueued {metrics['enqueued']}), {metrics['throughput_per_min']}/min\n"
+                f"  wait p50/p95/max: {_format_secs(wait_time['p50'])}/{_format_secs(wait_time['p95'])}/{_format_secs(wait_time['max'])}\n"
+                f"  run p50/p95/max: {_format_secs(run_time['p50'])}/{_format_secs(run_time['p95'])}/{_format_secs(run_time['max'])}"
+            )
+
+        lines = [
+            f"📊 AI task queue (backend: {snapshot['backend'] or 'memory'}, uptime {snapshot['uptime_secs'] // 60} min)",
+            f"Waiting for retry: {snapshot['waiting_retry']}",
+            "",
+            "Lanes:",
+        ]
+        for lane_name, lane_metrics in snapshot["lanes"].items():
+            lane_backlog = backlog.get(lane_name, {})
+            backlog_text = ", ".join(f"{status} {count}" for status, count in lane_backlog.items()) or "empty"
+            lines.append(f"{lane_name} - workers {lane_metrics['workers']}, running {lane_metrics['in_flight']}, backlog: {backlog_text}")
+            lines.append(_format_metrics("total", lane_metrics))
+        if snapshot["task_types"]:
+            lines.append("")
+            lines.append("Task types:")
+            for task_type, type_metrics in snapshot["task_types"].items():
+                lines.append(_format_metrics(task_type, type_metrics))
+        lines.append("")
+        lines.append(f"Running now ({len(snapshot['in_flight'])}):")
+        for task in snapshot["in_flight"][:10]:
+            lines.append(f"- {task['task_id'] or task['func_name']} [{task['lane']}], attempt {task['attempt']}, {task['age_secs']:.0f}s")
+        if AI_CACHE_ENABLED:
+            cache_stats = get_ai_cache().stats()
+            lines.append("")
+            lines.append(
+                f"AI cache: hits {cache_stats['hits']}, misses {cache_stats['misses']} (hit rate {cache_stats['hit_rate']:.0%}), "
+                f"stored {cache_stats['stores']}, evicted {cache_stats['evictions']}"
+            )
+        if resume_projection_stats["resumes"]:
+            tokens_before = resume_projection_stats["tokens_before"]
+            tokens_after = resume_projection_stats["tokens_after"]
+            lines.append(
+                f"Resume projection: {resume_projection_stats['resumes']} resumes, "
+                f"tokens {tokens_before} -> {tokens_after} ({tokens_after / max(tokens_before, 1):.0%})"
+            )
+        if prompt_cache_stats["requests"]:
+            lines.append(
+                f"OpenAI prompt cache: {prompt_cache_stats['cached_tokens']} of {prompt_cache_stats['prompt_tokens']} prompt tokens cached "
+                f"({prompt_cache_stats['cached_tokens'] / max(prompt_cache_stats['prompt_tokens'], 1):.0%}) in {prompt_cache_stats['requests']} requests"
+            )
+        await send_message_to_user(update, context, text="\n".join(lines))
+
+    except Exception as e:
+        logger.error(f"{log_info_msg}: Failed to execute command: {e}", exc_info=True)
+        # Send notification to admin about the error
+        if context.application:
+            await send_message_to_admin(
+                application=context.application,
+                text=f"⚠️ Error {log_info_msg}: {e}\nAdmin ID: {bot_user_id if 'bot_user_id' in locals() else 'unknown'}")
+
+
 async def admin_get_recommendation_visualization_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     #TAGS: [admin] 
     """
@@ -541,7 +780,7 @@ async def admin_get_recommendation_visualization_command(update: Update, context
         if context.args and len(context.args) == 1:
             negotiation_id = context.args[0]
             if negotiation_id:
-                if is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
+                if await is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
                     # Import here to avoid circular dependency
                     logger.debug(f"{log_info_msg}: call manager_bot command")
                     from manager_bot.manager_bot import send_recommendation_text_to_specified_user, send_recommendation_video_to_specified_user_without_questionnaire
@@ -599,12 +838,12 @@ async def admin_send_recommendation_to_user_command(update: Update, context: Con
         if context.args and len(context.args) == 1:
             negotiation_id = context.args[0]
             if negotiation_id:
-                if is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
+                if await is_value_in_db(db_model=Negotiations, field_name="id", value=negotiation_id):
                     # Import here to avoid circular dependency
                     logger.debug(f"{log_info_msg}: call manager_bot command")
 
-                    vacancy_id = get_column_value_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="vacancy_id")
-                    manager_id = get_column_value_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="manager_id")
+                    vacancy_id = await get_column_value_in_db(db_model=Negotiations, record_id=negotiation_id, field_name="vacancy_id")
+                    manager_id = await get_column_value_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="manager_id")
 
                     from manager_bot.manager_bot import send_recommendation_text_to_specified_user, send_recommendation_video_to_specified_user_with_questionnaire
                     await send_recommendation_text_to_specified_user(
@@ -1115,7 +1354,7 @@ async def admin_update_db_command(update: Update, context: ContextTypes.DEFAULT_
         
         # ----- CHECK IF RECORD EXISTS -----
         
-        if not is_value_in_db(db_model=db_model, field_name="id", value=record_id):
+        if not await is_value_in_db(db_model=db_model, field_name="id", value=record_id):
             await send_message_to_user(
                 update, 
                 context, 
@@ -1125,7 +1364,7 @@ async def admin_update_db_command(update: Update, context: ContextTypes.DEFAULT_
         
         # ----- GET CURRENT VALUE -----
         
-        current_value = get_column_value_in_db(db_model=db_model, record_id=record_id, field_name=column_name)
+        current_value = await get_column_value_in_db(db_model=db_model, record_id=record_id, field_name=column_name)
         
         # ----- CONVERT VALUE TO APPROPRIATE TYPE -----
         
@@ -1142,14 +1381,14 @@ async def admin_update_db_command(update: Update, context: ContextTypes.DEFAULT_
         # ----- UPDATE RECORD -----
         
         try:
-            update_record_in_db(
+            await update_record_in_db(
                 db_model=db_model,
                 record_id=record_id,
                 updates={column_name: new_value}
             )
             
             # Get updated value to confirm
-            updated_value = get_column_value_in_db(db_model=db_model, record_id=record_id, field_name=column_name)
+            updated_value = await get_column_value_in_db(db_model=db_model, record_id=record_id, field_name=column_name)
             
             await send_message_to_user(
                 update, 
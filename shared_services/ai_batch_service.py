@@ -0,0 +1,446 @@
+# shared_services/ai_batch_service.py
+# Offline resume scoring for vacancies with thousands of responses: instead of one interactive request per resume,
+# all pending negotiations of a vacancy are written to a JSONL file, submitted as one batch job, and the results
+# are written back to Negotiations in bulk when the job is done (OpenAI Batch API: up to 24h, about half the price).
+# The job goes through a BatchProvider, so the pipeline can run against local files in tests:
+#     stats = await run_resume_batch_job(vacancy_id, prompt_text)                              # OpenAI Batch API
+#     stats = await run_resume_batch_job(vacancy_id, prompt_text, provider=LocalBatchProvider(responder=...))
+# Each JSONL line is one chat completion request, custom_id = negotiation id.
+# Negotiations written to a job get resume_sorting_status "batch_submitted", so other runs and the queued analysis
+# (which take "new" ones) skip them; results are stored only into negotiations nobody has sorted in the meantime.
+
+import abc
+import json
+import time
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+
+from shared_services.database import get_async_session, Vacancies, Negotiations
+from shared_services.async_db_service import get_columns
+from shared_services.data_service import get_data_directory
+from shared_services.ai_service import async_client, build_resume_analysis_messages
+from shared_services.constants import MODEL_NAME, RESUME_PASSED_SCORE
+
+logger = logging.getLogger(__name__)
+
+BATCH_SUBDIRECTORY = "ai_batches"
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL_SECS = 60.0
+BATCH_TIMEOUT_SECS = 26 * 3600
+# negotiations written back per transaction
+BATCH_INGEST_CHUNK_SIZE = 500
+
+BATCH_STATUS_IN_PROGRESS = "in_progress"
+BATCH_STATUS_COMPLETED = "completed"
+# OpenAI statuses after which the job will not produce (more) results
+BATCH_FINAL_STATUSES = (BATCH_STATUS_COMPLETED, "failed", "expired", "cancelled")
+
+# resume_sorting_status of negotiations whose requests are in a running job (back to "new" if they get no result)
+SORTING_STATUS_NEW = "new"
+SORTING_STATUS_BATCH_SUBMITTED = "batch_submitted"
+
+
+# ----- BATCH PROVIDERS -----
+
+class BatchProvider(abc.ABC):
+    """Runs a JSONL file of requests as one job. Subclasses implement submit / get_status / download_results."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def submit(self, input_path: Path, metadata: Optional[Dict[str, str]] = None) -> str:
+        """Start a job for input_path, return job id."""
+
+    @abc.abstractmethod
+    async def get_status(self, job_id: str) -> str:
+        """Job status: one of BATCH_FINAL_STATUSES or anything else while the job is running."""
+
+    @abc.abstractmethod
+    async def download_results(self, job_id: str, output_path: Path) -> Path:
+        """Write result lines ({"custom_id", "response", "error"}) of a completed job to output_path."""
+
+
+class OpenAIBatchProvider(BatchProvider):
+    """OpenAI Batch API through the shared AsyncOpenAI client of ai_service."""
+
+    name = "openai"
+
+    def __init__(self, client=None, completion_window: str = BATCH_COMPLETION_WINDOW):
+        self.client = client or async_client
+        self.completion_window = completion_window
+
+
+    async def submit(self, input_path: Path, metadata: Optional[Dict[str, str]] = None) -> str:
+        with open(input_path, "rb") as f:
+            input_file = await self.client.files.create(file=f, purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+            metadata=metadata,
+        )
+        return batch.id
+
+
+    async def get_status(self, job_id: str) -> str:
+        batch = await self.client.batches.retrieve(job_id)
+        return batch.status
+
+
+    async def download_results(self, job_id: str, output_path: Path) -> Path:
+        batch = await self.client.batches.retrieve(job_id)
+        lines = []
+        # successful requests are in output file, failed ones (after OpenAI retries) in error file
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = await self.client.files.content(file_id)
+                lines.append(content.text.strip())
+        output_path.write_text("\n".join(line for line in lines if line) + "\n", encoding="utf-8")
+        return output_path
+
+
+class LocalBatchProvider(BatchProvider):
+    """
+    File-based stand-in for tests and local runs. Job = directory with input.jsonl; the job is completed
+    when output.jsonl appears there. With responder(request_body) -> dict (the model answer), output is produced
+    right on submit; without it, output.jsonl can be put into the job directory by hand or by a test.
+    """
+
+    name = "local"
+
+    def __init__(self, directory: Optional[Path] = None, responder: Optional[Callable[[dict], dict]] = None):
+        self.directory = Path(directory) if directory else get_data_directory() / BATCH_SUBDIRECTORY / "local_jobs"
+        self.responder = responder
+
+
+    async def submit(self, input_path: Path, metadata: Optional[Dict[str, str]] = None) -> str:
+        job_id = f"local_{uuid.uuid4().hex[:12]}"
+        job_dir = self.directory / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        requests = Path(input_path).read_text(encoding="utf-8")
+        (job_dir / "input.jsonl").write_text(requests, encoding="utf-8")
+        (job_dir / "metadata.json").write_text(json.dumps(metadata or {}, ensure_ascii=False), encoding="utf-8")
+        if self.responder is not None:
+            lines = [self._respond(json.loads(line)) for line in requests.splitlines() if line.strip()]
+            (job_dir / "output.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return job_id
+
+
+    def _respond(self, request: dict) -> str:
+        try:
+            content = json.dumps(self.responder(request["body"]), ensure_ascii=False)
+            result = {
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": {"choices": [{"message": {"role": "assistant", "content": content}}]}},
+                "error": None,
+            }
+        except Exception as e:
+            result = {"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}}
+        return json.dumps(result, ensure_ascii=False)
+
+
+    async def get_status(self, job_id: str) -> str:
+        job_dir = self.directory / job_id
+        if not job_dir.exists():
+            return "failed"
+        return BATCH_STATUS_COMPLETED if (job_dir / "output.jsonl").exists() else BATCH_STATUS_IN_PROGRESS
+
+
+    async def download_results(self, job_id: str, output_path: Path) -> Path:
+        output_path.write_text((self.directory / job_id / "output.jsonl").read_text(encoding="utf-8"), encoding="utf-8")
+        return output_path
+
+
+# ----- PIPELINE -----
+
+def get_batch_directory() -> Path:
+    batch_dir = get_data_directory() / BATCH_SUBDIRECTORY
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    return batch_dir
+
+
+def _get_pending_negotiations_filter(vacancy_id: str) -> tuple:
+    """Negotiations of the vacancy with a downloaded resume that is not sorted yet."""
+    return (
+        Negotiations.vacancy_id == vacancy_id,
+        Negotiations.resume_sorting_status == SORTING_STATUS_NEW,
+        Negotiations.resume_json.isnot(None),
+    )
+
+
+async def get_pending_negotiations(vacancy_id: str) -> Dict[str, dict]:
+    """negotiation_id -> resume JSON for negotiations of the vacancy with a downloaded resume that is not sorted yet."""
+    async with get_async_session() as db:
+        rows = (await db.execute(
+            select(Negotiations.id, Negotiations.resume_json).where(*_get_pending_negotiations_filter(vacancy_id))
+        )).all()
+    return {negotiation_id: resume_json for negotiation_id, resume_json in rows}
+
+
+async def get_pending_negotiation_ids(vacancy_id: str) -> List[str]:
+    """Same as get_pending_negotiations, ids only (without heavy resume JSON)."""
+    async with get_async_session() as db:
+        rows = (await db.execute(
+            select(Negotiations.id).where(*_get_pending_negotiations_filter(vacancy_id)).order_by(Negotiations.id)
+        )).scalars().all()
+    return list(rows)
+
+
+async def get_negotiation_resumes(negotiation_ids: List[str]) -> Dict[str, dict]:
+    """negotiation_id -> resume JSON for the given negotiations (ids without a downloaded resume are skipped)."""
+    async with get_async_session() as db:
+        rows = (await db.execute(
+            select(Negotiations.id, Negotiations.resume_json)
+            .where(Negotiations.id.in_(negotiation_ids), Negotiations.resume_json.isnot(None))
+        )).all()
+    return {negotiation_id: resume_json for negotiation_id, resume_json in rows}
+
+
+async def mark_negotiations_submitted(negotiation_ids: List[str]) -> List[str]:
+    """Mark those of negotiation_ids that are still "new" as submitted to a batch job. Returns marked ids."""
+    if not negotiation_ids:
+        return []
+    async with get_async_session() as db:
+        try:
+            marked_ids = (await db.execute(
+                update(Negotiations)
+                .where(Negotiations.id.in_(negotiation_ids), Negotiations.resume_sorting_status == SORTING_STATUS_NEW)
+                .values(resume_sorting_status=SORTING_STATUS_BATCH_SUBMITTED)
+                .returning(Negotiations.id)
+                .execution_options(synchronize_session=False)
+            )).scalars().all()
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+    return list(marked_ids)
+
+
+async def release_submitted_negotiations(vacancy_id: str, negotiation_ids: Optional[List[str]] = None) -> int:
+    """
+    Return negotiations of the vacancy that are still marked as submitted (all of them, or only negotiation_ids)
+    to "new". Called when a job ends; after a crashed run, call it for the vacancy (scripts/run_resume_batch.py --release).
+    Returns count of released negotiations.
+    """
+    filters = [Negotiations.vacancy_id == vacancy_id, Negotiations.resume_sorting_status == SORTING_STATUS_BATCH_SUBMITTED]
+    if negotiation_ids is not None:
+        if not negotiation_ids:
+            return 0
+        filters.append(Negotiations.id.in_(negotiation_ids))
+    async with get_async_session() as db:
+        try:
+            result = await db.execute(
+                update(Negotiations)
+                .where(*filters)
+                .values(resume_sorting_status=SORTING_STATUS_NEW)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+    return result.rowcount
+
+
+async def write_resume_batch_requests(
+    vacancy_id: str,
+    prompt_resume_analysis_text: str,
+    input_path: Path,
+    model: str = MODEL_NAME,
+) -> List[str]:
+    """
+    Mark pending negotiations of the vacancy as submitted and write one chat completion request per marked
+    negotiation to input_path. Returns ids of the written negotiations (the caller releases them when the job ends).
+    """
+
+    log_prefix = f"write_resume_batch_requests: vacancy {vacancy_id}"
+
+    vacancy = await get_columns(db_model=Vacancies, record_id=vacancy_id, fields=["description_json", "sourcing_criterias_json"])
+    if not vacancy or not vacancy["description_json"] or not vacancy["sourcing_criterias_json"]:
+        raise ValueError(f"{log_prefix}: vacancy description or sourcing criterias not found in database")
+
+    pending_negotiations = await get_pending_negotiations(vacancy_id)
+    # negotiations taken by another run in the meantime are not marked and not written
+    marked_ids = await mark_negotiations_submitted(list(pending_negotiations))
+    negotiations = {negotiation_id: pending_negotiations[negotiation_id] for negotiation_id in marked_ids}
+    with open(input_path, "w", encoding="utf-8") as f:
+        for negotiation_id, resume_json in negotiations.items():
+            request = {
+                "custom_id": negotiation_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": model,
+                    "messages": build_resume_analysis_messages(
+                        vacancy["description_json"], vacancy["sourcing_criterias_json"], resume_json,
+                        prompt_resume_analysis_text, model, vacancy_id,
+                    ),
+                    "response_format": {"type": "json_object"},
+                },
+            }
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+    logger.info(f"{log_prefix}: {len(negotiations)} requests written to {input_path}")
+    return list(negotiations)
+
+
+def parse_batch_results(output_path: Path) -> Tuple[Dict[str, dict], Dict[str, str]]:
+    """Read provider output: (negotiation_id -> analysis result, negotiation_id -> error)."""
+    results: Dict[str, dict] = {}
+    errors: Dict[str, str] = {}
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            custom_id = item.get("custom_id")
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                errors[custom_id] = str(item.get("error") or response.get("body"))
+                continue
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+                results[custom_id] = json.loads(content)
+            except (KeyError, IndexError, TypeError, json.JSONDecodeError) as e:
+                errors[custom_id] = f"unreadable response: {e}"
+    return results, errors
+
+
+def get_resume_sorting_updates(ai_analysis_result: dict) -> Dict[str, Any]:
+    """Negotiations columns for an analysis result (same rule as manager_bot resume sorting)."""
+    resume_ai_score = int(ai_analysis_result.get("final_score", 0))
+    return {
+        "resume_ai_analysis": ai_analysis_result,
+        "resume_ai_score": str(resume_ai_score),
+        "resume_sorting_status": "passed" if resume_ai_score >= RESUME_PASSED_SCORE else "failed",
+    }
+
+
+async def _store_unsorted_results(updates_by_id: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Write updates in one transaction, only to negotiations that are still unsorted ("new" or submitted): a job runs
+    for hours, and the queued analysis may have sorted some of them already. Returns ids of updated negotiations.
+    """
+    async with get_async_session() as db:
+        try:
+            unsorted_ids = set((await db.execute(
+                select(Negotiations.id)
+                .where(
+                    Negotiations.id.in_(list(updates_by_id)),
+                    Negotiations.resume_sorting_status.in_((SORTING_STATUS_NEW, SORTING_STATUS_BATCH_SUBMITTED)),
+                )
+                .with_for_update()
+            )).scalars().all())
+            params = [{"id": negotiation_id, **updates} for negotiation_id, updates in updates_by_id.items() if negotiation_id in unsorted_ids]
+            if params:
+                await db.execute(update(Negotiations), params)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+    return [params_item["id"] for params_item in params]
+
+
+async def ingest_resume_batch_results(output_path: Path) -> Dict[str, Any]:
+    """
+    Write results of a completed job to Negotiations in bulk, skipping negotiations sorted elsewhere in the meantime.
+    Returns {"stored", "skipped", "failed", "errors"}.
+    """
+
+    log_prefix = f"ingest_resume_batch_results: {output_path.name}"
+
+    results, errors = parse_batch_results(output_path)
+    updates_by_id: Dict[str, Dict[str, Any]] = {}
+    for negotiation_id, ai_analysis_result in results.items():
+        try:
+            updates_by_id[negotiation_id] = get_resume_sorting_updates(ai_analysis_result)
+        except (TypeError, ValueError, AttributeError) as e:
+            errors[negotiation_id] = f"invalid final_score: {e}"
+
+    negotiation_ids = list(updates_by_id)
+    stored = 0
+    for i in range(0, len(negotiation_ids), BATCH_INGEST_CHUNK_SIZE):
+        chunk = negotiation_ids[i:i + BATCH_INGEST_CHUNK_SIZE]
+        stored += len(await _store_unsorted_results({negotiation_id: updates_by_id[negotiation_id] for negotiation_id in chunk}))
+    skipped = len(updates_by_id) - stored
+
+    if errors:
+        logger.warning(f"{log_prefix}: {len(errors)} requests failed, they stay unsorted: {list(errors)[:10]}")
+    if skipped:
+        logger.info(f"{log_prefix}: {skipped} results skipped, negotiations were already sorted")
+    logger.info(f"{log_prefix}: {stored} results stored")
+    return {"stored": stored, "skipped": skipped, "failed": len(errors), "errors": errors}
+
+
+async def wait_for_batch_job(
+    provider: BatchProvider,
+    job_id: str,
+    poll_interval: float = BATCH_POLL_INTERVAL_SECS,
+    timeout: float = BATCH_TIMEOUT_SECS,
+) -> str:
+    """Poll provider until the job reaches a final status or timeout passes. Returns the last status."""
+    deadline = time.monotonic() + timeout
+    status = await provider.get_status(job_id)
+    while status not in BATCH_FINAL_STATUSES and time.monotonic() < deadline:
+        logger.debug(f"wait_for_batch_job: {provider.name} job {job_id} is {status}")
+        await asyncio.sleep(poll_interval)
+        status = await provider.get_status(job_id)
+    return status
+
+
+async def run_resume_batch_job(
+    vacancy_id: str,
+    prompt_resume_analysis_text: str,
+    provider: Optional[BatchProvider] = None,
+    model: str = MODEL_NAME,
+    poll_interval: float = BATCH_POLL_INTERVAL_SECS,
+    timeout: float = BATCH_TIMEOUT_SECS,
+) -> Dict[str, Any]:
+    """
+    Score all pending resumes of the vacancy as one batch job: write requests, submit, wait, ingest results.
+    Negotiations of the job are marked as submitted while it runs; those without a stored result (failed requests,
+    failed job) go back to "new", so the next job (or interactive analysis) picks them up.
+    Returns stats: job_id, status, requests, stored, skipped, failed.
+    """
+
+    provider = provider or OpenAIBatchProvider()
+    log_prefix = f"run_resume_batch_job: vacancy {vacancy_id} ({provider.name})"
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    input_path = get_batch_directory() / f"{vacancy_id}_{stamp}_input.jsonl"
+    negotiation_ids = await write_resume_batch_requests(vacancy_id, prompt_resume_analysis_text, input_path, model=model)
+    stats: Dict[str, Any] = {"job_id": None, "status": None, "requests": len(negotiation_ids), "stored": 0, "skipped": 0, "failed": 0}
+    if not negotiation_ids:
+        logger.info(f"{log_prefix}: no pending negotiations")
+        return stats
+
+    try:
+        job_id = await provider.submit(input_path, metadata={"vacancy_id": str(vacancy_id)})
+        stats["job_id"] = job_id
+        logger.info(f"{log_prefix}: job {job_id} submitted with {len(negotiation_ids)} requests")
+
+        status = await wait_for_batch_job(provider, job_id, poll_interval=poll_interval, timeout=timeout)
+        stats["status"] = status
+        if status != BATCH_STATUS_COMPLETED:
+            logger.error(f"{log_prefix}: job {job_id} finished with status '{status}'")
+            return stats
+
+        output_path = get_batch_directory() / f"{vacancy_id}_{stamp}_output.jsonl"
+        await provider.download_results(job_id, output_path)
+        ingest_stats = await ingest_resume_batch_results(output_path)
+        stats["stored"] = ingest_stats["stored"]
+        stats["skipped"] = ingest_stats["skipped"]
+        stats["failed"] = ingest_stats["failed"]
+        logger.info(f"{log_prefix}: job {job_id} done, stored {stats['stored']}, skipped {stats['skipped']}, failed {stats['failed']}")
+        return stats
+    finally:
+        # negotiations without a stored result are not in any running job anymore
+        released = await release_submitted_negotiations(vacancy_id, negotiation_ids)
+        if released:
+            logger.info(f"{log_prefix}: {released} negotiations returned to 'new'")
@@ -1,12 +1,20 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, RateLimitError, APITimeoutError, APIConnectionError, InternalServerError
+import httpx
+import asyncio
 import json
 import logging
 import os
 import sys
 import time
-from typing import List, Dict
+from typing import Any, Awaitable, Callable, List, Dict, Optional, Tuple
 from pathlib import Path
 
+# optional: exact token counts for projection stats; without it tokens are estimated from text length
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 from shared_services.database import Vacancies
 from shared_services.db_service import get_column_value_in_db
 
@@ -15,14 +23,265 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from shared_services.constants import MODEL_NAME
+from shared_services.rate_limiter_service import get_rate_limiter
+from shared_services.cache_service import DiskCache, TTLCache, MISSING, get_content_hash
+from shared_services.data_service import get_data_directory
 from config import OPENAI_API_KEY
 
 logger = logging.getLogger(__name__)
+# sync client: only for the Assistants API helpers at the bottom of the module
 client = OpenAI(api_key=OPENAI_API_KEY)
 
+# ----- ASYNC OPENAI CLIENT -----
+# One client with one HTTP connection pool for all AI tasks: requests are awaited, so the event loop keeps
+# handling Telegram updates while many analyses are in flight.
+OPENAI_TIMEOUT_SECS = float(os.getenv("OPENAI_TIMEOUT_SECS", "120"))
+OPENAI_CONNECT_TIMEOUT_SECS = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECS", "10"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+async_client = AsyncOpenAI(
+    api_key=OPENAI_API_KEY,
+    max_retries=OPENAI_MAX_RETRIES,
+    timeout=httpx.Timeout(OPENAI_TIMEOUT_SECS, connect=OPENAI_CONNECT_TIMEOUT_SECS),
+    http_client=httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS, max_keepalive_connections=OPENAI_MAX_CONNECTIONS),
+        timeout=httpx.Timeout(OPENAI_TIMEOUT_SECS, connect=OPENAI_CONNECT_TIMEOUT_SECS),
+    ),
+)
+
+
+async def close_ai_client() -> None:
+    """Close pooled OpenAI connections (on shutdown)."""
+    await async_client.close()
+
+# Transient OpenAI errors (429, timeouts, network, 5xx): worth retrying the whole task later.
+# Used as RetryPolicy(retry_on=...) for AI tasks in TaskQueue.
+RETRYABLE_AI_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+# tokens reserved for the model answer when estimating request size for the TPM limiter
+AI_RESPONSE_TOKENS_RESERVE = 1000
+
+
+# prompt tokens served from OpenAI prompt cache (this process); see build_resume_analysis_messages for the prefix layout
+prompt_cache_stats = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0}
+
+
+def estimate_message_tokens(messages: List[Dict]) -> int:
+    """Rough token estimate for rate limiting (~3 characters per token for mixed Russian/English text)."""
+    return sum(len(str(message.get("content", ""))) for message in messages) // 3 + AI_RESPONSE_TOKENS_RESERVE
+
+
+async def create_chat_completion(model: str, messages: List[Dict], **kwargs):
+    """
+    async_client.chat.completions.create() that first waits for the per-model RPM and TPM limiters.
+    After the response, the TPM limiter is corrected by the actual usage and cached prompt tokens are counted.
+    """
+    estimated_tokens = estimate_message_tokens(messages)
+    await get_rate_limiter("openai_rpm", model).acquire()
+    tpm_limiter = get_rate_limiter("openai_tpm", model)
+    await tpm_limiter.acquire(estimated_tokens)
+    response = await async_client.chat.completions.create(model=model, messages=messages, **kwargs)
+    usage = getattr(response, "usage", None)
+    if usage is not None and usage.total_tokens:
+        tpm_limiter.consume(usage.total_tokens - estimated_tokens)
+        record_prompt_cache_usage(usage)
+    return response
+
+
+def record_prompt_cache_usage(usage) -> int:
+    """Add prompt / cached tokens of a response usage to prompt_cache_stats. Returns cached tokens."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+    prompt_cache_stats["requests"] += 1
+    prompt_cache_stats["prompt_tokens"] += usage.prompt_tokens or 0
+    prompt_cache_stats["cached_tokens"] += cached_tokens
+    logger.debug(f"prompt cache: {cached_tokens} of {usage.prompt_tokens} prompt tokens cached")
+    return cached_tokens
+
+
+
+# ----- AI ANALYSIS CACHE -----
+# Same inputs (vacancy / criterias / resume, prompt text, system prompt, model) = same analysis:
+# re-runs after a crash or admin retry and candidates applying to several vacancies with the same criterias
+# are answered from disk without a new completion. Only valid JSON results are cached.
+AI_CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+AI_CACHE_TTL_SECS = float(os.getenv("AI_CACHE_TTL_SECS", str(30 * 24 * 3600)))
+AI_CACHE_MAXSIZE = int(os.getenv("AI_CACHE_MAXSIZE", "20000"))
+AI_CACHE_SUBDIRECTORY = "ai_cache"
+
+_ai_cache: Optional[DiskCache] = None
+
+
+def get_ai_cache() -> DiskCache:
+    """AI analysis cache in the users data directory (created on first use)."""
+    global _ai_cache
+    if _ai_cache is None:
+        _ai_cache = DiskCache(
+            directory=get_data_directory() / AI_CACHE_SUBDIRECTORY,
+            maxsize=AI_CACHE_MAXSIZE,
+            ttl=AI_CACHE_TTL_SECS,
+            name="ai_analysis",
+        )
+    return _ai_cache
+
 
+def get_ai_cache_key(kind: str, model: str, system_prompt: str, prompt_text: str, **inputs) -> str:
+    """sha256 of canonicalised analysis inputs (dict key order and JSON formatting do not matter)."""
+    return get_content_hash({
+        "kind": kind,
+        "model": model,
+        "system_prompt": system_prompt,
+        "prompt_text": prompt_text,
+        "inputs": inputs,
+    })
 
-def analyze_vacancy_with_ai(vacancy_data: json, prompt_vacancy_analysis_text: str, model: str = MODEL_NAME) -> dict:
+
+async def _get_cached_analysis(cache_key: str) -> Optional[dict]:
+    if not AI_CACHE_ENABLED:
+        return None
+    try:
+        return await asyncio.to_thread(get_ai_cache().get, cache_key, None)
+    except Exception as e:
+        logger.warning(f"AI cache read failed: {e}")
+        return None
+
+
+async def _store_analysis(cache_key: str, result: dict) -> None:
+    # errors and non-JSON answers are not cached: the next run should ask the model again
+    if not AI_CACHE_ENABLED or not isinstance(result, dict) or "error" in result or "raw_output" in result:
+        return
+    try:
+        await asyncio.to_thread(get_ai_cache().set, cache_key, result)
+    except Exception as e:
+        logger.warning(f"AI cache write failed: {e}")
+
+
+# ----- RESUME PROJECTION -----
+# HH resume JSON is mostly photo / download URLs, ids, actions and metadata. Before prompting, the resume is
+# projected to the fields that matter for scoring and serialized without whitespace.
+# Field map: output field -> path in the resume, or (path to a list, field map for each item).
+# Path segments are separated by "."; "[]" after a segment maps the rest of the path over a list.
+# Besides experience / skills / education, the map keeps the fields HH vacancies often have as must-have
+# criteria (citizenship, work permit, driver license, business trips, schedule, employment type).
+RESUME_FIELD_MAP = {
+    "title": "title",
+    "age": "age",
+    "area": "area.name",
+    "relocation": "relocation.type.name",
+    "citizenship": "citizenship[].name",
+    "work_ticket": "work_ticket[].name",
+    "driver_license_types": "driver_license_types[].id",
+    "has_vehicle": "has_vehicle",
+    "business_trip_readiness": "business_trip_readiness.name",
+    "salary": "salary",
+    "total_experience_months": "total_experience.months",
+    "skills": "skills",
+    "skill_set": "skill_set",
+    "professional_roles": "professional_roles[].name",
+    "employment_form": "employment_form[].name",
+    "work_format": "work_format[].name",
+    "schedules": "schedules[].name",
+    "employments": "employments[].name",
+    "languages": ("language", {"name": "name", "level": "level.name"}),
+    "education_level": "education.level.name",
+    "education": ("education.primary", {"name": "name", "organization": "organization", "result": "result", "year": "year"}),
+    "additional_education": ("education.additional", {"name": "name", "organization": "organization", "year": "year"}),
+    "experience": ("experience", {
+        "start": "start",
+        "end": "end",
+        "company": "company",
+        "industries": "industries[].name",
+        "position": "position",
+        "description": "description",
+    }),
+}
+
+# Token counting serializes the whole original resume and runs the tokenizer on it - debug only, off by default
+AI_RESUME_PROJECTION_STATS = os.getenv("AI_RESUME_PROJECTION_STATS", "false").lower() in ("1", "true", "yes")
+# cumulative tokens of resumes before / after projection (this process, only with AI_RESUME_PROJECTION_STATS)
+resume_projection_stats = {"resumes": 0, "tokens_before": 0, "tokens_after": 0}
+
+
+def _get_by_path(data: Any, path: str) -> Any:
+    """Value at dotted path; "segment[]" maps the rest of the path over a list. None if something is missing."""
+    value = data
+    segments = path.split(".")
+    for index, segment in enumerate(segments):
+        is_list = segment.endswith("[]")
+        key = segment[:-2] if is_list else segment
+        value = value.get(key) if isinstance(value, dict) else None
+        if value is None:
+            return None
+        if is_list:
+            rest = ".".join(segments[index + 1:])
+            items = value if isinstance(value, list) else []
+            return [item for item in (_get_by_path(item, rest) if rest else item for item in items) if item not in (None, "", [], {})]
+    return value
+
+
+def project_fields(data: dict, field_map: Dict[str, Any]) -> dict:
+    """Build a new dict from data by field_map (see RESUME_FIELD_MAP). Empty values are dropped."""
+    projected = {}
+    for field_name, spec in field_map.items():
+        if isinstance(spec, tuple):
+            path, item_map = spec
+            items = _get_by_path(data, path)
+            if isinstance(items, list):
+                value = [project_fields(item, item_map) for item in items if isinstance(item, dict)]
+            elif isinstance(items, dict):
+                value = project_fields(items, item_map)
+            else:
+                value = None
+        else:
+            value = _get_by_path(data, spec)
+        if value not in (None, "", [], {}):
+            projected[field_name] = value
+    return projected
+
+
+def project_resume(resume_data: dict) -> dict:
+    """Keep only scoring-relevant fields of HH resume JSON (RESUME_FIELD_MAP)."""
+    if not isinstance(resume_data, dict):
+        return resume_data
+    return project_fields(resume_data, RESUME_FIELD_MAP)
+
+
+def to_compact_json(data: Any, sort_keys: bool = False) -> str:
+    """JSON without indents and spaces after separators: same content, fewer tokens."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)
+
+
+def count_tokens(text: str, model: str = MODEL_NAME) -> int:
+    """Tokens of text for model: exact with tiktoken installed, otherwise ~3 characters per token."""
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return len(encoding.encode(text))
+    return len(text) // 3
+
+
+def _prepare_resume_for_prompt(resume_data: dict, model: str, record_stats: bool = True) -> str:
+    """Project resume and serialize compactly. With AI_RESUME_PROJECTION_STATS, also count tokens before / after."""
+    resume_text = to_compact_json(project_resume(resume_data))
+    if AI_RESUME_PROJECTION_STATS and record_stats:
+        _record_projection_stats(resume_data, resume_text, model)
+    return resume_text
+
+
+def _record_projection_stats(resume_data: dict, resume_text: str, model: str) -> None:
+    # "before" = resume as it was sent before projection (indented JSON)
+    tokens_before = count_tokens(json.dumps(resume_data, ensure_ascii=False, indent=2), model)
+    tokens_after = count_tokens(resume_text, model)
+    resume_projection_stats["resumes"] += 1
+    resume_projection_stats["tokens_before"] += tokens_before
+    resume_projection_stats["tokens_after"] += tokens_after
+    logger.info(f"resume projection: {tokens_before} -> {tokens_after} tokens ({tokens_after / max(tokens_before, 1):.0%})")
+
+
+async def analyze_vacancy_with_ai(vacancy_data: json, prompt_vacancy_analysis_text: str, model: str = MODEL_NAME) -> dict:
     """
     Sends vacancy description JSON + prompt to OpenAI and returns structured JSON with analysis.
     Args:
@@ -37,6 +296,15 @@ def analyze_vacancy_with_ai(vacancy_data: json, prompt_vacancy_analysis_text: st
 
     
     logger.debug(f"{log_info_msg}: Preparing AI request for vacancy analysis…")
+
+    system_prompt = "Ты — профессиональный сорсер резюме."
+    cache_key = get_ai_cache_key(
+        "vacancy_analysis", model, system_prompt, prompt_vacancy_analysis_text, vacancy_data=vacancy_data,
+    )
+    cached_result = await _get_cached_analysis(cache_key)
+    if cached_result is not None:
+        logger.debug(f"{log_info_msg}: Result taken from AI cache.")
+        return cached_result
     
     user_message = f"""
     Вакансия:
@@ -46,15 +314,19 @@ def analyze_vacancy_with_ai(vacancy_data: json, prompt_vacancy_analysis_text: st
     """
     logger.debug(f"{log_info_msg}: Sending request to OpenAI model='{model}'. Waiting for response…")
     try:
-        response = client.chat.completions.create(
+        response = await create_chat_completion(
             model=model,
             messages=[
-                {"role": "system", "content": "Ты — профессиональный сорсер резюме."},
+                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
             ],
             response_format={"type": "json_object"}  # ensures valid JSON output
         )
         logger.debug(f"{log_info_msg}: Response received from OpenAI. Parsing…")
+    except RETRYABLE_AI_ERRORS as e:
+        # let TaskQueue retry the task instead of saving error as sourcing criterias
+        logger.warning(f"{log_info_msg}: OpenAI request failed with transient error: {e}")
+        raise
     except Exception as e:
         logger.error(f"{log_info_msg}: OpenAI request failed: {e}", exc_info=True)
         return {"error": str(e)}
@@ -63,6 +335,7 @@ def analyze_vacancy_with_ai(vacancy_data: json, prompt_vacancy_analysis_text: st
     except json.JSONDecodeError:
         logger.warning(f"{log_info_msg}: Response is not valid JSON, returning raw text instead.")
         result = {"raw_output": response.choices[0].message.content}
+    await _store_analysis(cache_key, result)
     logger.debug(f"{log_info_msg}: Vacancy analysis completed.")
     return result
 
@@ -115,34 +388,113 @@ def format_sourcing_criterias_analysis_result_for_markdown(vacancy_id: str) -> s
     return "\n".join(lines)
 
 
-def analyze_resume_with_ai(vacancy_description: json, sourcing_criterias: json, resume_data: json, prompt_resume_analysis_text: str, model: str = MODEL_NAME) -> dict:
+RESUME_ANALYSIS_SYSTEM_PROMPT = "Ты — профессиональный сорсер резюме. Всегда возвращай результат в формате JSON."
+# resumes of the same vacancy sent in one request by analyze_resumes_batch_with_ai
+AI_RESUME_BATCH_SIZE = int(os.getenv("AI_RESUME_BATCH_SIZE", "5"))
+
+
+def _get_resume_analysis_cache_key(
+    model: str, prompt_resume_analysis_text: str, vacancy_description: dict, sourcing_criterias: dict, resume_data: dict,
+) -> str:
+    # cache key by projected resume: changes of photo URLs, ids and other metadata do not invalidate the analysis
+    return get_ai_cache_key(
+        "resume_analysis", model, RESUME_ANALYSIS_SYSTEM_PROMPT, prompt_resume_analysis_text,
+        vacancy_description=vacancy_description, sourcing_criterias=sourcing_criterias,
+        resume_data=project_resume(resume_data),
+    )
+
+
+# ----- PROMPT PREFIX -----
+# OpenAI caches prompt prefixes (from ~1024 tokens, exact match): cached input tokens are cheaper and faster.
+# So everything that is the same for all resumes of a vacancy goes first and is serialized the same way every time:
+# system prompt, task (for_resume.txt), vacancy, criterias (keys sorted). The resume comes last.
+# The prefix is memoized per vacancy; the stored inputs are compared on every hit, so an edited vacancy
+# or criterias produce a new prefix.
+_resume_prompt_prefixes = TTLCache(maxsize=500, ttl=6 * 3600.0, name="resume_prompt_prefixes")
+
+
+def get_resume_prompt_prefix(
+    vacancy_description: dict, sourcing_criterias: dict, prompt_resume_analysis_text: str, vacancy_id: Optional[str] = None,
+) -> str:
+    """Static start of the resume analysis user message, byte-identical for all resumes of the vacancy."""
+    if vacancy_id is not None:
+        memo_key = (str(vacancy_id), get_content_hash(prompt_resume_analysis_text))
+    else:
+        memo_key = get_content_hash([vacancy_description, sourcing_criterias, prompt_resume_analysis_text])
+    entry = _resume_prompt_prefixes.get(memo_key)
+    if entry is not MISSING and entry[0] == vacancy_description and entry[1] == sourcing_criterias:
+        return entry[2]
+    prefix = (
+        f"Задача анализа:\n{prompt_resume_analysis_text}\n\n"
+        f"Вакансия:\n{to_compact_json(vacancy_description, sort_keys=True)}\n"
+        f"Критерии отбора:\n{to_compact_json(sourcing_criterias, sort_keys=True)}\n"
+    )
+    _resume_prompt_prefixes.set(memo_key, (vacancy_description, sourcing_criterias, prefix))
+    return prefix
+
+
+def build_resume_analysis_messages(
+    vacancy_description: dict,
+    sourcing_criterias: dict,
+    resume_data: dict,
+    prompt_resume_analysis_text: str,
+    model: str,
+    vacancy_id: Optional[str] = None,
+    record_stats: bool = True,
+) -> List[Dict]:
+    """Chat messages for the analysis of one resume (also used for offline batch requests, see ai_batch_service)."""
+    prefix = get_resume_prompt_prefix(vacancy_description, sourcing_criterias, prompt_resume_analysis_text, vacancy_id)
+    user_message = (
+        f"{prefix}"
+        f"Резюме кандидата:\n{_prepare_resume_for_prompt(resume_data, model, record_stats)}\n\n"
+        "Важно: Верни результат в формате JSON (json)."
+    )
+    return [
+        {"role": "system", "content": RESUME_ANALYSIS_SYSTEM_PROMPT},
+        {"role": "user", "content": user_message}
+    ]
+
+
+async def analyze_resume_with_ai(vacancy_description: json, sourcing_criterias: json, resume_data: json, prompt_resume_analysis_text: str, model: str = MODEL_NAME, vacancy_id: Optional[str] = None) -> dict:
     """
     Sends vacancy description JSON + prompt to OpenAI and returns structured JSON with analysis.
     Args:
         vacancy_data (dict): Vacancy description as a dictionary.
         prompt_text (str): Instruction for the model.
         model (str): Model name (default "gpt-4o").
+        vacancy_id (str): Optional, key for the memoized prompt prefix of the vacancy.
     Returns:
         dict: Parsed JSON response from the model.
     """
-    user_message = f"""
-    Вакансия:
-    {json.dumps(vacancy_description, ensure_ascii=False, indent=2)}
-    Критерии отбора:
-    {json.dumps(sourcing_criterias, ensure_ascii=False, indent=2)}
-    Резюме кандидата:
-    {json.dumps(resume_data, ensure_ascii=False, indent=2)}
-    Задача анализа:
-    {prompt_resume_analysis_text}
-    
-    Важно: Верни результат в формате JSON (json).
-    """
-    response = client.chat.completions.create(
+    cache_key = _get_resume_analysis_cache_key(
+        model, prompt_resume_analysis_text, vacancy_description, sourcing_criterias, resume_data,
+    )
+    cached_result = await _get_cached_analysis(cache_key)
+    if cached_result is not None:
+        logger.debug("analyze_resume_with_ai: Result taken from AI cache.")
+        return cached_result
+    return await _request_resume_analysis(
+        vacancy_description, sourcing_criterias, resume_data, prompt_resume_analysis_text, model, vacancy_id, cache_key,
+    )
+
+
+async def _request_resume_analysis(
+    vacancy_description: dict,
+    sourcing_criterias: dict,
+    resume_data: dict,
+    prompt_resume_analysis_text: str,
+    model: str,
+    vacancy_id: Optional[str],
+    cache_key: str,
+    record_stats: bool = True,
+) -> dict:
+    """OpenAI request for one resume (no cache lookup), result is stored in the AI cache under cache_key."""
+    response = await create_chat_completion(
         model=model,
-        messages=[
-            {"role": "system", "content": "Ты — профессиональный сорсер резюме. Всегда возвращай результат в формате JSON."},
-            {"role": "user", "content": user_message}
-        ],
+        messages=build_resume_analysis_messages(
+            vacancy_description, sourcing_criterias, resume_data, prompt_resume_analysis_text, model, vacancy_id,
+            record_stats,
+        ),
         response_format={"type": "json_object"}  # ensures valid JSON output
     )
     try:
@@ -150,8 +502,145 @@ def analyze_resume_with_ai(vacancy_description: json, sourcing_criterias: json,
     except json.JSONDecodeError:
         logger.warning("Response is not valid JSON, returning raw text instead.")
         result = {"raw_output": response.choices[0].message.content}
+    await _store_analysis(cache_key, result)
     return result
 
+
+async def analyze_resumes_batch_with_ai(
+    vacancy_description: dict,
+    sourcing_criterias: dict,
+    resumes: Dict[str, dict],
+    prompt_resume_analysis_text: str,
+    model: str = MODEL_NAME,
+    batch_size: int = AI_RESUME_BATCH_SIZE,
+    vacancy_id: Optional[str] = None,
+    on_results: Optional[Callable[[Dict[str, dict]], Awaitable[None]]] = None,
+) -> Tuple[Dict[str, dict], Dict[str, str]]:
+    """
+    Analyzes several resumes of the same vacancy: up to batch_size resumes per OpenAI request, so the vacancy,
+    criteria and prompt are sent once per batch instead of once per resume.
+    Args:
+        resumes (dict): negotiation_id -> resume JSON.
+    Returns:
+        tuple: (negotiation_id -> analysis result (same format as analyze_resume_with_ai),
+                negotiation_id -> error for resumes that could not be analyzed). Every requested id is in one of them.
+    Results are cached per resume with the same key as analyze_resume_with_ai. Resumes missing from a batch
+    response or with an invalid result, and whole batches whose response is not readable or whose request failed
+    with a non-retryable error (bad request, context length, ...), are analyzed one by one (without another cache lookup).
+    A batch failed with RETRYABLE_AI_ERRORS (429, timeout, ...) is not split into batch_size more requests: its
+    error (or a retryable error of a single request) is raised after all other batches and fallbacks are done,
+    so the caller's retry policy handles it. Before raising, results received so far are passed to on_results
+    (e.g. to write them to DB); they also stay in the AI cache, so the retry does not pay for them again.
+    """
+    log_prefix = f"analyze_resumes_batch_with_ai ({len(resumes)} resumes)"
+
+    results: Dict[str, dict] = {}
+    errors: Dict[str, str] = {}
+    cache_keys: Dict[str, str] = {}
+    for negotiation_id, resume_data in resumes.items():
+        cache_key = _get_resume_analysis_cache_key(
+            model, prompt_resume_analysis_text, vacancy_description, sourcing_criterias, resume_data,
+        )
+        cached_result = await _get_cached_analysis(cache_key)
+        if cached_result is not None:
+            results[negotiation_id] = cached_result
+        else:
+            cache_keys[negotiation_id] = cache_key
+    if results:
+        logger.debug(f"{log_prefix}: {len(results)} results taken from AI cache")
+
+    pending_ids = list(cache_keys)
+    batches = [pending_ids[i:i + max(batch_size, 1)] for i in range(0, len(pending_ids), max(batch_size, 1))]
+    batch_results = await asyncio.gather(*(
+        _analyze_resume_batch(
+            vacancy_description, sourcing_criterias, {negotiation_id: resumes[negotiation_id] for negotiation_id in batch},
+            prompt_resume_analysis_text, model, vacancy_id,
+        )
+        for batch in batches
+    ), return_exceptions=True)
+
+    fallback_ids = []
+    request_error = None
+    for batch, batch_result in zip(batches, batch_results):
+        if isinstance(batch_result, RETRYABLE_AI_ERRORS):
+            # rate limit, timeout, ...: no fallback, raised after the other batches are done
+            request_error = request_error or batch_result
+            continue
+        if isinstance(batch_result, BaseException):
+            # unreadable response or non-retryable request error (e.g. batch too large) - same resumes one by one
+            logger.warning(f"{log_prefix}: batch of {len(batch)} failed ({type(batch_result).__name__}: {batch_result}), falling back to single requests")
+            fallback_ids.extend(batch)
+            continue
+        for negotiation_id in batch:
+            result = batch_result.get(str(negotiation_id))
+            if isinstance(result, dict) and result:
+                results[negotiation_id] = result
+                await _store_analysis(cache_keys[negotiation_id], result)
+            else:
+                fallback_ids.append(negotiation_id)
+
+    if fallback_ids:
+        logger.info(f"{log_prefix}: {len(fallback_ids)} resumes fall back to single requests")
+        # cache was already checked and projection stats counted for these resumes in the batch request
+        single_results = await asyncio.gather(*(
+            _request_resume_analysis(
+                vacancy_description, sourcing_criterias, resumes[negotiation_id], prompt_resume_analysis_text, model,
+                vacancy_id, cache_keys[negotiation_id], record_stats=False,
+            )
+            for negotiation_id in fallback_ids
+        ), return_exceptions=True)
+        for negotiation_id, result in zip(fallback_ids, single_results):
+            if isinstance(result, RETRYABLE_AI_ERRORS):
+                request_error = request_error or result
+            elif isinstance(result, BaseException):
+                logger.error(f"{log_prefix}: analysis of {negotiation_id} failed: {result}")
+                errors[negotiation_id] = f"{type(result).__name__}: {result}"
+            else:
+                results[negotiation_id] = result
+
+    if request_error is not None:
+        logger.warning(f"{log_prefix}: request failed with retryable error, {len(results)} results kept: {request_error}")
+        if on_results is not None and results:
+            await on_results(results)
+        raise request_error
+    return results, errors
+
+
+async def _analyze_resume_batch(
+    vacancy_description: dict,
+    sourcing_criterias: dict,
+    resumes: Dict[str, dict],
+    prompt_resume_analysis_text: str,
+    model: str,
+    vacancy_id: Optional[str] = None,
+) -> Dict[str, dict]:
+    """One OpenAI request for several resumes. Returns negotiation_id -> result for the ids the model answered."""
+    resumes_text = ",".join(
+        f"{json.dumps(str(negotiation_id))}:{_prepare_resume_for_prompt(resume_data, model)}"
+        for negotiation_id, resume_data in resumes.items()
+    )
+    # same prefix as single-resume requests: batches and single requests of a vacancy share the prompt cache
+    user_message = (
+        f"{get_resume_prompt_prefix(vacancy_description, sourcing_criterias, prompt_resume_analysis_text, vacancy_id)}"
+        "Резюме кандидатов (JSON-объект: id резюме -> резюме; выполни задачу анализа для каждого резюме отдельно, "
+        f"независимо от остальных):\n{{{resumes_text}}}\n\n"
+        'Важно: Верни результат в формате JSON (json) вида {"results": {"<id резюме>": <результат анализа этого резюме>}}.\n'
+        f"Результат для каждого id должен полностью соответствовать формату из задачи анализа. Верни результат для всех {len(resumes)} id."
+    )
+    response = await create_chat_completion(
+        model=model,
+        messages=[
+            {"role": "system", "content": RESUME_ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": user_message}
+        ],
+        response_format={"type": "json_object"}
+    )
+    content = json.loads(response.choices[0].message.content)
+    batch_results = content.get("results") if isinstance(content, dict) else None
+    if not isinstance(batch_results, dict):
+        raise ValueError("batch response has no 'results' object")
+    return {str(negotiation_id): result for negotiation_id, result in batch_results.items()}
+
 # ----- OPENAI ASSISTANT functions -----
 """
 def wait_for_run_completion(thread_id: str, run_id: str, timeout_s: int = 120, poll_s: float = 1.2):
@@ -0,0 +1,447 @@
+# shared_services/async_db_service.py
+# TAGS: [status_validation], [get_data], [create_data], [update_data]
+# Async twin of shared_services/db_service.py for use inside Telegram handlers.
+# Same function names and arguments, but every call must be awaited:
+#     from shared_services.async_db_service import get_column_value_in_db
+#     value = await get_column_value_in_db(db_model=Vacancies, record_id=vacancy_id, field_name="name")
+# Sync scripts (local_db/*, scripts/*) keep using shared_services/db_service.py.
+
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Type, Any, Dict, List
+
+from sqlalchemy import select, update, Boolean, String
+
+from shared_services.database import get_async_session, Base
+from shared_services.cache_service import lookup_cache, get_lookup_cache_key, invalidate_lookup_cache, MISSING
+from shared_services.db_service import (
+    _build_columns_select,
+    _build_negotiation_context_select,
+    _split_negotiation_context_row,
+    _build_bulk_update_params,
+    _build_update_by_field,
+    _build_upsert_statements,
+    _build_manager_status_select,
+    _build_applicant_status_select,
+    BULK_UPSERT_CHUNK_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ****** [create_data] ******
+
+async def create_new_record_in_db(db_model: Type[Base], record_id: str, initial_values: Optional[dict] = None) -> None:
+    """Create a new record with the given ID (async version of db_service.create_new_record_in_db)."""
+
+    log_prefix = f"create_new_record_in_db"
+
+    id_column = db_model.__table__.columns.get("id")
+    if id_column is None:
+        logger.error(f"{log_prefix}:{db_model.__name__} does not have id column")
+        return
+
+    if not isinstance(id_column.type, String):
+        logger.error(f"{log_prefix}:{db_model.__name__}.id is not a String column")
+        return
+
+    async with get_async_session() as db:
+        try:
+            existing = (await db.execute(
+                select(id_column).where(id_column == record_id)
+            )).scalar_one_or_none()
+            if existing is not None:
+                logger.debug(f"{log_prefix}:{db_model.__name__}.{record_id} already exists.")
+                return
+
+            record_kwargs = {"id": record_id}
+            if "first_time_seen" in db_model.__table__.columns:
+                record_kwargs["first_time_seen"] = datetime.now(timezone.utc)
+
+            if initial_values:
+                for key, value in initial_values.items():
+                    if key in db_model.__table__.columns:
+                        record_kwargs[key] = value
+
+            db.add(db_model(**record_kwargs))
+            await db.commit()
+            invalidate_lookup_cache(db_model, record_kwargs.keys())
+            logger.debug(f"{log_prefix}:{db_model.__name__}.{record_id} added to database")
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"{log_prefix}:{db_model.__name__}.{record_id} error: {e}")
+            raise
+
+
+async def bulk_upsert_records_in_db(
+    db_model: Type[Base],
+    records: List[Dict[str, Any]],
+    update_fields: Optional[List[str]] = None,
+    chunk_size: int = BULK_UPSERT_CHUNK_SIZE,
+) -> Dict[str, int]:
+    """Insert many records with INSERT ... ON CONFLICT (id) in chunks, one commit for all chunks.
+    update_fields: columns to overwrite for existing records (None = DO NOTHING).
+    Returns {"inserted": <new records>, "existing": <records that were already in database>}.
+    """
+    log_prefix = f"bulk_upsert_records_in_db: {db_model.__name__}"
+
+    statements = _build_upsert_statements(db_model=db_model, records=records, update_fields=update_fields, chunk_size=chunk_size, log_prefix=log_prefix)
+    if statements is None:
+        return {"inserted": 0, "existing": 0}
+
+    inserted = 0
+    total = 0
+    async with get_async_session() as db:
+        try:
+            for stmt, rows_in_chunk in statements:
+                inserted += sum(1 for is_inserted in (await db.execute(stmt)).scalars() if is_inserted)
+                total += rows_in_chunk
+            await db.commit()
+            invalidate_lookup_cache(db_model, update_fields or [])
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"{log_prefix} error: {e}")
+            raise
+
+    logger.debug(f"{log_prefix} inserted {inserted}, existing {total - inserted}")
+    return {"inserted": inserted, "existing": total - inserted}
+
+
+# ****** [status_validation] ******
+
+async def is_boolean_field_true_in_db(db_model: Type[Base], record_id: str, field_name: str) -> bool:
+
+    log_prefix = f"is_boolean_field_true_in_db: {db_model.__name__}.{field_name}"
+
+    column = db_model.__table__.columns.get(field_name)
+    if column is None:
+        logger.warning(f"{log_prefix} does not have column {field_name}")
+        return False
+    if not isinstance(column.type, Boolean):
+        logger.warning(f"{log_prefix} is not a Boolean column")
+        return False
+    id_column = db_model.__table__.columns.get("id")
+    if id_column is None:
+        logger.warning(f"{log_prefix} does not have id column")
+        return False
+    if not isinstance(id_column.type, String):
+        logger.error(f"{log_prefix}.id is not a String column")
+        return False
+
+    async with get_async_session() as db:
+        value = (await db.execute(
+            select(column).where(id_column == record_id)
+        )).scalar_one_or_none()
+
+    if value is None:
+        logger.debug(f"{log_prefix} {record_id} not found in database")
+        return False
+
+    return value
+
+
+async def is_value_in_db(db_model: Type[Base], field_name: str, value: Any) -> bool:
+
+    log_prefix = f"is_value_in_db: {db_model.__name__}.{field_name}"
+
+    column = db_model.__table__.columns.get(field_name)
+    if column is None:
+        logger.warning(f"{log_prefix} does not have column {field_name}")
+        return False
+
+    async with get_async_session() as db:
+        match = (await db.execute(
+            select(column).where(column == value).limit(1)
+        )).scalar_one_or_none()
+
+    return match is not None
+
+
+# ****** [get_data] ******
+
+async def get_column_value_in_db(db_model: Type[Base], record_id: str, field_name: str) -> Any:
+
+    log_prefix = f"get_column_value_in_db: {db_model.__name__}.{field_name}"
+
+    column = db_model.__table__.columns.get(field_name)
+    if column is None:
+        logger.warning(f"{log_prefix} does not have column")
+        return None
+
+    id_column = db_model.__table__.columns.get("id")
+    if id_column is None:
+        logger.warning(f"{log_prefix} does not have id column")
+        return None
+
+    if not isinstance(id_column.type, String):
+        logger.error(f"{log_prefix}.id is not a String column")
+        return None
+
+    cache_key = get_lookup_cache_key(db_model, "id", record_id, field_name)
+    if cache_key is not None:
+        cached_value = lookup_cache.get(cache_key)
+        if cached_value is not MISSING:
+            return cached_value
+
+    async with get_async_session() as db:
+        value = (await db.execute(
+            select(column).where(id_column == record_id)
+        )).scalar_one_or_none()
+
+    if cache_key is not None and value is not None:
+        lookup_cache.set(cache_key, value)
+    return value
+
+
+async def get_column_value_by_field(db_model: Type[Base], search_field_name: str, search_value: Any, target_field_name: str) -> Any:
+    """Get a column value from a record found by a field other than id.
+    Returns the value of the target field, or None if not found.
+    """
+    log_prefix = f"get_column_value_by_field: {db_model.__name__}.{search_field_name}={search_value}.{target_field_name}"
+
+    search_column = db_model.__table__.columns.get(search_field_name)
+    if search_column is None:
+        logger.warning(f"{log_prefix} does not have search column {search_field_name}")
+        return None
+
+    target_column = db_model.__table__.columns.get(target_field_name)
+    if target_column is None:
+        logger.warning(f"{log_prefix} does not have target column {target_field_name}")
+        return None
+
+    cache_key = get_lookup_cache_key(db_model, search_field_name, search_value, target_field_name)
+    if cache_key is not None:
+        cached_value = lookup_cache.get(cache_key)
+        if cached_value is not MISSING:
+            return cached_value
+
+    async with get_async_session() as db:
+        value = (await db.execute(
+            select(target_column).where(search_column == search_value)
+        )).scalar_one_or_none()
+
+    if cache_key is not None and value is not None:
+        lookup_cache.set(cache_key, value)
+    return value
+
+
+async def get_columns(db_model: Type[Base], record_id: str, fields: List[str]) -> Optional[Dict[str, Any]]:
+    """Get several column values of one record in a single SELECT.
+    Returns dict {field_name: value}, or None if record not found.
+    """
+    log_prefix = f"get_columns: {db_model.__name__}.{record_id}"
+
+    stmt = _build_columns_select(db_model=db_model, record_id=record_id, fields=fields, log_prefix=log_prefix)
+    if stmt is None:
+        return None
+
+    async with get_async_session() as db:
+        row = (await db.execute(stmt)).mappings().one_or_none()
+
+    if row is None:
+        logger.debug(f"{log_prefix} not found in database")
+        return None
+
+    return dict(row)
+
+
+async def get_record_snapshot(db_model: Type[Base], record_id: str, exclude_fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """Get all columns of one record (except exclude_fields) in a single SELECT."""
+    exclude = set(exclude_fields or [])
+    fields = [column.name for column in db_model.__table__.columns if column.name not in exclude]
+    return await get_columns(db_model=db_model, record_id=record_id, fields=fields)
+
+
+async def get_negotiation_context(
+    negotiation_id: str,
+    negotiation_fields: Optional[List[str]] = None,
+    vacancy_fields: Optional[List[str]] = None,
+    manager_fields: Optional[List[str]] = None,
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Get negotiation, its vacancy and the vacancy manager in one joined query.
+    Returns {"negotiation": {...}, "vacancy": {...}, "manager": {...}} or None if negotiation not found.
+    """
+    log_prefix = f"get_negotiation_context: {negotiation_id}"
+
+    stmt = _build_negotiation_context_select(
+        negotiation_id=negotiation_id,
+        negotiation_fields=negotiation_fields,
+        vacancy_fields=vacancy_fields,
+        manager_fields=manager_fields,
+        log_prefix=log_prefix,
+    )
+    if stmt is None:
+        return None
+
+    async with get_async_session() as db:
+        row = (await db.execute(stmt)).mappings().one_or_none()
+
+    if row is None:
+        logger.debug(f"{log_prefix} not found in database")
+        return None
+
+    return _split_negotiation_context_row(row)
+
+
+async def get_manager_status_snapshot(manager_id: str) -> Optional[Dict[str, Any]]:
+    """Get manager status flags and vacancy (id, name, video_received, sourcing_criterias_confirmed) in one query.
+    Returns None if manager not found.
+    """
+    async with get_async_session() as db:
+        row = (await db.execute(_build_manager_status_select(manager_id))).mappings().one_or_none()
+    return dict(row) if row is not None else None
+
+
+async def get_applicant_status_snapshot(tg_user_id: str) -> Optional[Dict[str, Any]]:
+    """Get applicant negotiation status flags in one query. Returns None if no negotiation for this Telegram user."""
+    async with get_async_session() as db:
+        row = (await db.execute(_build_applicant_status_select(tg_user_id))).mappings().one_or_none()
+    return dict(row) if row is not None else None
+
+
+async def update_column_value_by_field(db_model: Type[Base], search_field_name: str, search_value: Any, target_field_name: str, new_value: Any) -> bool:
+    """Update a column value in a record found by a field other than id.
+    Returns True if update was successful, False otherwise.
+    """
+    log_prefix = f"update_column_value_by_field: {db_model.__name__}.{search_field_name}={search_value}.{target_field_name}"
+
+    search_column = db_model.__table__.columns.get(search_field_name)
+    if search_column is None:
+        logger.warning(f"{log_prefix} does not have search column {search_field_name}")
+        return False
+
+    target_column = db_model.__table__.columns.get(target_field_name)
+    if target_column is None:
+        logger.warning(f"{log_prefix} does not have target column {target_field_name}")
+        return False
+
+    async with get_async_session() as db:
+        try:
+            result = await db.execute(
+                update(db_model).where(search_column == search_value).values({target_field_name: new_value})
+            )
+            if result.rowcount == 0:
+                logger.debug(f"{log_prefix} no records found to update")
+                return False
+            await db.commit()
+            invalidate_lookup_cache(db_model, [target_field_name])
+            logger.debug(f"{log_prefix} successfully updated {result.rowcount} record(s)")
+            return True
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"{log_prefix} error: {e}")
+            raise
+
+
+# ****** [update_data] ******
+
+async def update_record_in_db(db_model: Type[Base], record_id: str, updates: Dict[str, Any]) -> None:
+
+    log_prefix = f"update_record_in_db: {db_model.__name__}.{record_id}"
+
+    if not updates:
+        logger.warning(f"{log_prefix} no updates provided")
+        return
+
+    id_column = db_model.__table__.columns.get("id")
+    if id_column is None:
+        logger.error(f"{log_prefix} does not have id column")
+        return
+    if not isinstance(id_column.type, String):
+        logger.error(f"{log_prefix}.id is not a String column")
+        return
+
+    async with get_async_session() as db:
+        try:
+            result = await db.execute(
+                update(db_model).where(id_column == record_id).values(updates)
+            )
+            if result.rowcount == 0:
+                logger.debug(f"{log_prefix} not found in database")
+            await db.commit()
+            invalidate_lookup_cache(db_model, updates.keys())
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"{log_prefix} error: {e}")
+            raise
+
+
+async def update_records_in_db(db_model: Type[Base], updates_by_id: Dict[str, Dict[str, Any]]) -> None:
+    """Update many records in one transaction (single commit).
+    updates_by_id: {record_id: {column: new_value, ...}, ...}
+    """
+
+    log_prefix = f"update_records_in_db: {db_model.__name__}"
+
+    params = _build_bulk_update_params(db_model=db_model, updates_by_id=updates_by_id, log_prefix=log_prefix)
+    if not params:
+        return
+
+    async with get_async_session() as db:
+        try:
+            await db.execute(update(db_model), params)
+            await db.commit()
+            invalidate_lookup_cache(db_model, {field for updates in updates_by_id.values() for field in updates})
+            logger.debug(f"{log_prefix} updated {len(params)} record(s)")
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"{log_prefix} error: {e}")
+            raise
+
+
+async def update_columns_by_field(db_model: Type[Base], search_field_name: str, search_value: Any, updates: Dict[str, Any]) -> bool:
+    """Update several columns of record(s) found by a field other than id in one statement.
+    Returns True if at least one record was updated, False otherwise.
+    """
+    log_prefix = f"update_columns_by_field: {db_model.__name__}.{search_field_name}={search_value}"
+
+    stmt = _build_update_by_field(db_model=db_model, search_field_name=search_field_name, search_value=search_value, updates=updates, log_prefix=log_prefix)
+    if stmt is None:
+        return False
+
+    async with get_async_session() as db:
+        try:
+            result = await db.execute(stmt)
+            if result.rowcount == 0:
+                logger.debug(f"{log_prefix} no records found to update")
+                return False
+            await db.commit()
+            invalidate_lookup_cache(db_model, updates.keys())
+            logger.debug(f"{log_prefix} successfully updated {result.rowcount} record(s)")
+            return True
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"{log_prefix} error: {e}")
+            raise
+
+
+async def clear_column_value_in_db(db_model: Type[Base], record_id: str, field_name: str) -> None:
+
+    log_prefix = f"clear_column_value_in_db: {db_model.__name__}.{record_id}.{field_name}"
+
+    column = db_model.__table__.columns.get(field_name)
+    if column is None:
+        logger.warning(f"{log_prefix} does not have column {field_name}")
+        return
+
+    id_column = db_model.__table__.columns.get("id")
+    if id_column is None:
+        logger.error(f"{log_prefix} does not have id column")
+        return
+    if not isinstance(id_column.type, String):
+        logger.error(f"{log_prefix}.id is not a String column")
+        return
+
+    async with get_async_session() as db:
+        try:
+            result = await db.execute(
+                update(db_model).where(id_column == record_id).values({field_name: None})
+            )
+            if result.rowcount == 0:
+                logger.debug(f"{log_prefix} not found in database")
+            await db.commit()
+            invalidate_lookup_cache(db_model, [field_name])
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"{log_prefix} error: {e}")
+            raise
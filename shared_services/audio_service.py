@@ -9,7 +9,7 @@ from pathlib import Path
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from shared_services.db_service import (
+from shared_services.async_db_service import (
     get_column_value_in_db,
     update_record_in_db,
     get_column_value_by_field,
@@ -138,7 +138,7 @@ async def download_incoming_audio_locally(update: Update, context: ContextTypes.
         audio_dir_path = get_data_subdirectory_path(subdirectory_name="audio")
         logger.info(f"download_incoming_audio_locally: target audio_dir_path={audio_dir_path}")
 
-        vacancy_id = get_column_value_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, target_field_name="id")
+        vacancy_id = await get_column_value_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, target_field_name="id")
         
 
         if audio_dir_path is None:
@@ -0,0 +1,249 @@
+# shared_services/cache_service.py
+# In-process TTL + LRU cache for hot, mostly-immutable DB lookups
+# (tg_user_id -> negotiation_id, negotiation_id -> vacancy_id, vacancy_id -> video_path, manager_id -> vacancy_id).
+# Used by db_service.py / async_db_service.py read helpers; their write helpers invalidate it.
+# Cache is per process: a write made by the other bot becomes visible after TTL at the latest.
+# DiskCache: persistent content-addressed cache of JSON values (AI analyses, see ai_service.py),
+# survives restarts and is shared by both bots.
+
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sentinel for "not in cache" (None is a valid cached value)
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache where every entry also expires after ttl seconds."""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300.0, name: str = "cache"):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Return cached value or default. Expired entries count as a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            # mark as recently used
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove all entries whose key matches predicate. Returns number of removed entries."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._data)
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": size,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def get_content_hash(payload: Any) -> str:
+    """Stable sha256 of a JSON-serializable payload: keys sorted, no whitespace, so equal content = equal hash."""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Thread-safe on-disk cache of JSON values: one file per key in directory/<first 2 chars of key>/<key>.json.
+    Entries expire after ttl seconds; when there are more than maxsize entries, the least recently used
+    (by file mtime, refreshed on every hit) are deleted. Keys are expected to be hashes (get_content_hash).
+    """
+
+    def __init__(self, directory: Path, maxsize: int = 20000, ttl: float = 30 * 24 * 3600, name: str = "disk_cache"):
+        self.directory = Path(directory)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._lock = threading.Lock()
+        # number of entries on disk, counted once on first write
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        """Return cached value or default. Expired or unreadable entries count as a miss and are removed."""
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                self._discard(path)
+                raise FileNotFoundError(path)
+            value = json.loads(path.read_text(encoding="utf-8"))
+            # mark as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return default
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        existed = path.exists()
+        # write to temporary file and rename, so a reader never sees a half-written entry
+        # pid + thread id: the directory is shared by both bots, thread ids alone can repeat across processes
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(value, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.stores += 1
+            if self._size is None:
+                self._size = sum(1 for _ in self.directory.glob("*/*.json"))
+            elif not existed:
+                self._size += 1
+            if self._size > self.maxsize:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete expired entries, then least recently used ones down to 90% of maxsize (called under lock)."""
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        entries.sort()
+        now = time.time()
+        keep = int(self.maxsize * 0.9)
+        removed = 0
+        for index, (mtime, path) in enumerate(entries):
+            if now - mtime <= self.ttl and len(entries) - index <= keep:
+                break
+            self._remove(path)
+            removed += 1
+        self._size = len(entries) - removed
+        self.evictions += removed
+        logger.info(f"{self.name}: evicted {removed} entries, {self._size} left")
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except OSError:
+            return False
+
+    def _discard(self, path: Path) -> None:
+        """Remove one entry outside of _evict and keep the entry count in sync."""
+        with self._lock:
+            if self._remove(path) and self._size:
+                self._size -= 1
+
+    def invalidate(self, key: str) -> None:
+        self._discard(self._path(key))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": self._size,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# ----- DB LOOKUP CACHE -----
+
+# (table name, search column, target column) pairs that are safe to cache: they are written once
+# during user setup and then only read on every button press
+CACHEABLE_LOOKUPS = {
+    ("negotiations", "tg_user_id", "id"),
+    ("negotiations", "id", "vacancy_id"),
+    ("vacancies", "id", "video_path"),
+    ("vacancies", "manager_id", "id"),
+}
+
+lookup_cache = TTLCache(
+    maxsize=int(os.getenv("LOOKUP_CACHE_MAXSIZE", "20000")),
+    ttl=float(os.getenv("LOOKUP_CACHE_TTL_SECS", "300")),
+    name="db_lookup",
+)
+
+
+def get_lookup_cache_key(db_model, search_field_name: str, search_value: Any, target_field_name: str) -> Optional[tuple]:
+    """Return cache key for the lookup or None if this lookup is not cacheable."""
+    table_name = db_model.__tablename__
+    if (table_name, search_field_name, target_field_name) not in CACHEABLE_LOOKUPS:
+        return None
+    return (table_name, search_field_name, search_value, target_field_name)
+
+
+def invalidate_lookup_cache(db_model, field_names: Iterable[str]) -> None:
+    """Drop cached lookups of db_model that search by or return any of the written columns.
+    Coarse (all records of the table), but these columns are rarely written.
+    """
+    table_name = db_model.__tablename__
+    fields = set(field_names)
+    if not any(lookup[0] == table_name and (lookup[1] in fields or lookup[2] in fields) for lookup in CACHEABLE_LOOKUPS):
+        return
+    removed = lookup_cache.invalidate_where(
+        lambda key: key[0] == table_name and (key[1] in fields or key[3] in fields)
+    )
+    if removed:
+        logger.debug(f"invalidate_lookup_cache: {table_name}.{sorted(fields)} removed {removed} entries")
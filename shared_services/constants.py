@@ -32,6 +32,32 @@ RESUME_SUBDIRECTORIES_LIST = ["new", "passed", "failed"]
 # ----- AI SERVICE CONSTANTS -----
 MODEL_NAME = "gpt-5"
 
+# ----- TASK QUEUE CONSTANTS -----
+AI_TASK_QUEUE_MAXSIZE = 500
+TASK_LANE_RESUME_ANALYSIS = "resume_analysis"
+TASK_LANE_VACANCY_ANALYSIS = "vacancy_analysis"
+# lane -> number of parallel workers (OpenAI requests in flight)
+AI_TASK_QUEUE_LANES = {
+    TASK_LANE_RESUME_ANALYSIS: 8,
+    TASK_LANE_VACANCY_ANALYSIS: 2,
+}
+# retries of AI tasks failed with transient errors (OpenAI 429 / timeouts, DB connection errors)
+AI_TASK_MAX_ATTEMPTS = 4
+AI_TASK_RETRY_BASE_DELAY_SECS = 5
+AI_TASK_RETRY_MAX_DELAY_SECS = 120
+# how long admin commands wait for their queued AI task before replying "still running"
+ADMIN_TASK_WAIT_TIMEOUT_SECS = 300
+# in-memory queue for delayed follow-ups of user flows (handlers enqueue them instead of sleeping)
+TASK_LANE_FOLLOWUPS = "followups"
+FOLLOWUP_TASK_QUEUE_WORKERS = 4
+# HH.ru OAuth: how often and how many times to check if the user has authorized (~3 minutes)
+HH_AUTH_CHECK_INTERVAL_SECS = 6
+HH_AUTH_CHECK_MAX_ATTEMPTS = 30
+# shutdown: how long running AI tasks may finish (the orchestrator kills the bot 30 s after SIGTERM),
+# unfinished in-memory tasks are saved to this file in the users data dir and restored on the next start
+TASK_QUEUE_DRAIN_DEADLINE_SECS = 20
+AI_TASK_QUEUE_CHECKPOINT_FILENAME = "ai_task_queue_checkpoint.json"
+
 # ----- VIDEO SERVICE CONSTANTS -----
 MAX_DURATION_SECS = 90
 
@@ -11,13 +11,18 @@ from sqlalchemy import (
     String,
     Boolean,
     BigInteger,
+    Integer,
+    Float,
     TIMESTAMP,
     ForeignKey,
+    Index,
     text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker, deferred
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.sql import func
 
 logger = logging.getLogger(__name__)
@@ -36,6 +41,15 @@ def _get_database_url() -> str:
     return url
 
 
+def _get_async_database_url() -> str:
+    """Same DATABASE_URL, but with the async psycopg (v3) driver."""
+    url = _get_database_url()
+    for prefix in ("postgresql+psycopg2://", "postgresql+psycopg://", "postgresql://"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+psycopg://", 1)
+    return url
+
+
 def _engine_config():
     pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
     max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
@@ -80,6 +94,45 @@ def get_session():
     return get_session_factory()()
 
 
+# Async engine/session for bot handlers: same pool settings, separate pool (one per process event loop)
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def get_async_engine():
+    """Return the shared AsyncEngine. Creates it on first call."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(_get_async_database_url(), **_engine_config())
+    return _async_engine
+
+
+def get_async_session_factory():
+    """Return the async_sessionmaker (AsyncSessionLocal). Creates it on first call."""
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _AsyncSessionLocal
+
+
+def get_async_session():
+    """Return a new AsyncSession. Use as `async with get_async_session() as db:`."""
+    return get_async_session_factory()()
+
+
+async def dispose_async_engine() -> None:
+    """Close all pooled async connections (call on bot shutdown)."""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _AsyncSessionLocal = None
+
+
 Base = declarative_base()
 
 
@@ -113,7 +166,8 @@ class Vacancies(Base):
     video_received = Column(Boolean, default=False, nullable=False)
     video_path = Column(String)
     description_recieved = Column(Boolean, default=False, nullable=False)
-    description_json = Column(JSONB)
+    # heavy JSONB payload: not loaded with ORM objects until accessed (or undefer_group("vacancy_payload"))
+    description_json = deferred(Column(JSONB), group="vacancy_payload")
     sourcing_criterias_recieved = Column(Boolean, default=False, nullable=False)
     sourcing_criterias_json = Column(JSONB)
     sourcing_criterias_confirmed = Column(Boolean, default=False, nullable=False)
@@ -121,6 +175,11 @@ class Vacancies(Base):
     created_at = Column(TIMESTAMP(timezone=True), default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), default=func.now(), onupdate=func.now())
 
+    # Indexes are also created for existing databases by scripts/migrate.py (schema version 2)
+    __table_args__ = (
+        Index("ix_vacancies_manager_id", "manager_id"),
+    )
+
 
 class Negotiations(Base):
     __tablename__ = "negotiations"
@@ -152,8 +211,10 @@ class Negotiations(Base):
     video_received = Column(Boolean, default=False, nullable=False)
     video_path = Column(String)
 
-    resume_json = Column(JSONB)
-    resume_ai_analysis = Column(JSONB)
+    # heavy JSONB payloads (tens of KB per row): not loaded with ORM objects until accessed
+    # (or undefer_group("resume_payload")); prefer column-only selects for lists
+    resume_json = deferred(Column(JSONB), group="resume_payload")
+    resume_ai_analysis = deferred(Column(JSONB), group="resume_payload")
     resume_ai_score = Column(String)
     resume_sorting_status = Column(String, default="new")
 
@@ -164,6 +225,73 @@ class Negotiations(Base):
     created_at = Column(TIMESTAMP(timezone=True), default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), default=func.now(), onupdate=func.now())
 
+    # Indexes are also created for existing databases by scripts/migrate.py (schema version 2)
+    __table_args__ = (
+        Index("ix_negotiations_tg_user_id", "tg_user_id"),
+        Index("ix_negotiations_resume_id", "resume_id"),
+        Index("ix_negotiations_vacancy_id_sorting_status", "vacancy_id", "resume_sorting_status"),
+        Index(
+            "ix_negotiations_vacancy_id_link_not_sent",
+            "vacancy_id",
+            postgresql_where=text("link_to_tg_bot_sent = false"),
+        ),
+    )
+
+
+class QueuedTasks(Base):
+    """Durable TaskQueue backend (shared_services/task_store_service.py). One row = one queued or running task.
+    Rows are deleted when the task completes; failed rows are kept with last_error."""
+    __tablename__ = "queued_tasks"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    task_id = Column(String)
+    lane = Column(String, nullable=False)
+    # name under which the function is registered with task_queue_service.register_task
+    func_name = Column(String, nullable=False)
+    args = Column(JSONB, default=list)
+    kwargs = Column(JSONB, default=dict)
+    # TaskQueue PRIORITY_* and claim order: enqueue epoch + priority * aging secs (lower = earlier)
+    priority = Column(Integer, default=10, nullable=False)
+    sort_key = Column(Float)
+    # pending -> running -> (deleted) | failed
+    status = Column(String, default="pending", nullable=False)
+    # failed executions (counted by the retry policy) and runs lost with a crashed worker, counted separately
+    attempts = Column(Integer, default=0, nullable=False)
+    lease_expirations = Column(Integer, default=0, nullable=False)
+    # RetryPolicy.to_dict of the task (NULL = lane / queue policy)
+    retry_policy = Column(JSONB)
+    locked_by = Column(String)
+    # running task whose lease expired (worker crashed) is claimed again by another worker
+    locked_until = Column(TIMESTAMP(timezone=True))
+    # pending task waiting for retry backoff is not claimed before this time
+    available_at = Column(TIMESTAMP(timezone=True))
+    last_error = Column(String)
+    created_at = Column(TIMESTAMP(timezone=True), default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), default=func.now(), onupdate=func.now())
+
+    # Created by scripts/migrate.py (schema versions 3, 4, 5, 6, 7)
+    __table_args__ = (
+        Index("ix_queued_tasks_lane_status_id", "lane", "status", "id"),
+        Index("ix_queued_tasks_lane_status_sort_key", "lane", "status", "sort_key"),
+        # deduplication lookup: active tasks by task_id
+        Index(
+            "ix_queued_tasks_task_id_active",
+            "task_id",
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+
+
+def get_non_deferred_columns(db_model) -> list:
+    """Return model columns except deferred heavy ones, e.g. for column-only list queries:
+    db.execute(select(*get_non_deferred_columns(Negotiations)).where(...)).mappings().all()
+    """
+    return [
+        column_property.columns[0]
+        for column_property in sa_inspect(db_model).column_attrs
+        if not column_property.deferred
+    ]
+
 
 # Ensure engine and session factory are created on first import (for backward-compat names below)
 def _bind_engine_and_session():
@@ -15,10 +15,12 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from telegram import Update
-from sqlalchemy import select, Boolean, String
+from sqlalchemy import select, update, literal_column, Boolean, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from config import *
 from shared_services.database import SessionLocal, Managers, Vacancies, Negotiations, Base
+from shared_services.cache_service import lookup_cache, get_lookup_cache_key, invalidate_lookup_cache, MISSING
 from shared_services.constants import (
     BOT_FOR_APPLICANTS_USERNAME,
     AUTH_REQ_TEXT,
@@ -39,6 +41,8 @@ from config import HH_CLIENT_ID, OAUTH_REDIRECT_URL
 
 logger = logging.getLogger(__name__)
 
+BULK_UPSERT_CHUNK_SIZE = 500
+
 
 # ****** [create_data] ******
 
@@ -89,6 +93,7 @@ def create_new_record_in_db(db_model: Type[Base], record_id: str, initial_values
         new_record = db_model(**record_kwargs)
         db.add(new_record)
         db.commit()
+        invalidate_lookup_cache(db_model, record_kwargs.keys())
         logger.debug(f"{log_prefix}:{db_model.__name__}.{record_id} added to database")
     except Exception as e:
         db.rollback()
@@ -98,6 +103,117 @@ def create_new_record_in_db(db_model: Type[Base], record_id: str, initial_values
         db.close()
 
 
+def bulk_upsert_records_in_db(
+    db_model: Type[Base],
+    records: List[Dict[str, Any]],
+    update_fields: Optional[List[str]] = None,
+    chunk_size: int = BULK_UPSERT_CHUNK_SIZE,
+) -> Dict[str, int]:
+    """Insert many records with INSERT ... ON CONFLICT (id) in chunks, one commit for all chunks.
+    Args:
+        db_model: The database model class (Managers, Vacancies, Negotiations, etc.)
+        records: [{"id": ..., column: value, ...}, ...]; keys may differ between records:
+                 missing columns get their defaults on insert and are not overwritten on update
+        update_fields: columns to overwrite for already existing records
+                       (None or [] = ON CONFLICT DO NOTHING, existing records are left untouched)
+        chunk_size: number of rows per INSERT statement
+    Returns:
+        {"inserted": <new records>, "existing": <records that were already in database>}
+    """
+    log_prefix = f"bulk_upsert_records_in_db: {db_model.__name__}"
+
+    statements = _build_upsert_statements(db_model=db_model, records=records, update_fields=update_fields, chunk_size=chunk_size, log_prefix=log_prefix)
+    if statements is None:
+        return {"inserted": 0, "existing": 0}
+
+    inserted = 0
+    total = 0
+    db = SessionLocal()
+    try:
+        for stmt, rows_in_chunk in statements:
+            inserted += sum(1 for is_inserted in db.execute(stmt).scalars() if is_inserted)
+            total += rows_in_chunk
+        db.commit()
+        invalidate_lookup_cache(db_model, update_fields or [])
+    except Exception as e:
+        db.rollback()
+        logger.error(f"{log_prefix} error: {e}")
+        raise
+    finally:
+        db.close()
+
+    logger.debug(f"{log_prefix} inserted {inserted}, existing {total - inserted}")
+    return {"inserted": inserted, "existing": total - inserted}
+
+
+def _build_upsert_statements(
+    db_model: Type[Base],
+    records: List[Dict[str, Any]],
+    update_fields: Optional[List[str]],
+    chunk_size: int,
+    log_prefix: str,
+) -> Optional[list]:
+    """Validate records and build [(INSERT ... ON CONFLICT statement, rows in chunk), ...].
+    Every statement RETURNS one boolean per affected row: True if the row was inserted.
+    """
+
+    if not records:
+        logger.debug(f"{log_prefix} no records provided")
+        return None
+
+    id_column = db_model.__table__.columns.get("id")
+    if id_column is None:
+        logger.error(f"{log_prefix} does not have id column")
+        return None
+    if not isinstance(id_column.type, String):
+        logger.error(f"{log_prefix}.id is not a String column")
+        return None
+
+    # duplicated ids in one statement are not allowed by ON CONFLICT: the last record with an id wins
+    fields = []
+    records_by_id = {}
+    for record in records:
+        if record.get("id") is None:
+            logger.warning(f"{log_prefix} skipping record without id: {record}")
+            continue
+        for key in record:
+            if key not in fields:
+                fields.append(key)
+        records_by_id[record["id"]] = record
+    if not records_by_id:
+        return None
+
+    if _resolve_columns(db_model=db_model, fields=fields, log_prefix=log_prefix) is None:
+        return None
+    if update_fields and _resolve_columns(db_model=db_model, fields=update_fields, log_prefix=log_prefix) is None:
+        return None
+
+    # all rows in one INSERT must have the same keys: records are grouped by their key set, one statement per group.
+    # Filling missing keys with None would insert explicit NULLs instead of column defaults
+    # (and fail on NOT NULL columns such as link_to_tg_bot_sent)
+    rows_by_keys: Dict[frozenset, List[Dict[str, Any]]] = {}
+    for record in records_by_id.values():
+        rows_by_keys.setdefault(frozenset(record), []).append(record)
+
+    statements = []
+    for keys, group_rows in rows_by_keys.items():
+        # only columns present in the group are overwritten: excluded.<missing column> is its default, not the new value
+        group_update_fields = [field for field in (update_fields or []) if field in keys]
+        for start in range(0, len(group_rows), chunk_size):
+            chunk = group_rows[start:start + chunk_size]
+            stmt = pg_insert(db_model).values(chunk)
+            if group_update_fields:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[id_column],
+                    set_={field: stmt.excluded[field] for field in group_update_fields},
+                ).returning(literal_column("xmax = 0"))
+            else:
+                # DO NOTHING returns only inserted rows
+                stmt = stmt.on_conflict_do_nothing(index_elements=[id_column]).returning(literal_column("true"))
+            statements.append((stmt, len(chunk)))
+    return statements
+
+
 # ****** [status_validation] ******
 
 
@@ -176,11 +292,20 @@ def get_column_value_in_db(db_model: Type[Base], record_id: str, field_name: str
         logger.error(f"{log_prefix}.id is not a String column")
         return None
 
+    cache_key = get_lookup_cache_key(db_model, "id", record_id, field_name)
+    if cache_key is not None:
+        cached_value = lookup_cache.get(cache_key)
+        if cached_value is not MISSING:
+            return cached_value
+
     with SessionLocal() as db:
         value = db.execute(
             select(column).where(id_column == record_id)
         ).scalar_one_or_none()
 
+    # "not found" is not cached: the record may be created later
+    if cache_key is not None and value is not None:
+        lookup_cache.set(cache_key, value)
     return value
 
 
@@ -206,14 +331,230 @@ def get_column_value_by_field(db_model: Type[Base], search_field_name: str, sear
         logger.warning(f"{log_prefix} does not have target column {target_field_name}")
         return None
     
+    cache_key = get_lookup_cache_key(db_model, search_field_name, search_value, target_field_name)
+    if cache_key is not None:
+        cached_value = lookup_cache.get(cache_key)
+        if cached_value is not MISSING:
+            return cached_value
+
     with SessionLocal() as db:
         value = db.execute(
             select(target_column).where(search_column == search_value)
         ).scalar_one_or_none()
     
+    # "not found" is not cached: the record may be created later
+    if cache_key is not None and value is not None:
+        lookup_cache.set(cache_key, value)
     return value
 
 
+def _resolve_columns(db_model: Type[Base], fields: List[str], log_prefix: str) -> Optional[list]:
+    """Return Column objects for the given field names or None if any of them is missing."""
+    columns = []
+    for field_name in fields:
+        column = db_model.__table__.columns.get(field_name)
+        if column is None:
+            logger.warning(f"{log_prefix} does not have column {field_name}")
+            return None
+        columns.append(column)
+    return columns
+
+
+def _build_columns_select(db_model: Type[Base], record_id: str, fields: List[str], log_prefix: str):
+    """Build SELECT of several columns of one record by id. Returns None if validation fails."""
+
+    if not fields:
+        logger.warning(f"{log_prefix} no fields provided")
+        return None
+
+    id_column = db_model.__table__.columns.get("id")
+    if id_column is None:
+        logger.warning(f"{log_prefix} does not have id column")
+        return None
+    if not isinstance(id_column.type, String):
+        logger.error(f"{log_prefix}.id is not a String column")
+        return None
+
+    columns = _resolve_columns(db_model=db_model, fields=fields, log_prefix=log_prefix)
+    if columns is None:
+        return None
+
+    return select(*columns).where(id_column == record_id)
+
+
+# Default columns loaded by get_negotiation_context(): everything needed to call HH API for a negotiation
+NEGOTIATION_CONTEXT_DEFAULT_FIELDS = {
+    "negotiation": ["id", "vacancy_id", "resume_id"],
+    "vacancy": ["id", "manager_id"],
+    "manager": ["id", "access_token"],
+}
+
+
+def _build_negotiation_context_select(
+    negotiation_id: str,
+    negotiation_fields: Optional[List[str]],
+    vacancy_fields: Optional[List[str]],
+    manager_fields: Optional[List[str]],
+    log_prefix: str,
+):
+    """Build one SELECT over Negotiations -> Vacancies -> Managers.
+    Result columns are labeled "<part>__<field>" (e.g. "vacancy__description_json").
+    """
+    parts = [
+        ("negotiation", Negotiations, negotiation_fields),
+        ("vacancy", Vacancies, vacancy_fields),
+        ("manager", Managers, manager_fields),
+    ]
+    labeled_columns = []
+    for part_name, part_model, part_fields in parts:
+        if part_fields is None:
+            part_fields = NEGOTIATION_CONTEXT_DEFAULT_FIELDS[part_name]
+        columns = _resolve_columns(db_model=part_model, fields=part_fields, log_prefix=log_prefix)
+        if columns is None:
+            return None
+        labeled_columns.extend(column.label(f"{part_name}__{column.name}") for column in columns)
+
+    return (
+        select(*labeled_columns)
+        .select_from(Negotiations)
+        .outerjoin(Vacancies, Vacancies.id == Negotiations.vacancy_id)
+        .outerjoin(Managers, Managers.id == Vacancies.manager_id)
+        .where(Negotiations.id == negotiation_id)
+    )
+
+
+def _split_negotiation_context_row(row) -> Dict[str, Dict[str, Any]]:
+    """Convert labeled row {"vacancy__name": ...} into {"vacancy": {"name": ...}}."""
+    context = {"negotiation": {}, "vacancy": {}, "manager": {}}
+    for label, value in row.items():
+        part_name, field_name = label.split("__", 1)
+        context[part_name][field_name] = value
+    return context
+
+
+def get_columns(db_model: Type[Base], record_id: str, fields: List[str]) -> Optional[Dict[str, Any]]:
+    """Get several column values of one record in a single SELECT.
+    Args:
+        db_model: The database model class (Managers, Vacancies, Negotiations, etc.)
+        record_id: The ID of the record
+        fields: Column names to fetch (e.g., ["vacancy_id", "resume_id", "resume_json"])
+    Returns:
+        Dict {field_name: value}, or None if record not found or a column does not exist
+    """
+    log_prefix = f"get_columns: {db_model.__name__}.{record_id}"
+
+    stmt = _build_columns_select(db_model=db_model, record_id=record_id, fields=fields, log_prefix=log_prefix)
+    if stmt is None:
+        return None
+
+    with SessionLocal() as db:
+        row = db.execute(stmt).mappings().one_or_none()
+
+    if row is None:
+        logger.debug(f"{log_prefix} not found in database")
+        return None
+
+    return dict(row)
+
+
+def get_record_snapshot(db_model: Type[Base], record_id: str, exclude_fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """Get all columns of one record (except exclude_fields) in a single SELECT.
+    Returns None if record not found.
+    """
+    exclude = set(exclude_fields or [])
+    fields = [column.name for column in db_model.__table__.columns if column.name not in exclude]
+    return get_columns(db_model=db_model, record_id=record_id, fields=fields)
+
+
+def get_negotiation_context(
+    negotiation_id: str,
+    negotiation_fields: Optional[List[str]] = None,
+    vacancy_fields: Optional[List[str]] = None,
+    manager_fields: Optional[List[str]] = None,
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Get negotiation, its vacancy and the vacancy manager in one joined query.
+    Args:
+        negotiation_id: Negotiations.id
+        negotiation_fields / vacancy_fields / manager_fields: columns to fetch from each table
+            (None = NEGOTIATION_CONTEXT_DEFAULT_FIELDS)
+    Returns:
+        {"negotiation": {...}, "vacancy": {...}, "manager": {...}}, or None if negotiation not found.
+        Vacancy / manager values are None if the related record is missing.
+    """
+    log_prefix = f"get_negotiation_context: {negotiation_id}"
+
+    stmt = _build_negotiation_context_select(
+        negotiation_id=negotiation_id,
+        negotiation_fields=negotiation_fields,
+        vacancy_fields=vacancy_fields,
+        manager_fields=manager_fields,
+        log_prefix=log_prefix,
+    )
+    if stmt is None:
+        return None
+
+    with SessionLocal() as db:
+        row = db.execute(stmt).mappings().one_or_none()
+
+    if row is None:
+        logger.debug(f"{log_prefix} not found in database")
+        return None
+
+    return _split_negotiation_context_row(row)
+
+
+def _build_manager_status_select(manager_id: str):
+    """One SELECT of all manager menu status flags joined with the manager's (latest) vacancy."""
+    return (
+        select(
+            Managers.id.label("manager_id"),
+            Managers.privacy_policy_confirmed,
+            Managers.access_token_recieved,
+            Managers.vacancy_selected,
+            Vacancies.id.label("vacancy_id"),
+            Vacancies.name.label("vacancy_name"),
+            Vacancies.video_received.label("vacancy_video_received"),
+            Vacancies.sourcing_criterias_confirmed,
+        )
+        .select_from(Managers)
+        .outerjoin(Vacancies, Vacancies.manager_id == Managers.id)
+        .where(Managers.id == manager_id)
+        .order_by(Vacancies.created_at.desc().nulls_last())
+        .limit(1)
+    )
+
+
+def _build_applicant_status_select(tg_user_id: str):
+    """One SELECT of all applicant menu status flags by Telegram user id."""
+    return (
+        select(
+            Negotiations.id.label("negotiation_id"),
+            Negotiations.vacancy_id,
+            Negotiations.privacy_policy_confirmed,
+            Negotiations.welcome_video_shown,
+            Negotiations.video_received,
+        )
+        .where(Negotiations.tg_user_id == tg_user_id)
+        .limit(1)
+    )
+
+
+def get_manager_status_snapshot(manager_id: str) -> Optional[Dict[str, Any]]:
+    """Get manager status flags and vacancy (id, name, video_received, sourcing_criterias_confirmed) in one query.
+    Returns None if manager not found. Vacancy values are None if vacancy is not selected yet.
+    """
+    with SessionLocal() as db:
+        row = db.execute(_build_manager_status_select(manager_id)).mappings().one_or_none()
+    return dict(row) if row is not None else None
+
+
+def get_applicant_status_snapshot(tg_user_id: str) -> Optional[Dict[str, Any]]:
+    """Get applicant negotiation status flags in one query. Returns None if no negotiation for this Telegram user."""
+    with SessionLocal() as db:
+        row = db.execute(_build_applicant_status_select(tg_user_id)).mappings().one_or_none()
+    return dict(row) if row is not None else None
+
+
 def update_column_value_by_field(db_model: Type[Base], search_field_name: str, search_value: Any, target_field_name: str, new_value: Any) -> bool:
     """Update a column value in a record found by a field other than id.
     
@@ -246,6 +587,7 @@ def update_column_value_by_field(db_model: Type[Base], search_field_name: str, s
             logger.debug(f"{log_prefix} no records found to update")
             return False
         db.commit()
+        invalidate_lookup_cache(db_model, [target_field_name])
         logger.debug(f"{log_prefix} successfully updated {result} record(s)")
         return True
     except Exception as e:
@@ -280,6 +622,69 @@ def update_record_in_db(db_model: Type[Base], record_id: str, updates: Dict[str,
         if result == 0:
             logger.debug(f"{log_prefix} not found in database")
         db.commit()
+        invalidate_lookup_cache(db_model, updates.keys())
+    except Exception as e:
+        db.rollback()
+        logger.error(f"{log_prefix} error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def update_records_in_db(db_model: Type[Base], updates_by_id: Dict[str, Dict[str, Any]]) -> None:
+    """Update many records in one transaction (single commit).
+    Args:
+        db_model: The database model class (Managers, Vacancies, Negotiations, etc.)
+        updates_by_id: {record_id: {column: new_value, ...}, ...}
+    Rows with the same set of columns are sent as one executemany UPDATE by primary key.
+    """
+
+    log_prefix = f"update_records_in_db: {db_model.__name__}"
+
+    params = _build_bulk_update_params(db_model=db_model, updates_by_id=updates_by_id, log_prefix=log_prefix)
+    if not params:
+        return
+
+    db = SessionLocal()
+    try:
+        db.execute(update(db_model), params)
+        db.commit()
+        invalidate_lookup_cache(db_model, {field for updates in updates_by_id.values() for field in updates})
+        logger.debug(f"{log_prefix} updated {len(params)} record(s)")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"{log_prefix} error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def update_columns_by_field(db_model: Type[Base], search_field_name: str, search_value: Any, updates: Dict[str, Any]) -> bool:
+    """Update several columns of record(s) found by a field other than id in one statement.
+    Args:
+        db_model: The database model class (Managers, Vacancies, Negotiations, etc.)
+        search_field_name: The field name to search by (e.g., "manager_id")
+        search_value: The value to search for
+        updates: {column: new_value, ...}
+    Returns:
+        True if at least one record was updated, False otherwise
+    """
+    log_prefix = f"update_columns_by_field: {db_model.__name__}.{search_field_name}={search_value}"
+
+    stmt = _build_update_by_field(db_model=db_model, search_field_name=search_field_name, search_value=search_value, updates=updates, log_prefix=log_prefix)
+    if stmt is None:
+        return False
+
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt)
+        if result.rowcount == 0:
+            logger.debug(f"{log_prefix} no records found to update")
+            return False
+        db.commit()
+        invalidate_lookup_cache(db_model, updates.keys())
+        logger.debug(f"{log_prefix} successfully updated {result.rowcount} record(s)")
+        return True
     except Exception as e:
         db.rollback()
         logger.error(f"{log_prefix} error: {e}")
@@ -288,6 +693,56 @@ def update_record_in_db(db_model: Type[Base], record_id: str, updates: Dict[str,
         db.close()
 
 
+def _build_bulk_update_params(db_model: Type[Base], updates_by_id: Dict[str, Dict[str, Any]], log_prefix: str) -> Optional[List[Dict[str, Any]]]:
+    """Validate {record_id: updates} and convert it to executemany params [{"id": ..., column: value}]."""
+
+    if not updates_by_id:
+        logger.warning(f"{log_prefix} no updates provided")
+        return None
+
+    id_column = db_model.__table__.columns.get("id")
+    if id_column is None:
+        logger.error(f"{log_prefix} does not have id column")
+        return None
+    if not isinstance(id_column.type, String):
+        logger.error(f"{log_prefix}.id is not a String column")
+        return None
+
+    params = []
+    for record_id, updates in updates_by_id.items():
+        if not updates:
+            continue
+        if "id" in updates:
+            logger.error(f"{log_prefix}.{record_id} id column can not be updated")
+            return None
+        if _resolve_columns(db_model=db_model, fields=list(updates.keys()), log_prefix=log_prefix) is None:
+            return None
+        params.append({"id": record_id, **updates})
+
+    if not params:
+        logger.warning(f"{log_prefix} no updates provided")
+        return None
+    return params
+
+
+def _build_update_by_field(db_model: Type[Base], search_field_name: str, search_value: Any, updates: Dict[str, Any], log_prefix: str):
+    """Build UPDATE ... SET <updates> WHERE <search_field_name> = <search_value>. Returns None if validation fails."""
+
+    if not updates:
+        logger.warning(f"{log_prefix} no updates provided")
+        return None
+
+    search_column = db_model.__table__.columns.get(search_field_name)
+    if search_column is None:
+        logger.warning(f"{log_prefix} does not have search column {search_field_name}")
+        return None
+
+    if _resolve_columns(db_model=db_model, fields=list(updates.keys()), log_prefix=log_prefix) is None:
+        return None
+
+    return update(db_model).where(search_column == search_value).values(updates)
+
+
 def clear_column_value_in_db(db_model: Type[Base], record_id: str, field_name: str) -> None:
     
     log_prefix = f"clear_column_value_in_db: {db_model.__name__}.{record_id}.{field_name}"
@@ -311,6 +766,7 @@ def clear_column_value_in_db(db_model: Type[Base], record_id: str, field_name: s
         if result == 0:
             logger.debug(f"{log_prefix} not found in database")
         db.commit()
+        invalidate_lookup_cache(db_model, [field_name])
     except Exception as e:
         db.rollback()
         logger.error(f"{log_prefix} error: {e}")
@@ -15,6 +15,7 @@ from telegram._passport.passportdata import PassportData
 from shared_services.data_service import create_json_file_with_dictionary_content
 
 from shared_services.constants import EMPLOYER_STATE_RESPONSE, EMPLOYER_STATE_CONSIDER
+from shared_services.rate_limiter_service import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,11 @@ REDIRECT_URI     = os.getenv("OAUTH_REDIRECT_URL")
 USER_AGENT       = os.getenv("USER_AGENT")
 
 
+def _wait_for_hh_rate_limit(access_token: str) -> None:
+    """HH.ru limits requests per access token: wait for the "hh_api" limiter of the token (blocking)."""
+    get_rate_limiter("hh_api", access_token).acquire_sync()
+
+
 # ------------------------------ METHODS for FAKE DATA for testing  ------------------------------
 
 def _get_fake_vacancies_data() -> Optional[dict]:
@@ -77,6 +83,7 @@ def get_user_info_from_hh(access_token: str) -> Optional[dict]:
         dict: User info from HH.ru API or None if request failed
     """
     try:
+        _wait_for_hh_rate_limit(access_token)
         r = requests.get(
             "https://api.hh.ru/me",
             headers={
@@ -138,6 +145,7 @@ def get_employer_vacancies_from_hh(access_token: str, employer_id: str) -> Optio
     '''
     url = f"https://api.hh.ru/employers/{employer_id}/vacancies/active"
     try:
+        _wait_for_hh_rate_limit(access_token)
         r = requests.get(
             url,
             headers={
@@ -207,6 +215,7 @@ def get_vacancy_description_from_hh(access_token: str, vacancy_id: str) -> Optio
     '''
     """Get vacancy description from HH.ru API and return it as a dictionary"""
     try:
+        _wait_for_hh_rate_limit(access_token)
         r = requests.get(
             f"https://api.hh.ru/vacancies/{vacancy_id}",
             headers={
@@ -235,6 +244,7 @@ def get_vacancy_description_from_hh(access_token: str, vacancy_id: str) -> Optio
 def get_available_employer_states_and_collections_negotiations(access_token: str, vacancy_id: str) -> Optional[dict]:
     """Returns the list of negotiations for a vacancy"""
     try:
+        _wait_for_hh_rate_limit(access_token)
         r = requests.get(
             "https://api.hh.ru/negotiations",
             headers={
@@ -265,6 +275,7 @@ def get_negotiations_by_collection(access_token: str, vacancy_id: str, collectio
     
     try:
         url = f"https://api.hh.ru/negotiations/{collection}?vacancy_id={vacancy_id}"
+        _wait_for_hh_rate_limit(access_token)
         r = requests.get(
             url,
             headers={"Authorization": f"Bearer {access_token}", "User-Agent": USER_AGENT},
@@ -320,6 +331,7 @@ def get_negotiations_collection_with_status_response(access_token: str, vacancy_
             }
         
         # Fetch first page
+        _wait_for_hh_rate_limit(access_token)
         r = requests.get(
             url,
             headers=headers,
@@ -341,6 +353,7 @@ def get_negotiations_collection_with_status_response(access_token: str, vacancy_
             # Fetch remaining pages
             while page + 1 < total_pages:
                 page += 1
+                _wait_for_hh_rate_limit(access_token)
                 r = requests.get(
                     url,
                     headers={"Authorization": f"Bearer {access_token}", "User-Agent": USER_AGENT},
@@ -381,6 +394,7 @@ def get_negotiations_by_state(access_token: str, vacancy_id: str, state_id: str)
     """Get negotiations by state to see what collections are available"""
     try:
         url = f"https://api.hh.ru/negotiations/?vacancy_id={vacancy_id}&state={state_id}"
+        _wait_for_hh_rate_limit(access_token)
         r = requests.get(
             url,
             headers={"Authorization": f"Bearer {access_token}", "User-Agent": USER_AGENT},
@@ -404,6 +418,7 @@ def get_negotiations_by_state(access_token: str, vacancy_id: str, state_id: str)
 def get_negotiations_messages(access_token: str, negotiation_id: str) -> Optional[dict]:
     try:
         url = f"https://api.hh.ru/negotiations/{negotiation_id}/messages"
+        _wait_for_hh_rate_limit(access_token)
         r = requests.get(
             url,
             headers={"Authorization": f"Bearer {access_token}", "User-Agent": USER_AGENT},
@@ -439,6 +454,7 @@ def change_negotiation_collection_status_to_consider(access_token: str, negotiat
     try:
         target_collection_name = EMPLOYER_STATE_CONSIDER
         url = f"https://api.hh.ru/negotiations/{target_collection_name}/{negotiation_id}"
+        _wait_for_hh_rate_limit(access_token)
         r = requests.put(
             url,
             headers={"Authorization": f"Bearer {access_token}", "User-Agent": USER_AGENT},
@@ -480,6 +496,7 @@ def send_negotiation_message(access_token: str, negotiation_id: str, user_messag
     try:
         user_message_formatted = user_message.strip()
         url = f"https://api.hh.ru/negotiations/{negotiation_id}/messages"
+        _wait_for_hh_rate_limit(access_token)
         r = requests.post(
             url,
             headers={"Authorization": f"Bearer {access_token}", "User-Agent": USER_AGENT, "Content-Type": "application/json"},
@@ -510,6 +527,7 @@ def send_negotiation_message(access_token: str, negotiation_id: str, user_messag
 def get_negotiations_history(access_token: str, resume_id: str):
     try:
         url = f"https://api.hh.ru/resumes/{resume_id}/negotiations_history"
+        _wait_for_hh_rate_limit(access_token)
         r = requests.get(
             url,
             headers={"Authorization": f"Bearer {access_token}", "User-Agent": USER_AGENT},
@@ -545,6 +563,7 @@ def get_resume_info(access_token: str, resume_id: str):
     '''
     try:
         url = f"https://api.hh.ru/resumes/{resume_id}"
+        _wait_for_hh_rate_limit(access_token)
         r = requests.get(
             url,
             headers={"Authorization": f"Bearer {access_token}", "User-Agent": USER_AGENT},
@@ -570,6 +589,7 @@ def get_resume_info(access_token: str, resume_id: str):
 def get_dictionary_from_hh(access_token: str):
     """Get dictionary from HH.ru API and write it to a JSON file"""
     try:
+        _wait_for_hh_rate_limit(access_token)
         r = requests.get(
             "https://api.hh.ru/dictionaries",
             headers={
@@ -6,6 +6,7 @@ from telegram.constants import ParseMode
 
 logger = logging.getLogger(__name__)
 
+from shared_services.rate_limiter_service import get_rate_limiter
 from shared_services.data_service import (
     add_persistent_keyboard_message_in_db,
     remove_persistent_keyboard_message_from_db,
@@ -132,6 +133,11 @@ async def send_message_to_user(
         The sent Message object, or None if message couldn't be sent
 
     """
+    # Telegram limits messages per chat: wait for a slot instead of running into RetryAfter
+    chat = update.effective_chat or update.effective_user
+    if chat is not None:
+        await get_rate_limiter("telegram_chat", chat.id).acquire()
+
     # Try to get message object from callback_query first (button clicks)
     if update.callback_query and update.callback_query.message:
         message = update.callback_query.message
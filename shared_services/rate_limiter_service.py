@@ -0,0 +1,190 @@
+# shared_services/rate_limiter_service.py
+# Rate limiters for outbound APIs (OpenAI RPM / TPM, HH.ru API, Telegram chats) and TaskQueue lanes.
+# Two modes:
+#   token bucket - allows bursts up to capacity, refills at rate per second on average
+#   leaky bucket - no bursts, requests leave evenly spaced at rate per second
+# Limiters are thread-safe: async code (ai_service) awaits acquire(), sync code (hh_service in a worker thread)
+# calls acquire_sync(), which sleeps the calling thread. Do not call acquire_sync() on the event loop thread.
+# Per-key limiters (model name, access token, chat id) come from a named group:
+#     await get_rate_limiter("openai_rpm", model).acquire()
+#     get_rate_limiter("hh_api", access_token).acquire_sync()
+
+import os
+import time
+import asyncio
+import threading
+import logging
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODE_TOKEN_BUCKET = "token_bucket"
+MODE_LEAKY_BUCKET = "leaky_bucket"
+
+
+class RateLimiter:
+    """
+    Rate limiter with reservation: acquire() books its slot immediately and then waits until the slot time,
+    so waiters are served in arrival order and nobody polls.
+    rate / per = allowed units per second; capacity = max burst (token bucket only, default = rate).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        per: float = 1.0,
+        capacity: Optional[float] = None,
+        mode: str = MODE_TOKEN_BUCKET,
+        name: str = "rate_limiter",
+    ):
+        if mode not in (MODE_TOKEN_BUCKET, MODE_LEAKY_BUCKET):
+            raise ValueError(f"Unknown rate limiter mode '{mode}'")
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive")
+        self.name = name
+        self.mode = mode
+        self.rate_per_sec = rate / per
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._lock = threading.Lock()
+        # token bucket: current balance (may go negative = reserved in advance)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        # leaky bucket: time when the next unit may leave
+        self._next_free_at = time.monotonic()
+        self.acquired = 0
+        self.waited_secs = 0.0
+
+
+    def _reserve(self, amount: float) -> float:
+        """Book amount units, return how many seconds the caller must wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self.acquired += 1
+            if self.mode == MODE_LEAKY_BUCKET:
+                start_at = max(now, self._next_free_at)
+                self._next_free_at = start_at + amount / self.rate_per_sec
+                delay = start_at - now
+            else:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_sec)
+                self._updated_at = now
+                self._tokens -= amount
+                delay = -self._tokens / self.rate_per_sec if self._tokens < 0 else 0.0
+            self.waited_secs += delay
+            return delay
+
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Wait (without blocking the event loop) until amount units are available. Returns waited seconds."""
+        delay = self._reserve(amount)
+        if delay > 0:
+            logger.debug(f"{self.name}: waiting {delay:.2f}s for {amount} units")
+            await asyncio.sleep(delay)
+        return delay
+
+
+    def acquire_sync(self, amount: float = 1.0) -> float:
+        """Blocking version of acquire() for sync code running outside the event loop thread."""
+        delay = self._reserve(amount)
+        if delay > 0:
+            logger.debug(f"{self.name}: waiting {delay:.2f}s for {amount} units (sync)")
+            time.sleep(delay)
+        return delay
+
+
+    def consume(self, amount: float) -> None:
+        """
+        Correct usage after the fact without waiting, e.g. actual tokens of a response minus the estimate
+        that was acquired before the request. Negative amount returns units to the bucket.
+        """
+        with self._lock:
+            if self.mode == MODE_LEAKY_BUCKET:
+                self._next_free_at += amount / self.rate_per_sec
+            else:
+                self._tokens = min(self.capacity, self._tokens - amount)
+
+
+    def is_idle(self) -> bool:
+        """True if nothing is reserved ahead and the bucket is full again, i.e. a new limiter would behave the same."""
+        with self._lock:
+            now = time.monotonic()
+            if self.mode == MODE_LEAKY_BUCKET:
+                return self._next_free_at <= now
+            return self._tokens + (now - self._updated_at) * self.rate_per_sec >= self.capacity
+
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            available = self._tokens if self.mode == MODE_TOKEN_BUCKET else None
+        return {
+            "name": self.name,
+            "mode": self.mode,
+            "rate_per_sec": round(self.rate_per_sec, 3),
+            "capacity": self.capacity,
+            "available": round(available, 1) if available is not None else None,
+            "acquired": self.acquired,
+            "waited_secs": round(self.waited_secs, 1),
+        }
+
+
+# ----- PER-KEY LIMITER GROUPS -----
+
+# group -> limiter settings (rate, per, capacity, mode). Limits come from env so they can follow the account tier.
+RATE_LIMIT_GROUPS: Dict[str, Dict[str, Any]] = {
+    # OpenAI requests per minute, per model
+    "openai_rpm": {"rate": float(os.getenv("OPENAI_RPM_LIMIT", "500")), "per": 60.0, "mode": MODE_TOKEN_BUCKET},
+    # OpenAI tokens per minute, per model
+    "openai_tpm": {"rate": float(os.getenv("OPENAI_TPM_LIMIT", "200000")), "per": 60.0, "mode": MODE_TOKEN_BUCKET},
+    # HH.ru API, per access token: evenly spaced requests
+    "hh_api": {"rate": float(os.getenv("HH_API_RPS_LIMIT", "5")), "per": 1.0, "mode": MODE_LEAKY_BUCKET},
+    # Telegram: ~1 message per second per chat
+    "telegram_chat": {"rate": 1.0, "per": 1.0, "capacity": 3.0, "mode": MODE_TOKEN_BUCKET},
+}
+
+# Groups keyed per user (access token, chat id): an unbounded key set, and their limiters are looked up on every
+# call, never held by reference. Above RATE_LIMITERS_MAX_COUNT limiters, idle ones of these groups are dropped.
+# Limiters of other groups live for the whole process, so a limiter held by reference (e.g. TaskQueue
+# lane_rate_limiters) stays the one get_rate_limiter returns.
+PER_USER_RATE_LIMIT_GROUPS = {"hh_api", "telegram_chat"}
+RATE_LIMITERS_MAX_COUNT = int(os.getenv("RATE_LIMITERS_MAX_COUNT", "10000"))
+_limiters: Dict[Tuple[str, Hashable], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limit_group(
+    group: str,
+    rate: float,
+    per: float = 1.0,
+    capacity: Optional[float] = None,
+    mode: str = MODE_TOKEN_BUCKET,
+) -> None:
+    """Add or change a group. Already created limiters of the group keep old settings."""
+    RATE_LIMIT_GROUPS[group] = {"rate": rate, "per": per, "capacity": capacity, "mode": mode}
+
+
+def get_rate_limiter(group: str, key: Hashable = None) -> RateLimiter:
+    """Return the limiter of group for key (model name, access token, chat id...), creating it on first use."""
+    cache_key = (group, key)
+    with _limiters_lock:
+        limiter = _limiters.get(cache_key)
+        if limiter is None:
+            settings = RATE_LIMIT_GROUPS.get(group)
+            if settings is None:
+                raise KeyError(f"Unknown rate limit group '{group}'")
+            if len(_limiters) >= RATE_LIMITERS_MAX_COUNT:
+                _prune_per_user_limiters()
+            # access tokens should not end up in logs: show only the group for string keys longer than an id
+            label = group if isinstance(key, str) and len(key) > 32 else f"{group}:{key}"
+            limiter = RateLimiter(name=label, **settings)
+            _limiters[cache_key] = limiter
+    return limiter
+
+
+def _prune_per_user_limiters() -> None:
+    """Drop idle limiters of PER_USER_RATE_LIMIT_GROUPS (called under _limiters_lock)."""
+    idle_keys = [
+        cache_key for cache_key, limiter in _limiters.items()
+        if cache_key[0] in PER_USER_RATE_LIMIT_GROUPS and limiter.is_idle()
+    ]
+    for cache_key in idle_keys:
+        del _limiters[cache_key]
+    logger.info(f"rate limiters: dropped {len(idle_keys)} idle per-user limiters, {len(_limiters)} left")
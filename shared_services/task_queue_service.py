@@ -1,10 +1,276 @@
 import asyncio
+import bisect
+import functools
+import heapq
+import importlib
+import itertools
+import json
 import logging
-from typing import Callable, Any, Optional
-from dataclasses import dataclass
+import os
+import multiprocessing
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Any, Optional, Dict, List, Tuple, Type
+from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+# Полоса (lane) по умолчанию - в неё попадают задачи без явной полосы
+DEFAULT_LANE = "default"
+
+# Что делать, если задача с таким же task_id уже ждет в очереди или выполняется:
+# reject - не добавлять новую (put вернет None)
+# coalesce - не добавлять новую, вернуть future уже существующей задачи
+# replace - заменить ждущую задачу новой (аргументы новой), future остается тем же;
+#           если задача уже выполняется - новая ставится в очередь следом
+DEDUP_REJECT = "reject"
+DEDUP_COALESCE = "coalesce"
+DEDUP_REPLACE = "replace"
+DEDUP_POLICIES = (DEDUP_REJECT, DEDUP_COALESCE, DEDUP_REPLACE)
+
+# Приоритеты задач: меньше = раньше. Интерактивные задачи (пользователь ждет ответа) обгоняют массовые
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 10
+PRIORITY_BULK = 20
+# Старение (aging): сколько секунд ожидания в очереди "стоит" один уровень приоритета.
+# Задача ждет так, будто добавлена на priority * aging секунд позже, поэтому массовая задача (PRIORITY_BULK)
+# обгоняет интерактивные, добавленные более чем через 20 * 6 = 120 секунд после неё - голодания нет
+PRIORITY_AGING_SECS = 6.0
+
+# Сколько последних окончательно упавших задач хранить в dead-letter (без backend)
+DEAD_LETTER_MAXSIZE = 1000
+
+# Процессные полосы: как запускать процессы пула. spawn - чистый процесс без копии потоков и соединений
+# бота (fork из процесса с потоками и открытыми соединениями БД небезопасен)
+PROCESS_POOL_START_METHOD = "spawn"
+
+# Метрики: границы корзин гистограмм времени ожидания и выполнения (секунды)
+METRICS_LATENCY_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600)
+# Окно, за которое считается пропускная способность (задач в минуту)
+METRICS_THROUGHPUT_WINDOW_SECS = 300
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Политика повторов упавшей задачи: экспоненциальная задержка с jitter.
+    Задержка перед попыткой N+1 = min(max_delay, base_delay * multiplier ** (N - 1)),
+    уменьшенная случайно на долю до jitter (чтобы повторы многих задач после 429 не шли одной волной).
+    Повторяются только исключения из retry_on, остальные сразу уходят в dead-letter.
+    """
+    # Всего попыток, включая первую (1 = без повторов)
+    max_attempts: int = 3
+    base_delay: float = 2.0
+    max_delay: float = 60.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """attempt - номер только что упавшей попытки (с 1)"""
+        return attempt < self.max_attempts and isinstance(error, self.retry_on)
+
+    def get_delay(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** max(0, attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Для хранения вместе с задачей в backend (JSON): исключения retry_on - по модулю и имени класса"""
+        return {
+            "max_attempts": self.max_attempts,
+            "base_delay": self.base_delay,
+            "max_delay": self.max_delay,
+            "multiplier": self.multiplier,
+            "jitter": self.jitter,
+            "retry_on": [f"{error_type.__module__}:{error_type.__qualname__}" for error_type in self.retry_on],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RetryPolicy":
+        """Обратно из to_dict. ValueError, если класс исключения не импортируется (например, объявлен внутри функции)"""
+        retry_on = []
+        for name in data.get("retry_on") or ():
+            module_name, _, qualname = name.partition(":")
+            try:
+                error_type = importlib.import_module(module_name)
+                for attribute in qualname.split("."):
+                    error_type = getattr(error_type, attribute)
+            except (ImportError, AttributeError) as e:
+                raise ValueError(f"Exception class '{name}' of retry policy can not be imported: {e}") from e
+            if not (isinstance(error_type, type) and issubclass(error_type, BaseException)):
+                raise ValueError(f"'{name}' of retry policy is not an exception class")
+            retry_on.append(error_type)
+        return cls(
+            max_attempts=data["max_attempts"],
+            base_delay=data["base_delay"],
+            max_delay=data["max_delay"],
+            multiplier=data["multiplier"],
+            jitter=data["jitter"],
+            retry_on=tuple(retry_on),
+        )
+
+
+# Политика по умолчанию - без повторов (как было раньше)
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+# Реестр функций, которые можно ставить в очередь с постоянным хранилищем (backend):
+# в БД хранится не сама функция, а имя, под которым она зарегистрирована
+TASK_REGISTRY: Dict[str, Callable] = {}
+
+
+def register_task(name: Optional[str] = None) -> Callable:
+    """
+    Декоратор: зарегистрировать функцию под именем name (по умолчанию - имя функции).
+    Пример:
+        @register_task("resume_analysis")
+        async def resume_analysis_from_ai_to_user_sort_resume(...): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        task_name = name or func.__name__
+        registered = TASK_REGISTRY.get(task_name)
+        if registered is not None and registered is not func:
+            raise ValueError(f"Task name '{task_name}' is already registered for {registered.__qualname__}")
+        TASK_REGISTRY[task_name] = func
+        # имя сохраняем на функции, чтобы при put не искать его перебором реестра
+        func.__task_name__ = task_name
+        return func
+    return decorator
+
+
+def get_registered_task_name(func: Callable) -> str:
+    """Получить имя зарегистрированной функции. ValueError, если функция не зарегистрирована."""
+    task_name = getattr(func, "__task_name__", None)
+    if task_name is None or TASK_REGISTRY.get(task_name) is not func:
+        raise ValueError(f"Function {getattr(func, '__qualname__', func)} is not registered with @register_task")
+    return task_name
+
+
+def _resolve_future(future: Optional[asyncio.Future], result: Any = None, error: Optional[BaseException] = None):
+    """Записать результат или исключение задачи в future (если его еще никто не завершил)"""
+    if future is None or future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _mark_exception_retrieved(future: asyncio.Future):
+    if not future.cancelled():
+        future.exception()
+
+
+async def _run_on_done_coroutine(coroutine):
+    try:
+        await coroutine
+    except Exception as e:
+        logger.error(f"on_done callback failed: {e}", exc_info=True)
+
+
+class _PriorityTaskQueue(asyncio.Queue):
+    """
+    asyncio.Queue, в которой вместо FIFO куча (heap) - так же, как устроена asyncio.PriorityQueue.
+    Порядок: sort_key задачи (время добавления + приоритет * aging), при равенстве - порядок добавления (seq),
+    то есть сортировка стабильная. Блокировки, maxsize, join/task_done работают как у обычной очереди.
+    """
+
+    def _init(self, maxsize):
+        self._queue = []
+        self._seq = itertools.count()
+
+    def _put(self, task):
+        heapq.heappush(self._queue, (task.sort_key, next(self._seq), task))
+
+    def _get(self):
+        return heapq.heappop(self._queue)[2]
+
+
+class LatencyHistogram:
+    """Гистограмма длительностей с фиксированными корзинами (как у Prometheus): count, sum, max и оценка перцентилей"""
+
+    def __init__(self, buckets: Tuple[float, ...] = METRICS_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # последняя корзина - "больше самой большой границы"
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Верхняя граница корзины, в которую попадает перцентиль (для последней корзины - max)"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": round(self.max, 3),
+            "buckets": {
+                **{f"<={bucket}": count for bucket, count in zip(self.buckets, self.counts)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class TaskMetrics:
+    """Счетчики и гистограммы одной полосы (или одного типа задач)"""
+
+    def __init__(self):
+        self.enqueued = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.wait_time = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+        # время завершения (monotonic) задач за последнее окно - для пропускной способности
+        self._finished_at: deque = deque()
+        self.last_enqueued_at: Optional[datetime] = None
+
+    def record_finished(self, now: float):
+        self._finished_at.append(now)
+        self._trim(now)
+
+    def throughput_per_min(self, now: float) -> float:
+        self._trim(now)
+        return round(len(self._finished_at) * 60 / METRICS_THROUGHPUT_WINDOW_SECS, 2)
+
+    def _trim(self, now: float):
+        while self._finished_at and now - self._finished_at[0] > METRICS_THROUGHPUT_WINDOW_SECS:
+            self._finished_at.popleft()
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "enqueued": self.enqueued,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "throughput_per_min": self.throughput_per_min(now),
+            "last_enqueued_at": self.last_enqueued_at,
+            "wait_time": self.wait_time.to_dict(),
+            "run_time": self.run_time.to_dict(),
+        }
+
 
 @dataclass
 #Создает класс Task, который представляет задачу для выполнения в очереди
@@ -20,6 +286,26 @@ class Task:
     # (keyword arguments) — именованные аргументы: передаются по именам параметров
     kwargs: dict = None
     task_id: Optional[str] = None
+    # Полоса (lane), в которой выполняется задача - у каждой полосы своя очередь и свой пул воркеров
+    lane: str = DEFAULT_LANE
+    # id строки в постоянном хранилище (только для задач из backend)
+    backend_id: Optional[int] = None
+    # Future с результатом (или исключением) задачи - возвращается из put, его можно await
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+    # Задача уже выполняется воркером (заменить её нельзя)
+    running: bool = False
+    # Задача заменена новой (DEDUP_REPLACE) - воркер пропустит её, когда достанет из очереди
+    cancelled: bool = False
+    # Политика повторов (None = политика полосы / очереди) и номер последней попытки
+    retry_policy: Optional[RetryPolicy] = None
+    attempt: int = 0
+    # Приоритет (PRIORITY_*) и ключ сортировки в очереди полосы (считается при первом добавлении
+    # и не меняется - повторы после ошибки сохраняют свое место)
+    priority: int = PRIORITY_NORMAL
+    sort_key: float = 0.0
+    # Для метрик (time.monotonic): когда задача встала (или вернулась после ошибки) в очередь и когда начала выполняться
+    queued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
     
     #Вызывается после инициализации объекта и инициализирует kwargs, если они не были переданы
     def __post_init__(self):
@@ -27,88 +313,636 @@ class Task:
             self.kwargs = {}
 
 
+@dataclass
+class _PeriodicSchedule:
+    """Периодическая задача: каждые interval секунд в очередь ставится задача с task_id=name"""
+    name: str
+    func: Callable
+    args: tuple
+    kwargs: dict
+    interval: float
+    lane: str
+    priority: int = PRIORITY_NORMAL
+    cancelled: bool = False
+
+
 class TaskQueue:
-    """Класс который объединяет очередь задач и воркер для их обработки.
-    Очереди задач с лимитом 200 и приоритизацией FIFO"""
+    """Класс который объединяет очереди задач и пул воркеров для их обработки.
+    Задачи раскладываются по полосам (lanes): у каждой полосы своя очередь с приоритетами и лимитом maxsize
+    и свое число воркеров (параллельно выполняемых задач), например resume_analysis = 8, vacancy_analysis = 2.
+    Медленные задачи одной полосы не блокируют задачи другой.
+    Если передан backend (например PostgresTaskBackend), задачи хранятся не в памяти, а в БД:
+    переживают перезапуск бота, и одну очередь могут разбирать несколько процессов."""
     
-    def __init__(self, maxsize: int = 200):
+    def __init__(
+        self,
+        maxsize: int = 200,
+        num_workers: int = 1,
+        lanes: Optional[Dict[str, int]] = None,
+        backend: Optional[Any] = None,
+        poll_interval: float = 2.0,
+        dedup_policy: str = DEDUP_COALESCE,
+        retry_policy: RetryPolicy = NO_RETRY,
+        lane_retry_policies: Optional[Dict[str, RetryPolicy]] = None,
+        dead_letter_maxsize: int = DEAD_LETTER_MAXSIZE,
+        priority_aging_secs: float = PRIORITY_AGING_SECS,
+        lane_rate_limiters: Optional[Dict[str, Any]] = None,
+        process_lanes: Optional[Dict[str, int]] = None,
+    ):
         """
         Инициализация объекта очереди задач
         Args:
-            maxsize: Максимальный размер очереди (по умолчанию 200)
+            maxsize: Максимальный размер очереди каждой полосы (по умолчанию 200, без backend)
+            num_workers: Количество воркеров полосы по умолчанию (DEFAULT_LANE)
+            lanes: Именованные полосы и количество воркеров в каждой, например {"resume_analysis": 8}
+            backend: Постоянное хранилище задач (enqueue/claim/complete/fail/release/recover_stale/extend_lease, атрибут lease_secs)
+            poll_interval: Как часто воркер проверяет backend, если задач нет (задачи, добавленные
+                этим же процессом, будят воркеры сразу; задачи других процессов - через poll_interval)
+            dedup_policy: Политика для задач с одинаковым task_id по умолчанию (DEDUP_*), можно переопределить в put
+            retry_policy: Политика повторов по умолчанию
+            lane_retry_policies: Политики повторов по полосам, например {"resume_analysis": RetryPolicy(max_attempts=5)}
+                (в put можно передать политику для отдельной задачи; с backend она хранится вместе с задачей)
+            dead_letter_maxsize: Сколько окончательно упавших задач хранить в dead-letter (без backend)
+            priority_aging_secs: Сколько секунд ожидания стоит один уровень приоритета (защита от голодания)
+            lane_rate_limiters: Ограничители частоты запуска задач по полосам (rate_limiter_service.RateLimiter),
+                например {"resume_analysis": get_rate_limiter("resume_analysis_lane")} (своя группа, заведённая через
+                configure_rate_limit_group). Не передавайте сюда клиентские ограничители ("openai_rpm", "hh_api"):
+                ai_service и hh_service сами вызывают на них acquire(), и каждый запрос списывался бы дважды.
+                Один ограничитель полосы можно разделить между несколькими полосами
+            process_lanes: Процессные полосы для CPU-задач и количество процессов в каждой, например {"cpu": 4}.
+                Задачи такой полосы выполняются в ProcessPoolExecutor (не упираются в GIL и не тормозят бота).
+                Функция должна быть синхронной и зарегистрированной через @register_task (то есть объявленной
+                на уровне модуля - процесс пула импортирует её по имени), аргументы и результат - picklable
         """
-        # Создает асинхронную очередь с максимальным размером maxsize
-        self._queue = asyncio.Queue(maxsize=maxsize)
-        # Флаг состояния воркера, по умолчанию воркер не запущен
+        if dedup_policy not in DEDUP_POLICIES:
+            raise ValueError(f"Unknown dedup policy '{dedup_policy}', expected one of {DEDUP_POLICIES}")
+        # Количество воркеров по полосам. Полоса по умолчанию есть всегда
+        self._lane_workers: Dict[str, int] = {DEFAULT_LANE: max(1, num_workers)}
+        for lane_name, lane_workers in (lanes or {}).items():
+            self._lane_workers[lane_name] = max(1, int(lane_workers))
+        # Процессные полосы: воркеров (корутин) столько же, сколько процессов в пуле - каждый ждет свою задачу
+        self._process_lanes: Dict[str, int] = {}
+        for lane_name, lane_processes in (process_lanes or {}).items():
+            if lane_name in self._lane_workers:
+                raise ValueError(f"Lane '{lane_name}' is already defined in lanes")
+            self._process_lanes[lane_name] = self._lane_workers[lane_name] = max(1, int(lane_processes))
+        # Пулы процессов создаются при start_worker и закрываются при stop_worker
+        self._process_executors: Dict[str, ProcessPoolExecutor] = {}
+        # Создает отдельную асинхронную очередь с приоритетами и максимальным размером maxsize для каждой полосы
+        self._queues: Dict[str, asyncio.Queue] = {
+            lane_name: _PriorityTaskQueue(maxsize=maxsize) for lane_name in self._lane_workers
+        }
+        self._priority_aging_secs = priority_aging_secs
+        # Флаг состояния воркеров, по умолчанию воркеры не запущены
         self._worker_running = False
-        # это не задачи из очереди, а сама задача (asyncio.Task), которая представляет запущенный процесс воркера.
-        self._worker_task: Optional[asyncio.Task] = None
+        # Очередь в памяти уже слита в checkpoint (drain) - задачи, добавленные после этого, потеряются
+        self._drained = False
+        # это не задачи из очереди, а сами задачи (asyncio.Task) запущенных воркеров всех полос
+        self._worker_tasks: List[asyncio.Task] = []
+        # Постоянное хранилище задач (None = задачи только в памяти)
+        self._backend = backend
+        self._poll_interval = poll_interval
+        # События "в полосе появилась задача" - будят воркеры backend без ожидания poll_interval
+        self._lane_events: Dict[str, asyncio.Event] = {lane_name: asyncio.Event() for lane_name in self._lane_workers}
+        self._dedup_policy = dedup_policy
+        # Индекс задач, которые ждут в очереди или выполняются: task_id -> Task (только задачи с task_id)
+        self._active_tasks: Dict[str, Task] = {}
+        # Future задач из backend, добавленных этим процессом: id строки -> future
+        self._backend_futures: Dict[int, asyncio.Future] = {}
+        self._retry_policy = retry_policy
+        self._lane_retry_policies: Dict[str, RetryPolicy] = dict(lane_retry_policies or {})
+        # Задачи, ожидающие повтора (asyncio.Task с задержкой перед возвратом в очередь)
+        self._retry_timers: set = set()
+        # Сами задачи, ожидающие повтора: id(task) -> Task (нужны drain для сохранения в checkpoint)
+        self._waiting_retry: Dict[int, Task] = {}
+        # Dead-letter: задачи, исчерпавшие попытки (без backend; с backend - строки со статусом failed)
+        self._dead_letters: deque = deque(maxlen=dead_letter_maxsize)
+        # Ограничители частоты по полосам: воркер ждет limiter.acquire() перед запуском задачи
+        self._lane_rate_limiters: Dict[str, Any] = dict(lane_rate_limiters or {})
+        # Метрики по полосам и по типам задач (имя функции), выполняемые сейчас задачи: id(task) -> Task
+        self._lane_metrics: Dict[str, TaskMetrics] = {lane_name: TaskMetrics() for lane_name in self._lane_workers}
+        self._task_type_metrics: Dict[str, TaskMetrics] = {}
+        self._in_flight: Dict[int, Task] = {}
+        self._started_at = datetime.now(timezone.utc)
+        # Куча таймеров (время срабатывания по time.monotonic, seq, отложенная Task или _PeriodicSchedule)
+        # и планировщик, который их обслуживает
+        self._timers: List[Tuple[float, int, Any]] = []
+        self._timer_seq = itertools.count()
+        self._timers_changed = asyncio.Event()
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self._scheduler_puts: set = set()
+        self._periodic_schedules: Dict[str, _PeriodicSchedule] = {}
+    
+
+    def _resolve_lane(self, lane: Optional[str], task_id: Optional[str]) -> str:
+        """
+        Определить полосу задачи.
+        1) явно переданная полоса
+        2) полоса, с имени которой начинается task_id (например "resume_analysis_123" -> "resume_analysis")
+        3) полоса по умолчанию
+        """
+        if lane is not None:
+            if lane in self._queues:
+                return lane
+            logger.warning(f"Unknown lane '{lane}' for task {task_id or 'without ID'}, using '{DEFAULT_LANE}'")
+            return DEFAULT_LANE
+        if task_id:
+            for lane_name in self._queues:
+                if lane_name != DEFAULT_LANE and task_id.startswith(f"{lane_name}_"):
+                    return lane_name
+        return DEFAULT_LANE
     
 
-    async def put(self, func: Callable, *args, task_id: Optional[str] = None, **kwargs) -> bool:
+    async def put(
+        self,
+        func: Callable,
+        *args,
+        task_id: Optional[str] = None,
+        lane: Optional[str] = None,
+        dedup: Optional[str] = None,
+        on_done: Optional[Callable[[asyncio.Future], Any]] = None,
+        retry: Optional[RetryPolicy] = None,
+        priority: int = PRIORITY_NORMAL,
+        run_at: Optional[datetime] = None,
+        delay: Optional[float] = None,
+        **kwargs,
+    ) -> Optional[asyncio.Future]:
         """
         Используется для критичных задач, которые Должны быть добавлены в очередь.
-        Добавить задачу в очередь.
-        Если очередь заполнена, метод блокируется до тех пор, пока не освободится место.
+        Добавить задачу в очередь полосы.
+        Если очередь полосы заполнена, метод блокируется до тех пор, пока не освободится место.
         Args:
             func: Функция для выполнения (может быть async или sync)
             *args: Позиционные аргументы для функции
-            task_id: Опциональный идентификатор задачи
+            task_id: Опциональный идентификатор задачи (по нему работает дедупликация)
+            lane: Опциональная полоса (если не указана - определяется по task_id)
+            dedup: Политика дедупликации для этой задачи (DEDUP_*), по умолчанию - политика очереди
+            on_done: Опциональный callback(future), вызывается после завершения задачи (может быть async)
+            retry: Опциональная политика повторов для этой задачи (по умолчанию - политика полосы / очереди)
+            priority: Приоритет в полосе (PRIORITY_*, меньше = раньше)
+            run_at: Опциональное время запуска (datetime с таймзоной) - задача попадет в очередь не раньше него
+            delay: Опциональная задержка запуска в секундах (вместо run_at)
             **kwargs: Именованные аргументы для функции
         
         Returns:
-            bool: Всегда возвращает True (метод блокируется до добавления задачи)
+            asyncio.Future с результатом задачи (новой или уже существующей при coalesce)
+            или None, если задача отклонена как дубликат (reject).
+            await future возвращает результат функции или пробрасывает её исключение:
+                future = await queue.put(func, arg, task_id="...")
+                result = await asyncio.wait_for(asyncio.shield(future), timeout=300)
+            С backend future разрешается, только если задачу выполнит этот процесс (см. _put_to_backend) -
+            ждать его только с таймаутом.
         """
+        lane = self._resolve_lane(lane, task_id)
+        policy = self._resolve_dedup_policy(dedup)
+        self._check_process_lane_task(func, lane)
+        delay_secs = self._get_delay_secs(run_at, delay)
+        if self._backend is not None:
+            return self._attach_on_done(
+                await self._put_to_backend(func, args, kwargs, task_id, lane, policy, retry, priority, delay_secs), on_done
+            )
+        if self._drained:
+            logger.warning(f"Task {task_id or 'without ID'} added after drain: it is not in the checkpoint and will be lost on exit")
+        if delay_secs > 0:
+            return self._attach_on_done(self._put_delayed(func, args, kwargs, task_id, lane, policy, retry, priority, delay_secs), on_done)
+        # Проверяем, нет ли уже такой задачи в очереди или в работе
+        previous = self._active_tasks.get(task_id) if task_id else None
+        duplicate, future = self._deduplicate(task_id, policy)
+        if duplicate:
+            return self._attach_on_done(future, on_done)
         # Создает объект Task, который представляет задачу для выполнения в очереди
-        task = Task(func=func, args=args, kwargs=kwargs, task_id=task_id)
-        # Ожидание освобождения места, если очередь заполнена, если очередь не заполнена, то задача добавляется в очередь
-        # await self._queue.put() блокируется и ждет, если очередь заполнена, поэтому QueueFull не выбрасывается
-        await self._queue.put(task)
+        task = Task(
+            func=func, args=args, kwargs=kwargs, task_id=task_id, lane=lane, future=future or self._create_future(), retry_policy=retry,
+            priority=priority, sort_key=self._get_sort_key(priority, time.monotonic()),
+        )
+        # Регистрируем задачу в индексе до ожидания места в очереди, чтобы параллельный put с тем же task_id ее увидел
+        self._register_active_task(task)
+        try:
+            # Ожидание освобождения места, если очередь полосы заполнена, если не заполнена, то задача добавляется сразу
+            # await queue.put() блокируется и ждет, если очередь заполнена, поэтому QueueFull не выбрасывается
+            await self._queues[lane].put(task)
+        except asyncio.CancelledError:
+            self._unregister_active_task(task)
+            # Замена не состоялась - возвращаем в работу замененную задачу
+            if previous is not None and previous.cancelled and previous.future is task.future:
+                previous.cancelled = False
+                self._register_active_task(previous)
+            raise
+        self._record_enqueued(lane, func)
         # Логирование добавления задачи в очередь
-        logger.debug(f"Task {task_id or 'without ID'} added to queue. Queue size: {self._queue.qsize()}")
-        # Возвращает True, если задача успешно добавлена
-        return True
+        logger.debug(f"Task {task_id or 'without ID'} added to lane '{lane}'. Lane size: {self._queues[lane].qsize()}")
+        # Возвращает future задачи
+        return self._attach_on_done(task.future, on_done)
     
 
-    async def put_nowait(self, func: Callable, *args, task_id: Optional[str] = None, **kwargs) -> bool:
+    async def put_nowait(
+        self,
+        func: Callable,
+        *args,
+        task_id: Optional[str] = None,
+        lane: Optional[str] = None,
+        dedup: Optional[str] = None,
+        on_done: Optional[Callable[[asyncio.Future], Any]] = None,
+        retry: Optional[RetryPolicy] = None,
+        priority: int = PRIORITY_NORMAL,
+        run_at: Optional[datetime] = None,
+        delay: Optional[float] = None,
+        **kwargs,
+    ) -> Optional[asyncio.Future]:
         """
         Используется для некритичных задач, которые Можно Пропустить, если очередь.
         Добавить задачу в очередь если есть место и не нужно ждать освобождения места (non-blocking)
-        Если очередь заполнена, метод не блокируется и возвращает False, задача не добавляется в очередь.
+        Если очередь полосы заполнена, метод не блокируется и возвращает None, задача не добавляется в очередь.
         Args:
             func: Функция для выполнения
             *args: Позиционные аргументы для функции
-            task_id: Опциональный идентификатор задачи
+            task_id: Опциональный идентификатор задачи (по нему работает дедупликация)
+            lane: Опциональная полоса (если не указана - определяется по task_id)
+            dedup: Политика дедупликации для этой задачи (DEDUP_*), по умолчанию - политика очереди
+            on_done: Опциональный callback(future), вызывается после завершения задачи (может быть async)
+            retry: Опциональная политика повторов для этой задачи (по умолчанию - политика полосы / очереди)
+            priority: Приоритет в полосе (PRIORITY_*, меньше = раньше)
+            run_at: Опциональное время запуска (datetime с таймзоной)
+            delay: Опциональная задержка запуска в секундах (вместо run_at)
             **kwargs: Именованные аргументы для функции
         Returns:
-            bool: True если задача успешно добавлена, False если очередь переполнена
+            asyncio.Future с результатом задачи или None, если очередь переполнена или задача отклонена как дубликат.
+            Отложенная задача не занимает место в очереди до своего времени, поэтому добавляется всегда
         """
-        task = Task(func=func, args=args, kwargs=kwargs, task_id=task_id)
-        try:
-            self._queue.put_nowait(task)
-            logger.debug(f"Task {task_id or 'without ID'} added to queue (nowait). Queue size: {self._queue.qsize()}")
-            return True
-        except asyncio.QueueFull:
-            logger.warning(f"Queue is full. Task {task_id or 'without ID'} not added.")
+        lane = self._resolve_lane(lane, task_id)
+        policy = self._resolve_dedup_policy(dedup)
+        self._check_process_lane_task(func, lane)
+        delay_secs = self._get_delay_secs(run_at, delay)
+        if self._backend is not None:
+            # у хранилища нет лимита размера - задача всегда добавляется
+            return self._attach_on_done(
+                await self._put_to_backend(func, args, kwargs, task_id, lane, policy, retry, priority, delay_secs), on_done
+            )
+        if self._drained:
+            logger.warning(f"Task {task_id or 'without ID'} added after drain: it is not in the checkpoint and will be lost on exit")
+        if delay_secs > 0:
+            return self._attach_on_done(self._put_delayed(func, args, kwargs, task_id, lane, policy, retry, priority, delay_secs), on_done)
+        queue = self._queues[lane]
+        if queue.full():
+            logger.warning(f"Lane '{lane}' is full. Task {task_id or 'without ID'} not added.")
+            return None
+        duplicate, future = self._deduplicate(task_id, policy)
+        if duplicate:
+            return self._attach_on_done(future, on_done)
+        task = Task(
+            func=func, args=args, kwargs=kwargs, task_id=task_id, lane=lane, future=future or self._create_future(), retry_policy=retry,
+            priority=priority, sort_key=self._get_sort_key(priority, time.monotonic()),
+        )
+        # Место в очереди проверено выше, а между проверкой и put_nowait нет await - QueueFull не возникнет
+        queue.put_nowait(task)
+        self._register_active_task(task)
+        self._record_enqueued(lane, func)
+        logger.debug(f"Task {task_id or 'without ID'} added to lane '{lane}' (nowait). Lane size: {queue.qsize()}")
+        return self._attach_on_done(task.future, on_done)
+    
+
+    def _check_process_lane_task(self, func: Callable, lane: str):
+        """Задача процессной полосы: синхронная функция уровня модуля (зарегистрированная) - иначе ValueError"""
+        if lane not in self._process_lanes:
+            return
+        if asyncio.iscoroutinefunction(func):
+            raise ValueError(f"Process lane '{lane}' accepts only sync functions, got coroutine function {func.__qualname__}")
+        # регистрация гарантирует, что функция объявлена на уровне модуля и её можно передать в процесс по имени
+        get_registered_task_name(func)
+    
+
+    # ----- DELAYED AND PERIODIC TASKS -----
+
+    @staticmethod
+    def _get_delay_secs(run_at: Optional[datetime], delay: Optional[float]) -> float:
+        """Задержка запуска в секундах из run_at или delay (0 = сразу)"""
+        if run_at is not None and delay is not None:
+            raise ValueError("Pass either run_at or delay, not both")
+        if run_at is not None:
+            if run_at.tzinfo is None:
+                raise ValueError("run_at must be timezone-aware")
+            return max(0.0, (run_at - datetime.now(timezone.utc)).total_seconds())
+        return max(0.0, delay or 0.0)
+    
+
+    def _put_delayed(
+        self,
+        func: Callable,
+        args: tuple,
+        kwargs: dict,
+        task_id: Optional[str],
+        lane: str,
+        policy: str,
+        retry: Optional[RetryPolicy],
+        priority: int,
+        delay_secs: float,
+    ) -> Optional[asyncio.Future]:
+        """
+        Отложенная задача (без backend): до своего времени лежит в куче таймеров, а не в очереди полосы.
+        Дедупликация работает сразу - задача видна в индексе активных с момента добавления.
+        """
+        duplicate, future = self._deduplicate(task_id, policy)
+        if duplicate:
+            return future
+        due_at = time.monotonic() + delay_secs
+        task = Task(
+            func=func, args=args, kwargs=kwargs, task_id=task_id, lane=lane, future=future or self._create_future(), retry_policy=retry,
+            # место в очереди - как у задачи, добавленной в момент запуска
+            priority=priority, sort_key=self._get_sort_key(priority, due_at), queued_at=due_at,
+        )
+        self._register_active_task(task)
+        self._record_enqueued(lane, func)
+        self._push_timer(due_at, task)
+        logger.debug(f"Task {task_id or 'without ID'} scheduled to lane '{lane}' in {delay_secs:.1f}s")
+        return task.future
+    
+
+    def schedule_periodic(
+        self,
+        name: str,
+        func: Callable,
+        *args,
+        interval: float,
+        lane: Optional[str] = None,
+        delay: Optional[float] = None,
+        priority: int = PRIORITY_NORMAL,
+        **kwargs,
+    ) -> str:
+        """
+        Запускать задачу каждые interval секунд (первый раз - через delay, по умолчанию через interval).
+        Каждый запуск - обычная задача с task_id=name: если прошлый запуск еще в очереди или выполняется,
+        очередной пропускается. Расписание живет в памяти процесса (и с backend) - задается при старте бота.
+        Повторный вызов с тем же name заменяет расписание.
+        Returns:
+            name расписания (для cancel_periodic)
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.cancel_periodic(name)
+        schedule = _PeriodicSchedule(
+            name=name, func=func, args=args, kwargs=kwargs, interval=interval,
+            lane=self._resolve_lane(lane, name), priority=priority,
+        )
+        self._periodic_schedules[name] = schedule
+        self._push_timer(time.monotonic() + (interval if delay is None else max(0.0, delay)), schedule)
+        logger.info(f"Periodic task '{name}' scheduled every {interval}s in lane '{schedule.lane}'")
+        return name
+    
+
+    def cancel_periodic(self, name: str) -> bool:
+        """Отменить расписание. Уже поставленный в очередь запуск выполнится"""
+        schedule = self._periodic_schedules.pop(name, None)
+        if schedule is None:
             return False
+        # ленивое удаление: запись останется в куче, планировщик ее пропустит
+        schedule.cancelled = True
+        return True
+    
+
+    def _push_timer(self, due_at: float, entry: Any):
+        heapq.heappush(self._timers, (due_at, next(self._timer_seq), entry))
+        # будим планировщик: новый таймер может оказаться раньше того, которого он ждет
+        self._timers_changed.set()
+    
+
+    async def _scheduler(self):
+        """
+        Планировщик: спит до ближайшего таймера из кучи (или до добавления нового),
+        срабатывающие отложенные задачи кладет в очереди полос, периодические - ставит в очередь и планирует снова.
+        Один на очередь, сколько бы задач ни ждало - не нужно держать по корутине на каждую.
+        """
+        logger.info("Task queue scheduler started")
+        while self._worker_running:
+            try:
+                self._timers_changed.clear()
+                now = time.monotonic()
+                while self._timers and self._timers[0][0] <= now:
+                    due_at, _, entry = heapq.heappop(self._timers)
+                    self._fire_timer(entry, due_at, now)
+                timeout = self._timers[0][0] - now if self._timers else None
+                try:
+                    await asyncio.wait_for(self._timers_changed.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Unexpected error in task queue scheduler: {e}", exc_info=True)
+        logger.info("Task queue scheduler stopped")
+    
+
+    def _fire_timer(self, entry: Any, due_at: float, now: float):
+        if isinstance(entry, _PeriodicSchedule):
+            if entry.cancelled:
+                return
+            # следующий запуск - от запланированного времени (без накопления сдвига), но не в прошлом
+            next_due_at = due_at + entry.interval
+            if next_due_at <= now:
+                next_due_at = now + entry.interval
+            self._push_timer(next_due_at, entry)
+            put_task = asyncio.get_running_loop().create_task(self._put_periodic_run(entry))
+            self._scheduler_puts.add(put_task)
+            put_task.add_done_callback(self._scheduler_puts.discard)
+            return
+        # Отложенная задача: ее могли заменить (DEDUP_REPLACE), пока она ждала
+        if entry.cancelled:
+            return
+        entry.queued_at = now
+        queue = self._queues[entry.lane]
+        if not queue.full():
+            queue.put_nowait(entry)
+            return
+        # Полоса заполнена - ждем места отдельно, не останавливая планировщик
+        timer = asyncio.get_running_loop().create_task(self._requeue_after(entry, 0))
+        self._retry_timers.add(timer)
+        timer.add_done_callback(self._retry_timers.discard)
+    
+
+    async def _put_periodic_run(self, schedule: "_PeriodicSchedule"):
+        try:
+            future = await self.put(
+                schedule.func, *schedule.args,
+                task_id=schedule.name, lane=schedule.lane, dedup=DEDUP_REJECT, priority=schedule.priority, **schedule.kwargs,
+            )
+            if future is None:
+                logger.info(f"Periodic task '{schedule.name}': previous run is not finished, skipping this run")
+        except Exception as e:
+            logger.error(f"Periodic task '{schedule.name}': failed to enqueue: {e}", exc_info=True)
+    
+
+    def _cancel_scheduled_tasks(self):
+        """Остановка без backend: отложенные задачи из кучи не выполнятся - ожидающие их не должны ждать вечно"""
+        for _, _, entry in self._timers:
+            if isinstance(entry, Task):
+                self._unregister_active_task(entry)
+                if entry.future is not None:
+                    entry.future.cancel()
+        self._timers = [timer for timer in self._timers if not isinstance(timer[2], Task)]
+        heapq.heapify(self._timers)
+    
+
+    def _get_sort_key(self, priority: int, enqueued_at: float) -> float:
+        """Ключ сортировки в очереди: время добавления, сдвинутое на priority * aging"""
+        return enqueued_at + priority * self._priority_aging_secs
+    
+
+    def _resolve_dedup_policy(self, dedup: Optional[str]) -> str:
+        if dedup is None:
+            return self._dedup_policy
+        if dedup not in DEDUP_POLICIES:
+            raise ValueError(f"Unknown dedup policy '{dedup}', expected one of {DEDUP_POLICIES}")
+        return dedup
+    
+
+    def _create_future(self) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        # Исключение задачи уже залогировано - помечаем его прочитанным, чтобы asyncio не писал
+        # "Future exception was never retrieved", если future никто не ждет
+        future.add_done_callback(_mark_exception_retrieved)
+        return future
+    
+
+    def _attach_on_done(self, future: Optional[asyncio.Future], on_done: Optional[Callable]) -> Optional[asyncio.Future]:
+        """Подписать callback на завершение задачи. Возвращает тот же future (для return в put)"""
+        if future is None or on_done is None:
+            return future
+        
+        def _callback(done_future: asyncio.Future):
+            try:
+                outcome = on_done(done_future)
+                # async callback запускаем отдельной задачей в Event Loop
+                if asyncio.iscoroutine(outcome):
+                    asyncio.get_running_loop().create_task(_run_on_done_coroutine(outcome))
+            except Exception as e:
+                logger.error(f"on_done callback failed: {e}", exc_info=True)
+        
+        future.add_done_callback(_callback)
+        return future
+    
+
+    def _deduplicate(self, task_id: Optional[str], policy: str):
+        """
+        Проверить индекс активных задач.
+        Returns:
+            (True, future или None) - новую задачу добавлять не нужно, put возвращает future
+            (False, future или None) - новую задачу нужно добавить; если future не None, новая задача
+                                       должна использовать его (замена ждущей задачи)
+        """
+        existing = self._active_tasks.get(task_id) if task_id else None
+        if existing is None:
+            return False, None
+        if policy == DEDUP_REJECT:
+            logger.info(f"Task {task_id} is already queued or running. Duplicate rejected.")
+            return True, None
+        if policy == DEDUP_COALESCE:
+            logger.info(f"Task {task_id} is already queued or running. Duplicate coalesced into existing task.")
+            return True, existing.future
+        # DEDUP_REPLACE
+        if existing.running:
+            logger.info(f"Task {task_id} is running. Replacement is queued after it.")
+            return False, None
+        # Ленивая отмена: задача остается в очереди, но воркер ее пропустит. Ожидающие ее получат результат новой
+        existing.cancelled = True
+        logger.info(f"Task {task_id} is queued. Replaced with new arguments.")
+        return False, existing.future
+    
+
+    def _register_active_task(self, task: Task):
+        if task.task_id:
+            self._active_tasks[task.task_id] = task
+    
+
+    def _unregister_active_task(self, task: Task):
+        # Удаляем только если в индексе именно эта задача (ее могли заменить более новой)
+        if task.task_id and self._active_tasks.get(task.task_id) is task:
+            del self._active_tasks[task.task_id]
+    
+
+    def _finish_task(self, task: Task, result: Any = None, error: Optional[BaseException] = None):
+        """Передать результат (или исключение) в future задачи и убрать её из индекса активных"""
+        self._unregister_active_task(task)
+        _resolve_future(task.future, result, error)
+    
+
+    async def _put_to_backend(
+        self,
+        func: Callable,
+        args: tuple,
+        kwargs: dict,
+        task_id: Optional[str],
+        lane: str,
+        policy: str,
+        retry: Optional[RetryPolicy] = None,
+        priority: int = PRIORITY_NORMAL,
+        delay_secs: float = 0.0,
+    ) -> Optional[asyncio.Future]:
+        """
+        Сохранить задачу в постоянное хранилище.
+        Политика повторов задачи (retry) хранится вместе с ней (RetryPolicy.to_dict), поэтому классы исключений
+        retry_on должны импортироваться по имени - иначе ValueError сразу здесь, а не при выполнении задачи.
+        Отложенная задача (delay_secs > 0) хранится в pending с available_at - воркеры возьмут ее не раньше.
+        Функция должна быть зарегистрирована через @register_task, аргументы - сериализуемы в JSON.
+        Дедупликация по task_id выполняется в хранилище (видит задачи всех процессов).
+        Future разрешается, когда задачу выполнит воркер этого процесса.
+        !!! Если задачу выполнит другой процесс (например, put объединился (coalesce) с задачей, которую уже взял
+        воркер другого бота), future этого процесса не разрешится никогда - результат в БД не хранится.
+        С несколькими процессами на future с backend не полагаемся: результат задачи пишется в БД самой задачей.
+        """
+        func_name = get_registered_task_name(func)
+        retry_policy = None
+        if retry is not None:
+            retry_policy = retry.to_dict()
+            RetryPolicy.from_dict(retry_policy)
+        row_id, outcome = await self._backend.enqueue(
+            func_name=func_name, args=args, kwargs=kwargs, task_id=task_id, lane=lane, dedup=policy, retry_policy=retry_policy,
+            # в БД время общее для всех процессов - wall clock вместо monotonic
+            priority=priority, sort_key=self._get_sort_key(priority, time.time() + delay_secs),
+            available_at=datetime.now(timezone.utc) + timedelta(seconds=delay_secs) if delay_secs > 0 else None,
+        )
+        if row_id is None:
+            logger.info(f"Task {task_id} is already queued or running. Duplicate rejected.")
+            return None
+        if outcome == "created":
+            self._record_enqueued(lane, func)
+        # Будим воркеры полосы этого процесса
+        self._lane_events[lane].set()
+        logger.debug(f"Task {task_id or 'without ID'} stored in backend ({outcome}), lane '{lane}'")
+        future = self._backend_futures.get(row_id)
+        if future is None:
+            future = self._backend_futures[row_id] = self._create_future()
+        return future
     
 
-    def qsize(self) -> int:
-        """Получить текущий размер очереди"""
-        return self._queue.qsize()
+    async def check_backend(self):
+        """Проверить постоянное хранилище перед запуском воркеров (например, что миграции БД применены). Ошибка - пробрасывается"""
+        check_schema = getattr(self._backend, "check_schema", None)
+        if check_schema is not None:
+            await check_schema()
     
 
-    def is_full(self) -> bool:
-        """Проверить, заполнена ли очередь"""
-        return self._queue.full()
+    def lanes(self) -> Dict[str, int]:
+        """Получить полосы и количество воркеров в каждой"""
+        return dict(self._lane_workers)
+    
+
+    def qsize(self, lane: Optional[str] = None) -> int:
+        """Получить текущий размер очереди полосы (или суммарный по всем полосам). С backend - всегда 0 (задачи в БД)"""
+        if lane is not None:
+            return self._queues[lane].qsize()
+        return sum(queue.qsize() for queue in self._queues.values())
+    
+
+    def is_full(self, lane: str = DEFAULT_LANE) -> bool:
+        """Проверить, заполнена ли очередь полосы"""
+        return self._queues[lane].full()
     
 
     def is_empty(self) -> bool:
-        """Проверить, пуста ли очередь"""
-        return self._queue.empty()
+        """Проверить, пусты ли очереди всех полос"""
+        return all(queue.empty() for queue in self._queues.values())
     
 
-    async def _execute_task(self, task: Task) -> Any:
+    async def _execute_task(self, task: Task, raise_errors: bool = False, rate_limited: bool = False) -> Any:
         """
         Выполняет задачу используя event loop или executor в зависимости от типа функции.
 
@@ -122,11 +956,20 @@ class TaskQueue:
         
         Args:
             task: Задача для выполнения
+            raise_errors: Пробросить ошибку задачи дальше (нужно воркеру backend, чтобы пометить задачу failed)
+            rate_limited: Разрешение ограничителя полосы уже получено (воркер backend ждет его до claim)
         Returns:
             Результат выполнения задачи или None в случае ошибки
         """
         # Формируем строку с идентификатором задачи
         task_id_str = f" (ID: {task.task_id})" if task.task_id else ""
+        # Если у полосы есть ограничитель частоты - ждем разрешения (не блокируя Event Loop)
+        rate_limiter = self._lane_rate_limiters.get(task.lane)
+        if rate_limiter is not None and not rate_limited:
+            waited_secs = await rate_limiter.acquire()
+            if waited_secs > 0:
+                logger.debug(f"Task{task_id_str} waited {waited_secs:.2f}s for lane '{task.lane}' rate limit")
+        self._record_started(task)
         # Логирование начала выполнения задачи
         logger.info(f"Executing task{task_id_str}")
         
@@ -139,8 +982,16 @@ class TaskQueue:
                 # Если функиция СИНХРОННАЯ - нужно запускать через Executor, чтобы не блокировать Event Loop (иначе все остльные асинхронные задачи не выполняются)
                 # сохраняем текущий event loop в переменную loop
                 loop = asyncio.get_event_loop()
-                # Запускаем синхронную функцию в отдельном потоке, не блокируя Event Loop.
-                result = await loop.run_in_executor(None, lambda: task.func(*task.args, **task.kwargs))
+                # Процессная полоса - пул процессов (CPU-задачи), иначе пул потоков по умолчанию (None).
+                # partial вместо lambda: в процесс задача передается через pickle, а lambda не сериализуется
+                executor = self._process_executors.get(task.lane)
+                # Запускаем синхронную функцию в отдельном потоке (или процессе), не блокируя Event Loop.
+                try:
+                    result = await loop.run_in_executor(executor, functools.partial(task.func, *task.args, **task.kwargs))
+                except BrokenProcessPool:
+                    # Процесс пула упал (например, из-за нехватки памяти) - пул больше не принимает задачи, создаем новый
+                    self._restart_process_executor(task.lane, executor)
+                    raise
             # Логирование успешного выполнения задачи
             logger.info(f"Task{task_id_str} completed successfully")
             # Возвращаем результат выполнения задачи
@@ -155,87 +1006,682 @@ class TaskQueue:
         except Exception as e:
             # Логирование ошибки выполнения задачи
             logger.error(f"Task{task_id_str} failed with error: {e}", exc_info=True)
+            if raise_errors:
+                raise
             # Возвращаем None в случае ошибки
             return None
+        finally:
+            self._record_stopped(task)
+    
+
+    # ----- METRICS -----
+
+    def _get_metrics(self, lane: str, func: Callable) -> Tuple[TaskMetrics, TaskMetrics]:
+        """Метрики полосы и метрики типа задачи (по имени функции)"""
+        task_type = getattr(func, "__task_name__", None) or getattr(func, "__name__", str(func))
+        type_metrics = self._task_type_metrics.get(task_type)
+        if type_metrics is None:
+            type_metrics = self._task_type_metrics[task_type] = TaskMetrics()
+        return self._lane_metrics[lane], type_metrics
+    
+
+    def _record_enqueued(self, lane: str, func: Callable):
+        for metrics in self._get_metrics(lane, func):
+            metrics.enqueued += 1
+            metrics.last_enqueued_at = datetime.now(timezone.utc)
+    
+
+    def _record_started(self, task: Task):
+        """Задача начала выполняться: время ожидания в очереди в гистограмму, задачу - в список выполняемых"""
+        task.started_at = time.monotonic()
+        wait_secs = max(0.0, task.started_at - task.queued_at)
+        for metrics in self._get_metrics(task.lane, task.func):
+            metrics.wait_time.observe(wait_secs)
+        self._in_flight[id(task)] = task
+    
+
+    def _record_stopped(self, task: Task):
+        """Задача закончила выполняться (успех, ошибка или отмена): время выполнения в гистограмму"""
+        if self._in_flight.pop(id(task), None) is None or task.started_at is None:
+            return
+        run_secs = time.monotonic() - task.started_at
+        for metrics in self._get_metrics(task.lane, task.func):
+            metrics.run_time.observe(run_secs)
+    
+
+    def _record_outcome(self, task: Task, outcome: str):
+        """outcome: "succeeded", "failed" (окончательно) или "retried" (будет повтор)"""
+        now = time.monotonic()
+        for metrics in self._get_metrics(task.lane, task.func):
+            setattr(metrics, outcome, getattr(metrics, outcome) + 1)
+            if outcome != "retried":
+                metrics.record_finished(now)
+    
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Снимок метрик очереди (только этого процесса):
+            lanes - по полосам: воркеры, длина очереди, выполняется сейчас, счетчики, пропускная способность,
+                    гистограммы ожидания и выполнения (секунды)
+            task_types - те же счетчики и гистограммы по типам задач
+            in_flight - выполняемые сейчас задачи с возрастом (сначала самые долгие - кандидаты в зависшие)
+        Задачи, ожидающие в backend, здесь не видны - см. get_backlog()
+        """
+        now = time.monotonic()
+        in_flight = sorted(self._in_flight.values(), key=lambda task: task.started_at or now)
+        lanes = {}
+        for lane_name, lane_metrics in self._lane_metrics.items():
+            lanes[lane_name] = {
+                "workers": self._lane_workers[lane_name],
+                "type": "process" if lane_name in self._process_lanes else "async",
+                "queued": self._queues[lane_name].qsize(),
+                "in_flight": sum(1 for task in in_flight if task.lane == lane_name),
+                **lane_metrics.to_dict(now),
+            }
+        return {
+            "started_at": self._started_at,
+            "uptime_secs": round((datetime.now(timezone.utc) - self._started_at).total_seconds()),
+            "backend": type(self._backend).__name__ if self._backend is not None else None,
+            "waiting_retry": len(self._retry_timers),
+            "scheduled": sum(1 for _, _, entry in self._timers if isinstance(entry, Task) and not entry.cancelled),
+            "periodic": {name: schedule.interval for name, schedule in self._periodic_schedules.items()},
+            "dead_letters": len(self._dead_letters) if self._backend is None else None,
+            "lanes": lanes,
+            "task_types": {task_type: metrics.to_dict(now) for task_type, metrics in self._task_type_metrics.items()},
+            "in_flight": [
+                {
+                    "task_id": task.task_id,
+                    "lane": task.lane,
+                    "func_name": getattr(task.func, "__name__", str(task.func)),
+                    "attempt": task.attempt,
+                    "age_secs": round(now - (task.started_at or now), 1),
+                }
+                for task in in_flight
+            ],
+        }
+    
+
+    async def get_backlog(self) -> Dict[str, Dict[str, int]]:
+        """Задачи по полосам и статусам: из backend (все процессы) или из очередей в памяти"""
+        if self._backend is not None:
+            return await self._backend.count_by_lane()
+        return {
+            lane_name: {"pending": queue.qsize(), "running": sum(1 for task in self._in_flight.values() if task.lane == lane_name)}
+            for lane_name, queue in self._queues.items()
+        }
     
 
-    async def _worker(self):
+    async def _worker(self, lane: str, worker_index: int):
         """
-        Воркер, который обрабатывает задачи из очереди последовательно.
+        Воркер, который обрабатывает задачи из очереди своей полосы последовательно.
+        Параллельность полосы = количество её воркеров.
         При ошибке в задаче не останавливается, продолжает обрабатывать следующие задачи.
         """
+        queue = self._queues[lane]
+        worker_name = f"{lane}#{worker_index}"
         # Логирование начала работы воркера
-        logger.info("Task queue worker started")
+        logger.info(f"Task queue worker {worker_name} started")
         # Пока воркер запущен, обрабатываем задачи из очереди
         while self._worker_running:
             try:
                 try:
                     # Получаем задачу из очереди с таймаутом для возможности проверки флага (если очередь пуста, то ждем 1 секунду)
-                    task = await asyncio.wait_for(self._queue.get(), timeout=1.0)
+                    task = await asyncio.wait_for(queue.get(), timeout=1.0)
                 except asyncio.TimeoutError:
                     # Таймаут - проверяем, нужно ли продолжать работу
                     continue
-                # Выполняем задачу
-                await self._execute_task(task)
-                # После выполнения задачи, помечаем задачу как выполненную
-                # метод asyncio.Queue, который сообщает очереди, что задача завершена. 
-                self._queue.task_done()
+                try:
+                    # Задача была заменена более новой (DEDUP_REPLACE) - пропускаем
+                    if task.cancelled:
+                        logger.debug(f"Task {task.task_id} was replaced, skipping")
+                        continue
+                    task.running = True
+                    # Выполняем задачу, результат или исключение передаем в future
+                    task.attempt += 1
+                    try:
+                        result = await self._execute_task(task, raise_errors=True)
+                    except Exception as e:
+                        self._handle_task_error(task, e)
+                    else:
+                        self._record_outcome(task, "succeeded")
+                        self._finish_task(task, result)
+                except asyncio.CancelledError:
+                    # Воркер остановлен посреди задачи - ожидающие её не должны ждать вечно
+                    self._unregister_active_task(task)
+                    if task.future is not None:
+                        task.future.cancel()
+                    raise
+                finally:
+                    # После выполнения задачи (даже при отмене) помечаем задачу как выполненную,
+                    # иначе queue.join() в stop_worker/wait_empty никогда не завершится
+                    queue.task_done()
             except asyncio.CancelledError:
                 # Если воркер был остановлен, то логируем это
-                logger.info("Task queue worker cancelled")
+                logger.info(f"Task queue worker {worker_name} cancelled")
                 break
             except Exception as e:
                 # Логируем ошибку
-                logger.error(f"Unexpected error in worker: {e}", exc_info=True)
+                logger.error(f"Unexpected error in worker {worker_name}: {e}", exc_info=True)
                 # Продолжаем работу даже при неожиданной ошибке (чтобы не останавливать воркер)
                 continue
         # Логирование остановки воркера
-        logger.info("Task queue worker stopped")
+        logger.info(f"Task queue worker {worker_name} stopped")
+    
+
+    def _get_retry_policy(self, task: Task) -> RetryPolicy:
+        return task.retry_policy or self._lane_retry_policies.get(task.lane, self._retry_policy)
+    
+
+    def _handle_task_error(self, task: Task, error: Exception):
+        """
+        Задача упала: запланировать повтор по политике или отправить в dead-letter.
+        Пока задача ждет повтора, она остается в индексе активных (дубликаты видят её), future не завершен.
+        """
+        policy = self._get_retry_policy(task)
+        if policy.should_retry(error, task.attempt):
+            delay = policy.get_delay(task.attempt)
+            task.running = False
+            logger.warning(
+                f"Task {task.task_id or 'without ID'} failed (attempt {task.attempt}/{policy.max_attempts}): {error}. "
+                f"Retrying in {delay:.1f}s"
+            )
+            self._record_outcome(task, "retried")
+            timer = asyncio.get_running_loop().create_task(self._requeue_after(task, delay))
+            self._retry_timers.add(timer)
+            timer.add_done_callback(self._retry_timers.discard)
+            return
+        logger.error(f"Task {task.task_id or 'without ID'} failed after {task.attempt} attempt(s), moved to dead-letter: {error}")
+        self._record_outcome(task, "failed")
+        self._dead_letters.append({
+            "task": task,
+            "error": f"{type(error).__name__}: {error}",
+            "failed_at": datetime.now(timezone.utc),
+        })
+        self._finish_task(task, error=error)
+    
+
+    async def _requeue_after(self, task: Task, delay: float):
+        """Вернуть задачу в очередь её полосы после задержки"""
+        self._waiting_retry[id(task)] = task
+        try:
+            await asyncio.sleep(delay)
+            # Задачу могли заменить (DEDUP_REPLACE), пока она ждала повтора
+            if task.cancelled:
+                return
+            task.queued_at = time.monotonic()
+            await self._queues[task.lane].put(task)
+        except asyncio.CancelledError:
+            self._unregister_active_task(task)
+            if task.future is not None:
+                task.future.cancel()
+            raise
+        finally:
+            self._waiting_retry.pop(id(task), None)
+    
+
+    async def get_dead_letters(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Последние окончательно упавшие задачи (новые первыми): task_id, lane, func_name, attempts, error, failed_at"""
+        if self._backend is not None:
+            return await self._backend.list_failed(limit=limit)
+        dead_letters = list(self._dead_letters)[-limit:]
+        return [
+            {
+                "task_id": entry["task"].task_id,
+                "lane": entry["task"].lane,
+                "func_name": getattr(entry["task"].func, "__name__", str(entry["task"].func)),
+                "attempts": entry["task"].attempt,
+                "error": entry["error"],
+                "failed_at": entry["failed_at"],
+            }
+            for entry in reversed(dead_letters)
+        ]
+    
+
+    async def requeue_dead_letters(self, task_id: Optional[str] = None) -> int:
+        """
+        Поставить задачи из dead-letter снова в очередь (с новым счетчиком попыток).
+        Args:
+            task_id: Только задачи с этим task_id (None = все)
+        Returns:
+            int: Количество возвращенных в очередь задач
+        """
+        if self._backend is not None:
+            requeued = await self._backend.requeue_failed(task_id=task_id)
+            for lane_event in self._lane_events.values():
+                lane_event.set()
+            return requeued
+        
+        entries = [entry for entry in self._dead_letters if task_id is None or entry["task"].task_id == task_id]
+        for entry in entries:
+            self._dead_letters.remove(entry)
+            task = entry["task"]
+            await self.put(
+                task.func, *task.args,
+                task_id=task.task_id, lane=task.lane, retry=task.retry_policy, priority=task.priority, **task.kwargs,
+            )
+        logger.info(f"Requeued {len(entries)} dead-letter task(s)")
+        return len(entries)
+    
+
+    async def _backend_worker(self, lane: str, worker_index: int):
+        """
+        Воркер для постоянного хранилища: забирает задачи полосы из backend (claim) и выполняет их.
+        Успешная задача удаляется из хранилища, упавшая помечается failed,
+        прерванная остановкой бота возвращается в pending и будет выполнена после перезапуска.
+        """
+        worker_name = f"{lane}#{worker_index}"
+        lane_event = self._lane_events[lane]
+        logger.info(f"Task queue backend worker {worker_name} started")
+        rate_limiter = self._lane_rate_limiters.get(lane)
+        while self._worker_running:
+            try:
+                # Ограничитель полосы - до claim: иначе задача ждет разрешения, уже заняв строку (и тратя lease)
+                if rate_limiter is not None:
+                    waited_secs = await rate_limiter.acquire()
+                    if waited_secs > 0:
+                        logger.debug(f"Worker {worker_name} waited {waited_secs:.2f}s for lane '{lane}' rate limit")
+                try:
+                    row = await self._backend.claim(lane, worker_name)
+                except Exception as e:
+                    logger.error(f"Worker {worker_name} failed to claim task: {e}", exc_info=True)
+                    if rate_limiter is not None:
+                        rate_limiter.consume(-1)
+                    await asyncio.sleep(self._poll_interval)
+                    continue
+                if row is None:
+                    # Разрешение не использовано - возвращаем его ограничителю
+                    if rate_limiter is not None:
+                        rate_limiter.consume(-1)
+                    # Задач нет - ждем сигнала от put этого процесса или poll_interval (задачи других процессов)
+                    try:
+                        await asyncio.wait_for(lane_event.wait(), timeout=self._poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    lane_event.clear()
+                    continue
+                await self._run_backend_task(row, worker_name)
+            except asyncio.CancelledError:
+                logger.info(f"Task queue backend worker {worker_name} cancelled")
+                break
+            except Exception as e:
+                logger.error(f"Unexpected error in backend worker {worker_name}: {e}", exc_info=True)
+                continue
+        logger.info(f"Task queue backend worker {worker_name} stopped")
+    
+
+    async def _run_backend_task(self, row: Dict[str, Any], worker_name: str):
+        """Выполнить задачу, полученную из backend, и записать результат в хранилище"""
+        row_id = row["id"]
+        func = TASK_REGISTRY.get(row["func_name"])
+        if func is None:
+            logger.error(f"Worker {worker_name}: task function '{row['func_name']}' is not registered (row {row_id})")
+            await self._backend.fail(row_id, f"function '{row['func_name']}' is not registered")
+            self._resolve_backend_future(row_id, error=LookupError(f"function '{row['func_name']}' is not registered"))
+            return
+        task = Task(
+            func=func,
+            args=tuple(row["args"] or ()),
+            kwargs=row["kwargs"] or {},
+            task_id=row["task_id"],
+            lane=row["lane"],
+            backend_id=row_id,
+            retry_policy=self._get_backend_retry_policy(row),
+            # attempts в хранилище - число уже упавших попыток (перезапуски после падения воркера не считаются)
+            attempt=(row.get("attempts") or 0) + 1,
+            queued_at=self._get_backend_queued_at(row),
+        )
+        # Пока задача выполняется, lease продлевается - иначе долгая задача (ожидание лимитов OpenAI, повторы запросов)
+        # переживет свой lease, и другой воркер заберет ту же строку и выполнит задачу второй раз
+        lease_renewer = asyncio.create_task(self._renew_lease(row_id, worker_name))
+        try:
+            result = await self._execute_task(task, raise_errors=True, rate_limited=True)
+        except asyncio.CancelledError:
+            # Бот останавливается - возвращаем задачу в хранилище (shield: отмена не должна прервать запись)
+            await asyncio.shield(self._backend.release(row_id))
+            raise
+        except Exception as e:
+            policy = self._get_retry_policy(task)
+            attempt = task.attempt
+            if policy.should_retry(e, attempt):
+                delay = policy.get_delay(attempt)
+                logger.warning(f"Task {task.task_id or row_id} failed (attempt {attempt}/{policy.max_attempts}): {e}. Retrying in {delay:.1f}s")
+                self._record_outcome(task, "retried")
+                await self._backend.retry_later(row_id, f"{type(e).__name__}: {e}", delay)
+                return
+            self._record_outcome(task, "failed")
+            await self._backend.fail(row_id, f"{type(e).__name__}: {e}")
+            self._resolve_backend_future(row_id, error=e)
+        else:
+            self._record_outcome(task, "succeeded")
+            await self._backend.complete(row_id)
+            self._resolve_backend_future(row_id, result)
+        finally:
+            lease_renewer.cancel()
+    
+
+    @staticmethod
+    def _get_backend_retry_policy(row: Dict[str, Any]) -> Optional[RetryPolicy]:
+        """Политика повторов, сохраненная с задачей (None = политика полосы / очереди)"""
+        if not row.get("retry_policy"):
+            return None
+        try:
+            return RetryPolicy.from_dict(row["retry_policy"])
+        except (ValueError, KeyError, TypeError) as e:
+            # например, класс исключения переименовали между put и выполнением
+            logger.error(f"Task {row['task_id'] or row['id']}: stored retry policy is not usable ({e}), lane policy is used")
+            return None
+    
+
+    async def _renew_lease(self, row_id: int, worker_name: str):
+        """Продлевать lease строки каждую треть его длительности, пока задачу не отменят (задача закончилась)"""
+        interval = max(1.0, self._backend.lease_secs / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self._backend.extend_lease(row_id):
+                    logger.warning(f"Worker {worker_name}: lease of row {row_id} was not extended (row is not running anymore)")
+                    return
+            except Exception as e:
+                # Не удалось сейчас - попробуем через interval (до истечения lease остается еще 2/3)
+                logger.error(f"Worker {worker_name}: failed to extend lease of row {row_id}: {e}")
+    
+
+    @staticmethod
+    def _get_backend_queued_at(row: Dict[str, Any]) -> float:
+        """Момент (time.monotonic) постановки задачи backend в очередь: после ошибки - конец задержки повтора"""
+        queued_at = row.get("available_at") or row.get("created_at")
+        if queued_at is None:
+            return time.monotonic()
+        return time.monotonic() - max(0.0, (datetime.now(timezone.utc) - queued_at).total_seconds())
+    
+
+    def _resolve_backend_future(self, row_id: int, result: Any = None, error: Optional[BaseException] = None):
+        _resolve_future(self._backend_futures.pop(row_id, None), result, error)
     
 
     def start_worker(self):
         """
-        Запустить воркер для обработки задач
+        Запустить пул воркеров: для каждой полосы столько воркеров, сколько задано в lanes
         """
         if self._worker_running:
             logger.warning("Worker is already running")
             return
         
         self._worker_running = True
-        # Оборачиваем корутину в объект asyncio.Task и планируем её выполнение в Event Loop. (то есть запускаем воркер)
-        self._worker_task = asyncio.create_task(self._worker())
-        logger.info("Task queue worker started")
+        self._drained = False
+        worker = self._worker
+        if self._backend is not None:
+            worker = self._backend_worker
+            # Задачи, брошенные упавшими процессами без оставшихся попыток, помечаем failed
+            asyncio.create_task(self._recover_stale_backend_tasks())
+        # Оборачиваем корутины в объекты asyncio.Task и планируем их выполнение в Event Loop. (то есть запускаем воркеры)
+        self._worker_tasks = [
+            asyncio.create_task(worker(lane_name, worker_index))
+            for lane_name, lane_workers in self._lane_workers.items()
+            for worker_index in range(lane_workers)
+        ]
+        # Пулы процессов для процессных полос
+        for lane_name in self._process_lanes:
+            self._process_executors[lane_name] = self._create_process_executor(lane_name)
+        # Планировщик отложенных и периодических задач
+        self._scheduler_task = asyncio.create_task(self._scheduler())
+        logger.info(f"Task queue started {len(self._worker_tasks)} workers, lanes: {self._lane_workers}")
+    
+
+    async def _recover_stale_backend_tasks(self):
+        try:
+            await self._backend.recover_stale()
+        except Exception as e:
+            logger.error(f"Failed to recover stale backend tasks: {e}", exc_info=True)
     
 
     async def stop_worker(self, wait: bool = True):
         """
-        Остановить воркер
+        Остановить пул воркеров
         Args:
-            wait: Если True, дождаться завершения текущей задачи и очистки очереди
+            wait: Если True, дождаться завершения текущих задач и очистки очередей всех полос.
+                С backend очереди не очищаются (задачи остаются в БД до следующего запуска):
+                wait=True дожидается только выполняемых задач, wait=False прерывает их и возвращает в pending
         """
         if not self._worker_running:
             logger.warning("Worker is not running")
             return
         
-        self._worker_running = False
+        if self._backend is not None:
+            self._worker_running = False
+            await self._stop_scheduler()
+            if not wait:
+                for worker_task in self._worker_tasks:
+                    worker_task.cancel()
+            # воркеры выходят после текущей задачи (или сразу, если ждут новых задач)
+            for lane_event in self._lane_events.values():
+                lane_event.set()
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+            self._worker_tasks = []
+            self._shutdown_process_executors()
+            logger.info("Task queue backend workers stopped")
+            return
         
         if wait:
-            # Ждем завершения всех задач в очереди
-            await self._queue.join()
+            # Ждем завершения всех задач в очередях, пока воркеры ещё работают
+            # (если сначала снять флаг, воркеры выйдут, и join() никогда не завершится)
+            await self.wait_empty()
+        
+        self._worker_running = False
+        # Отложенные задачи, время которых не пришло, не выполнятся (без backend они живут только в памяти)
+        await self._stop_scheduler()
+        self._cancel_scheduled_tasks()
+        
+        # Останавливаем воркеры и отменяем ожидающие повторы
+        retry_timers = list(self._retry_timers)
+        for worker_task in self._worker_tasks + retry_timers:
+            worker_task.cancel()
+        await asyncio.gather(*self._worker_tasks, *retry_timers, return_exceptions=True)
+        self._worker_tasks = []
+        self._shutdown_process_executors()
+        logger.info("Task queue workers stopped")
+    
+
+    def _create_process_executor(self, lane: str) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._process_lanes[lane], mp_context=multiprocessing.get_context(PROCESS_POOL_START_METHOD),
+        )
+    
+
+    def _restart_process_executor(self, lane: str, broken_executor: ProcessPoolExecutor):
+        # Пул могли уже пересоздать из-за другой задачи этой полосы
+        if self._process_executors.get(lane) is not broken_executor:
+            return
+        logger.error(f"Process pool of lane '{lane}' is broken, starting a new one")
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+        self._process_executors[lane] = self._create_process_executor(lane)
+    
+
+    def _shutdown_process_executors(self):
+        """Закрыть пулы процессов: задачи, которые не начали выполняться, отменяются, выполняемые - дорабатывают"""
+        for executor in self._process_executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._process_executors = {}
+    
+
+    async def _stop_scheduler(self):
+        if self._scheduler_task is None:
+            return
+        self._scheduler_task.cancel()
+        await asyncio.gather(self._scheduler_task, *list(self._scheduler_puts), return_exceptions=True)
+        self._scheduler_task = None
+    
+
+    # ----- DRAIN AND CHECKPOINT -----
+
+    async def drain(self, deadline: float, checkpoint_path: Optional[Path] = None) -> Dict[str, int]:
+        """
+        Быстрая остановка (деплой): не ждать, пока очередь опустеет, а
+        1) перестать брать новые задачи и дать выполняемым закончиться за deadline секунд,
+        2) прервать те, что не успели,
+        3) сохранить невыполненные задачи (ждущие в очереди, отложенные, ожидающие повтора, прерванные)
+           в checkpoint_path - JSON с именем зарегистрированной функции и аргументами.
+        При следующем запуске restore_checkpoint() вернет их в очередь.
+        Задачи с незарегистрированной функцией или аргументами, которые нельзя сохранить в JSON, теряются (в лог).
+        С backend задачи и так в БД: прерванные возвращаются в pending, файл не нужен.
+        Returns:
+            {"finished": выполненные за deadline, "interrupted": прерванные, "saved": сохраненные, "dropped": потерянные}
+        """
+        stats = {"finished": 0, "interrupted": 0, "saved": 0, "dropped": 0}
+        if not self._worker_running:
+            logger.warning("Worker is not running")
+            return stats
+        
+        # Воркеры выходят после текущей задачи, новые задачи из кучи таймеров в очереди не попадают
+        self._worker_running = False
+        await self._stop_scheduler()
+        for lane_event in self._lane_events.values():
+            lane_event.set()
+        in_flight_before = len(self._in_flight)
+        
+        # Ждем выполняемые задачи не дольше deadline, остальные прерываем
+        _, pending_workers = await asyncio.wait(self._worker_tasks, timeout=deadline) if self._worker_tasks else (set(), set())
+        interrupted = list(self._in_flight.values())
+        for worker_task in pending_workers:
+            worker_task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._shutdown_process_executors()
+        stats["interrupted"] = len(interrupted)
+        stats["finished"] = max(0, in_flight_before - len(interrupted))
+        
+        if self._backend is not None:
+            # прерванные задачи воркеры backend уже вернули в pending
+            logger.info(f"Task queue drained: {stats}")
+            return stats
+        
+        # Собираем все невыполненные задачи: прерванные, из очередей, отложенные, ожидающие повтора
+        unfinished: List[Tuple[Task, float]] = [(task, 0.0) for task in interrupted]
+        for queue in self._queues.values():
+            while not queue.empty():
+                unfinished.append((queue.get_nowait(), 0.0))
+                queue.task_done()
+        now = time.monotonic()
+        for due_at, _, entry in self._timers:
+            if isinstance(entry, Task):
+                unfinished.append((entry, max(0.0, due_at - now)))
+        self._timers = [timer for timer in self._timers if not isinstance(timer[2], Task)]
+        heapq.heapify(self._timers)
+        # ожидающие повтора сохраняем без задержки: к следующему запуску она обычно уже прошла
+        unfinished.extend((task, 0.0) for task in self._waiting_retry.values())
+        retry_timers = list(self._retry_timers)
+        for timer in retry_timers:
+            timer.cancel()
+        await asyncio.gather(*retry_timers, return_exceptions=True)
         
-        if self._worker_task:
-            # Останавливаем воркер
-            self._worker_task.cancel()
+        entries = []
+        for task, delay_secs in unfinished:
+            # замененная задача (DEDUP_REPLACE) - её место заняла новая
+            if task.cancelled:
+                continue
+            entry = self._get_checkpoint_entry(task, delay_secs)
+            if entry is None:
+                stats["dropped"] += 1
+                logger.warning(f"Task {task.task_id or 'without ID'} ({getattr(task.func, '__name__', task.func)}) cannot be checkpointed and is dropped")
+            else:
+                entries.append(entry)
+            self._unregister_active_task(task)
+            if task.future is not None and not task.future.done():
+                task.future.cancel()
+        
+        if entries:
+            if checkpoint_path is None:
+                stats["dropped"] += len(entries)
+                logger.warning(f"No checkpoint path given, {len(entries)} unfinished task(s) dropped")
+            else:
+                self._write_checkpoint(Path(checkpoint_path), entries)
+                stats["saved"] = len(entries)
+        self._drained = True
+        logger.info(f"Task queue drained: {stats}")
+        return stats
+    
+
+    @staticmethod
+    def _get_checkpoint_entry(task: Task, delay_secs: float) -> Optional[Dict[str, Any]]:
+        """Задача -> словарь для JSON или None, если функция не зарегистрирована или аргументы не сериализуются"""
+        try:
+            func_name = get_registered_task_name(task.func)
+        except ValueError:
+            return None
+        entry = {
+            "func_name": func_name,
+            "args": list(task.args),
+            "kwargs": dict(task.kwargs),
+            "task_id": task.task_id,
+            "lane": task.lane,
+            "priority": task.priority,
+            "delay_secs": round(delay_secs, 3),
+        }
+        try:
+            json.dumps(entry)
+        except (TypeError, ValueError):
+            return None
+        return entry
+    
+
+    @staticmethod
+    def _write_checkpoint(checkpoint_path: Path, entries: List[Dict[str, Any]]):
+        """Записать checkpoint атомарно (через временный файл), чтобы оборванная запись не испортила прошлый"""
+        checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        # задачи из прошлого checkpoint, который еще не восстановлен, не теряем
+        if checkpoint_path.exists():
             try:
-                await self._worker_task
-            except asyncio.CancelledError:
-                pass
-        logger.info("Task queue worker stopped")
+                entries = json.loads(checkpoint_path.read_text(encoding="utf-8")).get("tasks", []) + entries
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to read existing checkpoint {checkpoint_path}: {e}")
+        tmp_path = checkpoint_path.with_suffix(checkpoint_path.suffix + ".tmp")
+        payload = {"saved_at": datetime.now(timezone.utc).isoformat(), "tasks": entries}
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, checkpoint_path)
+        logger.info(f"{len(entries)} unfinished task(s) saved to {checkpoint_path}")
+    
+
+    async def restore_checkpoint(self, checkpoint_path: Path) -> int:
+        """
+        Вернуть в очередь задачи, сохраненные drain (вызывать после start_worker: put ждет места в очереди).
+        Файл удаляется после восстановления. Задачи с функцией, которая больше не зарегистрирована, теряются (в лог).
+        Returns:
+            int: Количество восстановленных задач
+        """
+        checkpoint_path = Path(checkpoint_path)
+        if not checkpoint_path.exists():
+            return 0
+        try:
+            entries = json.loads(checkpoint_path.read_text(encoding="utf-8")).get("tasks", [])
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read checkpoint {checkpoint_path}: {e}", exc_info=True)
+            return 0
+        restored = 0
+        for entry in entries:
+            func = TASK_REGISTRY.get(entry.get("func_name"))
+            if func is None:
+                logger.error(f"Checkpointed task {entry.get('task_id')}: function '{entry.get('func_name')}' is not registered, dropped")
+                continue
+            await self.put(
+                func, *entry.get("args", []),
+                task_id=entry.get("task_id"), lane=entry.get("lane"), priority=entry.get("priority", PRIORITY_NORMAL),
+                delay=entry.get("delay_secs") or None, **entry.get("kwargs", {}),
+            )
+            restored += 1
+        checkpoint_path.unlink(missing_ok=True)
+        logger.info(f"Restored {restored} task(s) from checkpoint {checkpoint_path}")
+        return restored
     
 
     async def wait_empty(self):
-        """Дождаться, пока очередь не станет пустой"""
-        await self._queue.join()
+        """Дождаться, пока очереди всех полос не станут пустыми (включая задачи, ожидающие повтора)"""
+        while True:
+            for queue in self._queues.values():
+                await queue.join()
+            if not self._retry_timers:
+                return
+            # задачи, ожидающие повтора, вернутся в очередь - ждем их и проверяем очереди снова
+            await asyncio.gather(*list(self._retry_timers), return_exceptions=True)
 
 '''
 # Пример использования
@@ -252,15 +1698,17 @@ def example_task_2(number: int):
 
 async def main():
     """Пример использования очереди задач"""
-    queue = TaskQueue(maxsize=200)
+    queue = TaskQueue(maxsize=200, lanes={"example": 2}, process_lanes={"cpu": 2})
     
-    # Запускаем воркер
+    # Запускаем воркеры
     queue.start_worker()
     
     # Добавляем задачи
     await queue.put(example_task_1, "test1", task_id="task-1")
     await queue.put(example_task_2, 42, task_id="task-2")
-    await queue.put(example_task_1, "test3", task_id="task-3")
+    await queue.put(example_task_1, "test3", task_id="task-3", lane="example")
+    # CPU-задача в процессе пула (example_task_2 должна быть зарегистрирована через @register_task)
+    await queue.put(example_task_2, 7, task_id="task-4", lane="cpu")
     
     # Ждем завершения всех задач
     await queue.wait_empty()
@@ -0,0 +1,378 @@
+# shared_services/task_store_service.py
+# Durable backend for TaskQueue: tasks are stored in the queued_tasks table (scripts/migrate.py, schema version 3)
+# instead of process memory, so queued and in-flight work survives a bot restart.
+# Functions are stored by registered name (task_queue_service.register_task), arguments as JSON.
+# Deduplication by task_id (reject / coalesce / replace) is done here, so it covers tasks of all processes.
+# Workers claim rows with SELECT ... FOR UPDATE SKIP LOCKED, so several bot processes can drain the same queue.
+# Retries wait in pending with available_at in the future; failed rows are the dead-letter store.
+# attempts counts failed executions (for the task's retry policy, stored with the row), lease_expirations counts
+# runs lost with their worker: a crash does not use up a retry, and a retried task still survives a crash.
+#     ai_task_queue = TaskQueue(lanes=AI_TASK_QUEUE_LANES, backend=PostgresTaskBackend())
+
+import os
+import socket
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, delete, and_, or_, case, text
+from sqlalchemy.sql import func
+
+from shared_services.database import get_async_session, QueuedTasks
+
+logger = logging.getLogger(__name__)
+
+TASK_STATUS_PENDING = "pending"
+TASK_STATUS_RUNNING = "running"
+TASK_STATUS_FAILED = "failed"
+
+# running task is considered abandoned (worker crashed) when its lease expires;
+# TaskQueue extends the lease of a running task every lease_secs / 3 (extend_lease), so only dead workers lose it
+DEFAULT_LEASE_SECS = 600
+# last scripts/migrate.py version the queued_tasks table layout depends on (SCHEMA_VERSION_TASK_QUEUE_RETRY_POLICY)
+REQUIRED_SCHEMA_VERSION = 7
+
+# running task whose worker died this many times (lease expired) is marked failed instead of being claimed again
+DEFAULT_MAX_LEASE_EXPIRATIONS = 3
+
+
+class PostgresTaskBackend:
+    """Stores TaskQueue tasks in Postgres. All methods are async and use their own short session."""
+
+    def __init__(
+        self,
+        lease_secs: float = DEFAULT_LEASE_SECS,
+        max_lease_expirations: int = DEFAULT_MAX_LEASE_EXPIRATIONS,
+        worker_prefix: Optional[str] = None,
+    ):
+        self.lease_secs = lease_secs
+        self.max_lease_expirations = max_lease_expirations
+        # identifies the process in locked_by (useful when several bot processes drain the queue)
+        self.worker_prefix = worker_prefix or f"{socket.gethostname()}:{os.getpid()}"
+
+
+    async def check_schema(self) -> None:
+        """
+        Raise RuntimeError if queued_tasks is missing or scripts/migrate.py has not reached REQUIRED_SCHEMA_VERSION.
+        Called on bot start: without it a deploy that skipped migrations fails on every put/claim instead.
+        """
+        async with get_async_session() as db:
+            table = (await db.execute(text("SELECT to_regclass('queued_tasks')"))).scalar()
+            has_migrations = (await db.execute(text("SELECT to_regclass('schema_migrations')"))).scalar()
+            version = None
+            if has_migrations is not None:
+                version = (await db.execute(text("SELECT max(version) FROM schema_migrations"))).scalar()
+        if table is None or version is None or version < REQUIRED_SCHEMA_VERSION:
+            raise RuntimeError(
+                f"Task queue backend needs schema version {REQUIRED_SCHEMA_VERSION} (queued_tasks table), "
+                f"database has {version or 'none'}: run scripts/migrate.py or set TASK_QUEUE_BACKEND=memory"
+            )
+
+
+    async def enqueue(
+        self,
+        func_name: str,
+        args: tuple,
+        kwargs: Dict[str, Any],
+        task_id: Optional[str],
+        lane: str,
+        dedup: str = "coalesce",
+        priority: int = 10,
+        sort_key: Optional[float] = None,
+        available_at: Optional[datetime] = None,
+        retry_policy: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Optional[int], str]:
+        """
+        Insert a pending task. args/kwargs must be JSON serializable.
+        retry_policy (RetryPolicy.to_dict, None = lane / queue policy) is stored with the row.
+        If a pending or running task with the same task_id exists, dedup decides (see task_queue_service.DEDUP_*):
+        "reject" -> (None, "rejected"), "coalesce" -> (existing row id, "coalesced"),
+        "replace" -> pending row gets new arguments, priority and place in line (row id, "replaced");
+        a running one is followed by a new row.
+        Returns (row id, "created") for a new row.
+        sort_key (enqueue epoch + priority * aging, see TaskQueue) defines claim order within the lane.
+        available_at (delayed task): the task is not claimed before this time.
+        """
+
+        log_prefix = "enqueue"
+
+        async with get_async_session() as db:
+            try:
+                if task_id:
+                    # serialize enqueues of the same task_id across processes until commit
+                    await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(task_id))))
+                    existing = (await db.execute(
+                        select(QueuedTasks.id, QueuedTasks.status)
+                        .where(
+                            QueuedTasks.task_id == task_id,
+                            QueuedTasks.status.in_((TASK_STATUS_PENDING, TASK_STATUS_RUNNING)),
+                        )
+                        .order_by(QueuedTasks.id.desc())
+                    )).first()
+                    if existing is not None:
+                        if dedup == "reject":
+                            await db.rollback()
+                            return None, "rejected"
+                        if dedup == "coalesce":
+                            await db.rollback()
+                            return existing.id, "coalesced"
+                        if existing.status == TASK_STATUS_PENDING:
+                            await db.execute(
+                                update(QueuedTasks)
+                                .where(QueuedTasks.id == existing.id)
+                                .values(
+                                    func_name=func_name, args=list(args), kwargs=dict(kwargs), lane=lane,
+                                    available_at=available_at, retry_policy=retry_policy,
+                                    # new priority takes effect: e.g. bulk task re-queued as interactive moves up
+                                    priority=priority, sort_key=sort_key,
+                                )
+                                .execution_options(synchronize_session=False)
+                            )
+                            await db.commit()
+                            return existing.id, "replaced"
+
+                row = QueuedTasks(
+                    task_id=task_id,
+                    lane=lane,
+                    func_name=func_name,
+                    args=list(args),
+                    kwargs=dict(kwargs),
+                    status=TASK_STATUS_PENDING,
+                    priority=priority,
+                    sort_key=sort_key,
+                    available_at=available_at,
+                    retry_policy=retry_policy,
+                )
+                db.add(row)
+                await db.commit()
+                logger.debug(f"{log_prefix}: task {task_id or 'without ID'} stored as row {row.id} (lane '{lane}')")
+                return row.id, "created"
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"{log_prefix}: failed to store task {task_id or 'without ID'}: {e}", exc_info=True)
+                raise
+
+
+    async def claim(self, lane: str, worker_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest available task of the lane and mark it running with a lease.
+        Available = pending and not waiting for a retry delay, or running with an expired lease
+        (its worker died) fewer than max_lease_expirations times; taking such a row counts a lease expiration,
+        not an attempt.
+        Returns row as dict (id, task_id, lane, func_name, args, kwargs, retry_policy, attempts (failed executions
+        so far), created_at, available_at) or None if lane is empty.
+        """
+
+        now = datetime.now(timezone.utc)
+        # SKIP LOCKED: rows being claimed by other workers/processes are skipped instead of waited for
+        candidate_id = (
+            select(QueuedTasks.id)
+            .where(
+                QueuedTasks.lane == lane,
+                or_(
+                    and_(
+                        QueuedTasks.status == TASK_STATUS_PENDING,
+                        or_(QueuedTasks.available_at.is_(None), QueuedTasks.available_at <= now),
+                    ),
+                    and_(
+                        QueuedTasks.status == TASK_STATUS_RUNNING,
+                        QueuedTasks.locked_until < now,
+                        QueuedTasks.lease_expirations < self.max_lease_expirations,
+                    ),
+                ),
+            )
+            # rows created before priorities existed have no sort_key: take them first
+            .order_by(QueuedTasks.sort_key.asc().nulls_first(), QueuedTasks.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(QueuedTasks)
+            .where(QueuedTasks.id == candidate_id)
+            .values(
+                status=TASK_STATUS_RUNNING,
+                # status in SET is the old value: running here means the lease of a dead worker expired
+                lease_expirations=case(
+                    (QueuedTasks.status == TASK_STATUS_RUNNING, QueuedTasks.lease_expirations + 1),
+                    else_=QueuedTasks.lease_expirations,
+                ),
+                locked_by=f"{self.worker_prefix}/{worker_name}",
+                locked_until=now + timedelta(seconds=self.lease_secs),
+            )
+            .returning(
+                QueuedTasks.id,
+                QueuedTasks.task_id,
+                QueuedTasks.lane,
+                QueuedTasks.func_name,
+                QueuedTasks.args,
+                QueuedTasks.kwargs,
+                QueuedTasks.retry_policy,
+                QueuedTasks.attempts,
+                QueuedTasks.created_at,
+                QueuedTasks.available_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        async with get_async_session() as db:
+            try:
+                row = (await db.execute(stmt)).mappings().first()
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+        return dict(row) if row is not None else None
+
+
+    async def complete(self, row_id: int) -> None:
+        """Task finished: remove its row."""
+        async with get_async_session() as db:
+            try:
+                await db.execute(delete(QueuedTasks).where(QueuedTasks.id == row_id))
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+
+    async def fail(self, row_id: int, error: str) -> None:
+        """Task raised: keep the row as failed with the error for inspection."""
+        await self._set_status(row_id, TASK_STATUS_FAILED, attempts=QueuedTasks.attempts + 1, last_error=error[:2000])
+
+
+    async def retry_later(self, row_id: int, error: str, delay: float) -> None:
+        """Task raised a retryable error: back to pending, claimable again after delay seconds."""
+        await self._set_status(
+            row_id,
+            TASK_STATUS_PENDING,
+            attempts=QueuedTasks.attempts + 1,
+            last_error=error[:2000],
+            available_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+        )
+
+
+    async def list_failed(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Dead-letter: latest failed tasks (task_id, lane, func_name, attempts, error, failed_at)."""
+        async with get_async_session() as db:
+            rows = (await db.execute(
+                select(
+                    QueuedTasks.id,
+                    QueuedTasks.task_id,
+                    QueuedTasks.lane,
+                    QueuedTasks.func_name,
+                    QueuedTasks.attempts,
+                    QueuedTasks.last_error.label("error"),
+                    QueuedTasks.updated_at.label("failed_at"),
+                )
+                .where(QueuedTasks.status == TASK_STATUS_FAILED)
+                .order_by(QueuedTasks.updated_at.desc())
+                .limit(limit)
+            )).mappings().all()
+        return [dict(row) for row in rows]
+
+
+    async def requeue_failed(self, task_id: Optional[str] = None) -> int:
+        """Move failed tasks (all, or only with task_id) back to pending with fresh attempt counters."""
+
+        log_prefix = "requeue_failed"
+
+        stmt = update(QueuedTasks).where(QueuedTasks.status == TASK_STATUS_FAILED)
+        if task_id is not None:
+            stmt = stmt.where(QueuedTasks.task_id == task_id)
+        async with get_async_session() as db:
+            try:
+                result = await db.execute(
+                    stmt.values(
+                        status=TASK_STATUS_PENDING, attempts=0, lease_expirations=0,
+                        available_at=None, locked_by=None, locked_until=None,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+        logger.info(f"{log_prefix}: {result.rowcount} failed tasks moved back to pending")
+        return result.rowcount
+
+
+    async def count_by_lane(self) -> Dict[str, Dict[str, int]]:
+        """Number of tasks per lane and status, e.g. {"resume_analysis": {"pending": 12, "running": 8}}"""
+        async with get_async_session() as db:
+            rows = (await db.execute(
+                select(QueuedTasks.lane, QueuedTasks.status, func.count())
+                .group_by(QueuedTasks.lane, QueuedTasks.status)
+            )).all()
+        counts: Dict[str, Dict[str, int]] = {}
+        for lane, status, count in rows:
+            counts.setdefault(lane, {})[status] = count
+        return counts
+
+
+    async def extend_lease(self, row_id: int) -> bool:
+        """Worker is still running the task: move locked_until forward. False if the row is no longer running."""
+        async with get_async_session() as db:
+            try:
+                result = await db.execute(
+                    update(QueuedTasks)
+                    .where(QueuedTasks.id == row_id, QueuedTasks.status == TASK_STATUS_RUNNING)
+                    .values(locked_until=datetime.now(timezone.utc) + timedelta(seconds=self.lease_secs))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+        return result.rowcount > 0
+
+
+    async def release(self, row_id: int) -> None:
+        """Task was interrupted (shutdown): put it back to pending so the next start picks it up (no attempt is used)."""
+        await self._set_status(row_id, TASK_STATUS_PENDING)
+
+
+    async def recover_stale(self) -> int:
+        """
+        Mark as failed running tasks whose lease expired and whose worker died max_lease_expirations times already
+        (claim() would never pick them up again). Returns number of such tasks.
+        """
+
+        log_prefix = "recover_stale"
+
+        async with get_async_session() as db:
+            try:
+                result = await db.execute(
+                    update(QueuedTasks)
+                    .where(
+                        QueuedTasks.status == TASK_STATUS_RUNNING,
+                        QueuedTasks.locked_until < datetime.now(timezone.utc),
+                        QueuedTasks.lease_expirations >= self.max_lease_expirations,
+                    )
+                    .values(
+                        status=TASK_STATUS_FAILED, locked_until=None,
+                        last_error=f"lease expired {self.max_lease_expirations + 1} times (worker died while running the task)",
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+        if result.rowcount:
+            logger.warning(f"{log_prefix}: {result.rowcount} abandoned tasks marked as failed")
+        return result.rowcount
+
+
+    async def _set_status(self, row_id: int, status: str, **values) -> None:
+        async with get_async_session() as db:
+            try:
+                await db.execute(
+                    update(QueuedTasks)
+                    .where(QueuedTasks.id == row_id)
+                    .values(status=status, locked_by=None, locked_until=None, **values)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
@@ -9,11 +9,12 @@ from pathlib import Path
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from shared_services.db_service import (
+from shared_services.async_db_service import (
     get_column_value_in_db,
     update_record_in_db,
     get_column_value_by_field,
-    update_column_value_by_field
+    update_column_value_by_field,
+    update_columns_by_field,
 )
 from shared_services.database import Managers, Vacancies, Negotiations
 
@@ -149,7 +150,7 @@ async def download_incoming_video_locally(update: Update, context: ContextTypes.
         # ----- GENERATE UNIQUE FILENAME WITH APPROPRIATE EXTENSION -----
 
         if user_type == "manager":
-            vacancy_id = get_column_value_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, target_field_name="id")
+            vacancy_id = await get_column_value_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, target_field_name="id")
             # Generate unique filename with appropriate extension
             timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
             if file_type == "video_note":
@@ -158,7 +159,7 @@ async def download_incoming_video_locally(update: Update, context: ContextTypes.
                 filename = f"vacancy_id_{vacancy_id}_time_{timestamp}.mp4"
 
         elif user_type == "applicant":
-            negotiation_id = get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
+            negotiation_id = await get_column_value_by_field(db_model=Negotiations, search_field_name="tg_user_id", search_value=bot_user_id, target_field_name="id")
             # Generate unique filename with appropriate extension
             timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
             if file_type == "video_note":
@@ -187,12 +188,10 @@ async def download_incoming_video_locally(update: Update, context: ContextTypes.
         # ----- UPDATE USER RECORDS WITH VIDEO RECEIVED AND VIDEO PATH -----
 
         if user_type == "manager":
-            update_column_value_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, target_field_name="video_received", new_value=True)
-            update_column_value_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, target_field_name="video_path", new_value=str(video_file_path))
+            await update_columns_by_field(db_model=Vacancies, search_field_name="manager_id", search_value=bot_user_id, updates={"video_received": True, "video_path": str(video_file_path)})
         
         elif user_type == "applicant":
-            update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="video_received", new_value=True)
-            update_column_value_by_field(db_model=Negotiations, search_field_name="id", search_value=negotiation_id, target_field_name="video_path", new_value=str(video_file_path))
+            await update_record_in_db(db_model=Negotiations, record_id=negotiation_id, updates={"video_received": True, "video_path": str(video_file_path)})
 
         
         logger.info(f"{log_prefix}: User records updated with video received and video path")